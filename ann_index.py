@@ -0,0 +1,306 @@
+import os
+import time
+import argparse
+import numpy as np
+from artifacts import save_sidecar, load_sidecar, sidecar_dir
+
+# --- IVF (INVERTED FILE) INDEX ---
+# Pure-NumPy approximate nearest neighbour search over the L2-normalised
+# embeddings stored in an artifact (see artifacts.py).
+#
+# Training clusters the vectors with spherical k-means. Every row is filed
+# under its closest centroid, and the lists are stored CSR-style:
+# list i holds list_ids[list_offsets[i]:list_offsets[i + 1]].
+# A query scores the centroids, visits the `nprobe` closest lists and
+# scores only those rows. More lists visited = higher recall, more latency.
+
+INDEX_DIR = 'ivf'
+INDEX_MANIFEST = 'index.json'
+DEFAULT_NPROBE = 8
+# Rows x centroids scored at once while training/filing (~64 MB of float32 scores)
+SCORE_BLOCK = 16 * 2 ** 20
+TARGET_RECALL = 0.95
+# Quantized artifacts: candidates picked on the compact vectors per result re-scored in float32
+RESCORE_FACTOR = int(os.environ.get('SKILLBRIDGE_RESCORE_FACTOR', 4))
+
+
+def _normalize(x):
+    x = np.atleast_2d(np.asarray(x, dtype=np.float32))
+    return x / np.maximum(np.linalg.norm(x, axis=1, keepdims=True), 1e-12)
+
+
+def _iter_blocks(emb, block_size=65536):
+    for start in range(0, len(emb), block_size):
+        yield start, np.asarray(emb[start:start + block_size], dtype=np.float32)
+
+
+def _assign(vectors, centroids):
+    """(start, block, closest centroid per row) for vectors, scored a bounded block at a time."""
+    block_size = max(1024, SCORE_BLOCK // max(1, len(centroids)))
+    for start, block in _iter_blocks(vectors, block_size):
+        yield start, block, np.argmax(block @ centroids.T, axis=1)
+
+
+def exact_top_k(scores, k):
+    """Indices of the k highest scores, best first (argpartition, not a full sort)."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind='stable')]
+
+
+def spherical_kmeans(vectors, nlist, iters=20, seed=0):
+    """
+    Cosine k-means on unit vectors. Empty clusters are re-seeded from random rows.
+    Rows are assigned block by block and the centroid sums accumulated per
+    block, so the full rows x nlist score matrix never exists.
+    """
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].copy()
+    for _ in range(iters):
+        sums = np.zeros_like(centroids)
+        counts = np.zeros(nlist, dtype=np.int64)
+        for _, block, assign in _assign(vectors, centroids):
+            np.add.at(sums, assign, block)
+            counts += np.bincount(assign, minlength=nlist)
+        empty = counts == 0
+        if empty.any():
+            sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()), replace=False)]
+        centroids = _normalize(sums)
+    return centroids
+
+
+class IVFIndex:
+    def __init__(self, centroids, list_offsets, list_ids, info=None):
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.list_ids = list_ids
+        self.info = info or {}
+
+    @property
+    def nlist(self):
+        return len(self.centroids)
+
+    @classmethod
+    def build(cls, emb, nlist=None, iters=20, max_train=100000, seed=0):
+        """Trains centroids on a sample of emb, then files every row under one list."""
+        n = len(emb)
+        if n == 0:
+            raise ValueError("Cannot build an IVF index over 0 rows")
+        if nlist is None:
+            nlist = max(1, int(4 * np.sqrt(n)))
+        nlist = max(1, min(nlist, n))
+
+        rng = np.random.default_rng(seed)
+        sample_ids = np.sort(rng.choice(n, min(n, max_train), replace=False))
+        sample = _normalize(np.asarray(emb[sample_ids], dtype=np.float32))
+        centroids = spherical_kmeans(sample, nlist, iters=iters, seed=seed)
+        return cls.from_centroids(centroids, emb)
+
+    @classmethod
+    def from_centroids(cls, centroids, emb):
+        """Builds the inverted lists for emb against already-trained centroids."""
+        assign = np.empty(len(emb), dtype=np.int32)
+        for start, block, block_assign in _assign(emb, centroids):
+            assign[start:start + len(block)] = block_assign
+        list_ids = np.argsort(assign, kind='stable').astype(np.int64)
+        list_offsets = np.zeros(len(centroids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assign, minlength=len(centroids)), out=list_offsets[1:])
+        return cls(centroids.astype(np.float32), list_offsets, list_ids)
+
+    def candidates(self, query, nprobe):
+        """Row ids stored in the nprobe lists closest to one query vector."""
+        nprobe = max(1, min(nprobe, self.nlist))
+        probe = exact_top_k(self.centroids @ query, nprobe)
+        return np.concatenate([self.list_ids[self.list_offsets[c]:self.list_offsets[c + 1]] for c in probe])
+
+    def search(self, emb, query_vecs, k=10, nprobe=None):
+        """Returns [(ids, scores), ...] per query, best first."""
+        nprobe = nprobe or self.info.get('nprobe', DEFAULT_NPROBE)
+        results = []
+        for q in _normalize(query_vecs):
+            ids = self.candidates(q, nprobe)
+            ids.sort()  # sequential reads from the memory-mapped matrix
+            scores = np.asarray(emb[ids], dtype=np.float32) @ q
+            top = exact_top_k(scores, k)
+            results.append((ids[top], scores[top]))
+        return results
+
+    # --- persistence (next to the artifact it indexes) ---
+    def save(self, artifact_dir):
+        arrays = {'centroids': self.centroids, 'list_offsets': self.list_offsets, 'list_ids': self.list_ids}
+        save_sidecar(os.path.join(artifact_dir, INDEX_DIR), arrays, dict(self.info, nlist=self.nlist), INDEX_MANIFEST)
+
+
+def load_index(art):
+    """The IVF index stored with an artifact, or None if missing or built for another version."""
+    loaded = load_sidecar(sidecar_dir(art, INDEX_DIR), ('centroids', 'list_offsets', 'list_ids'),
+                          expect={'artifact_version': art.version}, manifest_name=INDEX_MANIFEST,
+                          stale_warning=f"{art.name} index is stale (built for another artifact). Using exact search.")
+    if loaded is None:
+        return None
+    arrays, info = loaded
+    return IVFIndex(np.array(arrays['centroids']), arrays['list_offsets'], arrays['list_ids'], info)
+
+
+def rescore(art, query_vec, ids, k):
+    """Re-ranks candidate rows with full-precision scores and keeps the best k."""
+    ids = np.sort(ids)
+    scores = art.exact_scores(query_vec, ids)
+    top = exact_top_k(scores, k)
+    return ids[top], scores[top]
+
+
+def top_k(art, query_vecs, k=10, index=None, nprobe=None):
+    """
+    Best k rows of an artifact for each query: [(ids, scores), ...].
+    Uses the IVF index when one is given, exact search otherwise.
+    On quantized artifacts the compact vectors only pick RESCORE_FACTOR * k
+    candidates, which are then re-scored in float32.
+    """
+    pool = k * RESCORE_FACTOR if art.full is not None else k
+    if index is not None:
+        coarse = index.search(art.emb, query_vecs, k=pool, nprobe=nprobe)
+    else:
+        coarse = []
+        for scores in art.similarity(query_vecs):
+            ids = exact_top_k(scores, pool)
+            coarse.append((ids, scores[ids]))
+    if art.full is None:
+        return coarse
+    return [rescore(art, q, ids, k) for q, (ids, _) in zip(_normalize(query_vecs), coarse)]
+
+
+# --- RECALL / LATENCY CHECK ---
+def sample_queries(emb, n=200, noise=0.05, seed=0):
+    """Perturbed copies of random rows, so queries are realistic but not stored rows."""
+    rng = np.random.default_rng(seed)
+    ids = rng.choice(len(emb), min(n, len(emb)), replace=False)
+    q = np.asarray(emb[np.sort(ids)], dtype=np.float32)
+    return _normalize(q + rng.normal(scale=noise, size=q.shape).astype(np.float32))
+
+
+def evaluate(art, index, queries, k=10, nprobes=(1, 2, 4, 8, 16, 32, 64)):
+    """recall@k against exact search plus p50/p99 latency for each nprobe setting."""
+    def timed(fn):
+        lat, out = [], []
+        for q in queries:
+            t0 = time.perf_counter()
+            out.append(fn(q))
+            lat.append((time.perf_counter() - t0) * 1000)
+        return out, np.percentile(lat, 50), np.percentile(lat, 99)
+
+    exact, p50, p99 = timed(lambda q: top_k(art, q, k)[0][0])
+    report = [{'nprobe': 'exact', 'recall': 1.0, 'p50_ms': round(p50, 3), 'p99_ms': round(p99, 3)}]
+    for nprobe in nprobes:
+        if nprobe > index.nlist:
+            break
+        approx, p50, p99 = timed(lambda q: top_k(art, q, k=k, index=index, nprobe=nprobe)[0][0])
+        recall = np.mean([len(np.intersect1d(a, e)) / max(len(e), 1) for a, e in zip(approx, exact)])
+        report.append({'nprobe': nprobe, 'recall': round(float(recall), 4), 'p50_ms': round(p50, 3), 'p99_ms': round(p99, 3)})
+    return report
+
+
+def pick_nprobe(report, target=TARGET_RECALL):
+    """Smallest nprobe that reaches the target recall (largest tested if none does)."""
+    tested = [r for r in report if r['nprobe'] != 'exact']
+    for r in tested:
+        if r['recall'] >= target:
+            return r['nprobe']
+    return tested[-1]['nprobe'] if tested else DEFAULT_NPROBE
+
+
+def print_report(report):
+    print(f"   {'nprobe':>8} {'recall@10':>10} {'p50 ms':>9} {'p99 ms':>9}")
+    for r in report:
+        print(f"   {str(r['nprobe']):>8} {r['recall']:>10.3f} {r['p50_ms']:>9.2f} {r['p99_ms']:>9.2f}")
+
+
+def evaluate_quantization(art, queries, k=10):
+    """
+    Memory saved by the compact matrix and top-k agreement with a float32
+    exact search, before and after re-scoring. None for float32 artifacts.
+    """
+    if art.full is None:
+        return None
+    def agreement(found):
+        return round(float(np.mean([len(np.intersect1d(f, e)) / max(len(e), 1) for f, e in zip(found, exact)])), 4)
+
+    exact = [exact_top_k(s, k) for s in art.similarity(queries, full=True)]
+    coarse = [exact_top_k(s, k) for s in art.similarity(queries)]
+    rescored = [ids for ids, _ in top_k(art, queries, k)]
+    float32_bytes = len(art) * art.emb.shape[1] * 4
+    return {
+        'dtype': art.manifest.get('dtype'),
+        'float32_mb': round(float32_bytes / 2 ** 20, 2),
+        'compact_mb': round(art.emb_bytes / 2 ** 20, 2),
+        'saved_pct': round(100.0 * (1 - art.emb_bytes / max(float32_bytes, 1)), 1),
+        'agreement_coarse': agreement(coarse),
+        'agreement_rescored': agreement(rescored),
+    }
+
+
+def print_quantization_report(name, r, k=10):
+    print(f"   {name}: {r['dtype']} {r['compact_mb']:.1f} MB vs float32 {r['float32_mb']:.1f} MB "
+          f"({r['saved_pct']:.0f}% saved), top-{k} agreement {r['agreement_coarse']:.3f} coarse, "
+          f"{r['agreement_rescored']:.3f} re-scored")
+
+
+def load_centroids(artifact_dir):
+    """Centroids of the index currently saved in artifact_dir (None if there is none)."""
+    path = os.path.join(artifact_dir, INDEX_DIR, 'centroids.npy')
+    return np.load(path) if os.path.exists(path) else None
+
+
+def can_reuse_centroids(centroids, rows):
+    """Old centroids stay valid while the corpus size is within 2x of the size they suit."""
+    if centroids is None or rows == 0:
+        return False
+    return 0.5 <= len(centroids) / max(1, int(4 * np.sqrt(rows))) <= 2.0
+
+
+def build_index(art, nlist=None, target_recall=TARGET_RECALL, centroids=None):
+    """
+    Training stage: builds, evaluates and saves the index for an artifact.
+    Passing the previous centroids skips k-means and only re-files the rows.
+    Returns (None, []) for an empty artifact: searches then stay exact.
+    """
+    if len(art) == 0:
+        return None, []
+    if centroids is not None and centroids.shape[1] == art.emb.shape[1]:
+        index = IVFIndex.from_centroids(centroids, art.emb)
+    else:
+        index = IVFIndex.build(art.emb, nlist=nlist)
+    report = evaluate(art, index, sample_queries(art.emb))
+    index.info = {
+        'artifact_version': art.version,
+        'nprobe': pick_nprobe(report, target_recall),
+        'target_recall': target_recall,
+        'report': report,
+    }
+    index.save(art.path)
+    return index, report
+
+
+if __name__ == "__main__":
+    from artifacts import load_artifact
+
+    parser = argparse.ArgumentParser(description="Check recall@10 and latency of the job ANN index against exact search.")
+    parser.add_argument('--artifact', default='jobs')
+    parser.add_argument('--queries', type=int, default=200, help="Number of sampled queries.")
+    parser.add_argument('--rebuild', action='store_true', help="Rebuild the index before evaluating.")
+    parser.add_argument('--nlist', type=int, default=None)
+    args = parser.parse_args()
+
+    art = load_artifact(args.artifact)
+    index = None if args.rebuild else load_index(art)
+    if index is None:
+        print(f"Building IVF index for {art.name} ({len(art)} rows)...")
+        index, _ = build_index(art, nlist=args.nlist)
+    print(f"nlist={index.nlist}, default nprobe={index.info.get('nprobe')}")
+    queries = sample_queries(art.emb, n=args.queries)
+    print_report(evaluate(art, index, queries))
+    quant = evaluate_quantization(art, queries)
+    if quant is not None:
+        print_quantization_report(art.name, quant)
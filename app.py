@@ -1,103 +1,214 @@
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, request, Response
 from flask_cors import CORS
-import pickle
 import numpy as np
-import random  # Added to generate realistic UI data (colors, locations)
-from utils import parse_skills
-from sklearn.metrics.pairwise import cosine_similarity
-from sentence_transformers import SentenceTransformer
+from encoding import BatchingEncoder, load_encoder
+from cache import QueryCache
+from metrics import REGISTRY, instrument, span
 import os
 import uuid
+import functools
+import threading
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from werkzeug.utils import secure_filename
-import pypdf  # For PDFs
-import docx   # For Word Docs
-
-# --- MEMORY STORAGE FOR POSTS (Prototype) ---
-posts = [
-    {
-        "id": "1",
-        "author": "Sarah Chen",
-        "role": "Senior AI Engineer at TechCorp",
-        "avatar": "https://ui-avatars.com/api/?name=Sarah+Chen&background=06b6d4&color=fff&bold=true",
-        "content": "🚀 Excited to share that our AI team just launched a groundbreaking feature that improved model accuracy by 35%! The journey from research to production taught us invaluable lessons about scalability and teamwork.",
-        "image": "https://images.unsplash.com/photo-1677442136019-21780ecad995?w=800&h=400&fit=crop",
-        "likes": 247,
-        "comments": 52,
-        "shares": 18,
-        "time": "2h ago"
-    }
-]
+from resume_processing import ResumeProcessor, ResumeJobStore, ResumeError, MAX_FILE_BYTES
+from posts_store import PostStore, DEFAULT_LIMIT as POSTS_DEFAULT_LIMIT, MAX_LIMIT as POSTS_MAX_LIMIT
+from job_feed import JobFeed, DEFAULT_LIMIT as FEED_DEFAULT_LIMIT, MAX_LIMIT as FEED_MAX_LIMIT
+from ann_index import top_k
+from matching import find_row
+
+# --- COMMUNITY POSTS (SQLite, shared by every worker) ---
+posts = PostStore()
 app = Flask(__name__)
-CORS(app)
-
-print("Loading Unified AI Models...")
-try:
-    with open('models/candidates.pkl','rb') as f: cand_art = pickle.load(f)
-    with open('models/jobs.pkl','rb') as f: job_art = pickle.load(f)
-    with open('models/trainings.pkl','rb') as f: train_art = pickle.load(f)
-except FileNotFoundError:
-    print("❌ Error: Models not found. Run 'train_model.py' first.")
-    exit()
-
-candidates_df = cand_art['df']
-jobs_df = job_art['df']
-job_embeddings = job_art['emb']
-tr_df = train_art['df']
-tr_embeddings = train_art['emb']
-
-model = SentenceTransformer("all-MiniLM-L6-v2")
-
-# --- UI HELPERS ---
-# These lists help the UI look realistic and colorful
-LOCATIONS = ["Bangalore, India", "Hyderabad, Remote", "Mumbai, Hybrid", "Delhi NCR", "Pune, On-site", "Chennai, India"]
-TIMES = ["2 hours ago", "5 hours ago", "1 day ago", "Just now", "3 days ago", "1 week ago"]
-COLORS = ["bg-blue-100 text-blue-600", "bg-green-100 text-green-600", "bg-purple-100 text-purple-600", "bg-orange-100 text-orange-600", "bg-red-100 text-red-600"]
+CORS(app, expose_headers=['ETag', 'Link', 'X-Next-Cursor', 'Server-Timing'])
+# Request latency histograms, per-stage spans and GET /metrics (Prometheus text)
+instrument(app)
+
+# --- MODEL LOADING ---
+# Importing this module is cheap: artifacts, indexes and the encoder (torch)
+# are loaded by load_models(), on a background thread by default, so the
+# server answers /healthz straight away. Routes that need the models return
+# 503 until they are loaded, and /readyz only turns 200 once the encoder has
+# done a warm-up encode. SKILLBRIDGE_BACKGROUND_LOAD=0 leaves loading to the
+# caller (serve.py loads synchronously before forking).
+cand_art = job_art = train_art = None
+candidates_df = jobs_df = tr_df = None
+job_index = skill_index = match_table = skill_gap = duplicates = candidate_keys = None
+model = encoder = query_cache = job_feed = None
+# SKILLBRIDGE_NPROBE trades recall for latency; default is the value picked at train time.
+NPROBE = int(os.environ['SKILLBRIDGE_NPROBE']) if os.environ.get('SKILLBRIDGE_NPROBE') else None
+FEED_MAX_AGE = int(os.environ.get('SKILLBRIDGE_FEED_MAX_AGE', 300))
+
+models_loaded = threading.Event()
+ready = threading.Event()
+load_error = None
+_load_lock = threading.Lock()
+_warm_lock = threading.Lock()
+
+def load_models(warm_up=True):
+    """Loads every model once (later calls wait for / reuse the first). Raises FileNotFoundError if not trained."""
+    global cand_art, job_art, train_art, candidates_df, jobs_df, tr_df
+    global job_index, skill_index, match_table, skill_gap, duplicates, candidate_keys, model, encoder, query_cache, job_feed
+    with _load_lock:
+        if not models_loaded.is_set():
+            from artifacts import load_artifact
+            from ann_index import load_index
+            from skill_index import load_skill_index
+            from matching import load_match_table, id_keys
+            from skill_gap import load_skill_gap
+            from dedup import load_duplicates
+
+            print("Loading Unified AI Models...")
+            # Memory-mapped artifacts: opening them is cheap and every worker shares
+            # the same page-cache pages for the embedding matrices.
+            cand_art = load_artifact('candidates')
+            job_art = load_artifact('jobs')
+            train_art = load_artifact('trainings')
+            candidates_df = cand_art.meta
+            jobs_df = job_art.meta
+            tr_df = train_art.meta
+
+            # Approximate nearest-neighbour index over the jobs (None -> exact search)
+            job_index = load_index(job_art)
+            # Skill vocabulary + inverted index (None -> purely semantic search)
+            skill_index = load_skill_index(job_art)
+            # Reposts folded into each job at train time (None -> dedup was off)
+            duplicates = load_duplicates(job_art)
+            # Precomputed candidate <-> job top-k (None -> match endpoints return 503)
+            match_table = load_match_table(cand_art, job_art)
+            # Job -> training and skill -> training rankings for /api/skill-gap
+            skill_gap = load_skill_gap(job_art, train_art)
+            # Candidate id -> row (the match table's keys, or built here when there is no table)
+            candidate_keys = (match_table.cand_keys, match_table.cand_order) if match_table is not None \
+                else id_keys(candidates_df['candidate_id'][:]) if 'candidate_id' in candidates_df else None
+
+            model = load_encoder(job_art.manifest.get('model_name') or "all-MiniLM-L6-v2")
+            # Shared encoder: concurrent requests are grouped into one model.encode() call
+            encoder = BatchingEncoder(model)
+            # Query -> embedding and query -> top-k caches (results are tied to job_art.version)
+            query_cache = QueryCache(encoder.encode)
+            # Every feed row is serialised once here; requests only slice and join bytes
+            job_feed = JobFeed(jobs_df)
+            models_loaded.set()
+    if warm_up:
+        warm_up_models()
+
+def warm_up_models():
+    """First encode (allocates the torch thread pool) and the lazy skill matcher, off the request path. Runs once."""
+    with _warm_lock:  # the background loader and an explicit load_models() may both get here
+        if not ready.is_set():
+            encoder.encode(["warm up"])
+            if skill_index is not None:
+                skill_index.extract("warm up")
+            ready.set()
+            print("✅ Models loaded and warm.")
+
+def _background_load():
+    global load_error
+    try:
+        load_models()
+    except FileNotFoundError:
+        load_error = "Models not found. Run 'train_model.py' first."
+        print(f"❌ Error: {load_error}")
+    except Exception as e:
+        load_error = f"Model loading failed: {e}"
+        print(f"❌ Error: {load_error}")
+
+def requires_models(view):
+    """503 + Retry-After while the models are loading (or failed to load)."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not models_loaded.is_set():
+            return jsonify({'error': load_error or 'Models are still loading, try again shortly'}), 503, {'Retry-After': '5'}
+        return view(*args, **kwargs)
+    return wrapper
 
+# The resume pool's forkserver/spawn workers re-import `python app.py` as __mp_main__: never load models there
+if os.environ.get('SKILLBRIDGE_BACKGROUND_LOAD', '1') != '0' and __name__ != '__mp_main__':
+    threading.Thread(target=_background_load, name='model-loader', daemon=True).start()
+
+REGISTRY.callback('skillbridge_ready', '1 once the models are loaded and warm.', lambda: int(ready.is_set()))
+REGISTRY.callback('skillbridge_jobs', 'Jobs in the loaded artifact.', lambda: len(jobs_df))
+REGISTRY.callback('skillbridge_posts', 'Community posts stored.', lambda: posts.count())
+REGISTRY.callback('skillbridge_encoder_batches_total', 'model.encode() calls made by the batching encoder.', lambda: encoder.batches, 'counter')
+REGISTRY.callback('skillbridge_encoder_texts_total', 'Texts encoded by the batching encoder.', lambda: encoder.texts, 'counter')
+REGISTRY.callback('skillbridge_cache_hits_total', 'Cache hits.', lambda: {n: c['hits'] for n, c in query_cache.stats().items()}, 'counter', 'cache')
+REGISTRY.callback('skillbridge_cache_misses_total', 'Cache misses.', lambda: {n: c['misses'] for n, c in query_cache.stats().items()}, 'counter', 'cache')
+REGISTRY.callback('skillbridge_cache_size', 'Entries held by each cache.', lambda: {n: c['size'] for n, c in query_cache.stats().items()}, 'gauge', 'cache')
+
+# --- HEALTH ---
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    """Liveness: the process is up and serving HTTP."""
+    return jsonify({'status': 'ok'})
+
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    """Readiness: models loaded and encoder warm. Route traffic here only on 200."""
+    if ready.is_set():
+        return jsonify({'status': 'ready', 'jobs': len(jobs_df)})
+    status = 'error' if load_error else ('warming_up' if models_loaded.is_set() else 'loading')
+    return jsonify({'status': status, 'error': load_error}), 503
+
+# --- JOB FEED ---
 @app.route('/api/jobs', methods=['GET'])
+@requires_models
 def list_jobs():
-    """Returns the feed of jobs with UI enhancements."""
-    limit = 20
-    subset = jobs_df.head(limit)
-    out = []
-    for _, row in subset.iterrows():
-        company = row['unified_company']
-        # Generate a nice 2-letter logo (e.g., "GO" for Google)
-        logo_text = company[:2].upper() if company and isinstance(company, str) else "JO"
-        
-        out.append({
-            'job_id': str(row['unified_id']),
-            'title': row['unified_title'],
-            'company': company if company else "Confidential", # Company is now VISIBLE
-            'source_type': row['source_type'],
-            'required_skills': str(row['unified_skills']) if row['source_type'] == 'Premium' else "See Description",
-            
-            # UI Fields (Required for the Frontend to look good)
-            'location': random.choice(LOCATIONS),
-            'posted': random.choice(TIMES),
-            'logo': logo_text,
-            'color': random.choice(COLORS)
-        })
-    return jsonify(out)
+    """
+    Returns a page of the job feed with UI enhancements (a JSON list, as before).
+    Query params: limit (default 20, max 100), source_type (Premium / General)
+    and cursor. The cursor of the next page is sent in the X-Next-Cursor and
+    Link headers; there is none on the last page.
+    """
+    source_type = request.args.get('source_type') or None
+    try:
+        limit = min(max(int(request.args.get('limit', FEED_DEFAULT_LIMIT)), 1), FEED_MAX_LIMIT)
+        cursor = max(int(request.args.get('cursor', 0)), 0)
+    except ValueError:
+        return jsonify({'error': 'limit and cursor must be integers'}), 400
 
-@app.route('/api/recommend', methods=['POST'])
-def recommend():
-    """Search endpoint for the Frontend."""
-    data = request.json
-    query = data.get('query', '')
-    
-    if not query:
-        return jsonify({'results': []})
+    # Same artifact + same params -> same bytes, so a revalidation never touches the feed
+    # (werkzeug compares unquoted tags; set_etag() adds the quotes on the way out)
+    tag = job_feed.etag(source_type, cursor, limit)
+    headers = {'Cache-Control': f'public, max-age={FEED_MAX_AGE}'}
+    if request.if_none_match.contains(tag):
+        response = Response(status=304, headers=headers)
+        response.set_etag(tag)
+        return response
 
-    query_vec = model.encode([query])
-    
-    # Calculate Similarity
-    job_scores = cosine_similarity(query_vec, job_embeddings)[0]
-    top_job_indices = job_scores.argsort()[-10:][::-1] # Top 10 matches
-    
+    with span('feed_page'):
+        body, next_cursor = job_feed.page(source_type, cursor, limit)
+    if next_cursor is not None:
+        params = f"cursor={next_cursor}&limit={limit}" + (f"&source_type={source_type}" if source_type else "")
+        headers['X-Next-Cursor'] = str(next_cursor)
+        headers['Link'] = f'<{request.path}?{params}>; rel="next"'
+    response = Response(body, mimetype='application/json', headers=headers)
+    response.set_etag(tag)
+    return response
+
+def find_jobs(query_vecs, query_texts, k=10, filter_skills=None, filter_mode='any'):
+    """
+    [(ids, scores, matched_skills), ...] per query. With a skill index the
+    score fuses semantic similarity with skill overlap, and a skill filter
+    restricts scoring to the matching jobs; otherwise it is plain top_k().
+    """
+    if skill_index is None:
+        with span('search'):
+            return [(ids, scores, None) for ids, scores in top_k(job_art, query_vecs, k=k, index=job_index, nprobe=NPROBE)]
+    with span('extract_skills'):
+        filter_sids = skill_index.skill_ids(filter_skills) if filter_skills else None
+        query_sids = [skill_index.extract_ids(text) for text in query_texts]
+    with span('search'):
+        return [skill_index.hybrid_top_k(job_art, job_index, vec, sids, k=k, nprobe=NPROBE,
+                                         filter_sids=filter_sids, filter_mode=filter_mode)
+                for vec, sids in zip(np.atleast_2d(query_vecs), query_sids)]
+
+def search_results(top_job_indices, top_scores, matched_skills=None):
+    """Formats one query's matches from find_jobs() for the search results UI."""
+    with span('format'):
+        rows = jobs_df.rows(top_job_indices)
     jobs_list = []
-    for idx in top_job_indices:
-        job = jobs_df.iloc[idx]
+    for rank, (row, job, score) in enumerate(zip(top_job_indices, rows, top_scores)):
         company = job['unified_company']
         logo_text = company[:2].upper() if company and isinstance(company, str) else "AI"
 
@@ -105,7 +216,9 @@ def recommend():
             'job_id': str(job['unified_id']),
             'title': job['unified_title'],
             'company': company if company else "Confidential",
-            'match_score': round(float(job_scores[idx]) * 100, 1),
+            'match_score': round(float(score) * 100, 1),
+            'matched_skills': matched_skills[rank] if matched_skills else [],
+            'duplicates': duplicates.count(row) if duplicates is not None else 0,
             
             # UI Specifics for Search Results
             'location': "Recommended Match",
@@ -114,22 +227,151 @@ def recommend():
             'color': "bg-brand text-white", # Highlight matched jobs in Blue
             'source_type': job['source_type']
         })
+    return jobs_list
+
+@app.route('/api/recommend', methods=['POST'])
+@requires_models
+def recommend():
+    """
+    Search endpoint for the Frontend.
+    Optional: "skills": ["python", "sql"] (or "python; sql") to only return jobs
+    with those skills, and "skills_mode": "any" | "all".
+    """
+    data = request.json
+    query = data.get('query', '')
+    skills = data.get('skills') or None
+    skills_mode = 'all' if data.get('skills_mode') == 'all' else 'any'
     
-    return jsonify({'results': jobs_list})
+    if not query and skills:
+        query = skills if isinstance(skills, str) else " ".join(map(str, skills))
+    if not query:
+        return jsonify({'results': []})
+
+    # Top 10 matches (IVF index if available, exact scan otherwise), cached per query
+    filter_key = tuple(skill_index.skill_ids(skills)) if skills and skill_index is not None else None
+    def compute():
+        with span('encode'):
+            query_vec = query_cache.embedding(query)
+        return search_results(*find_jobs(query_vec, [query], k=10, filter_skills=skills, filter_mode=skills_mode)[0])
+
+    results = query_cache.results('jobs', job_art.version, query, (10, NPROBE, filter_key, skills_mode), compute)
+    with span('serialize'):
+        return jsonify({'results': results})
+
+MAX_BATCH_QUERIES = 1000
+
+@app.route('/api/recommend/batch', methods=['POST'])
+@requires_models
+def recommend_batch():
+    """Many searches in one POST: {"queries": [...], "k": 10} -> {"results": [[...], ...]}."""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Send a JSON object: {"queries": [...], "k": 10}'}), 400
+    queries = data.get('queries', [])
+    if not isinstance(queries, list) or len(queries) > MAX_BATCH_QUERIES:
+        return jsonify({'error': f'queries must be a list of at most {MAX_BATCH_QUERIES} strings'}), 400
+    try:
+        k = min(max(int(data.get('k', 10)), 1), 100)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'k must be an integer'}), 400
+
+    # Serve what is cached, then encode and score all the misses in one go
+    results = [[] for _ in queries]
+    todo = {}
+    for i, q in enumerate(queries):
+        if not (isinstance(q, str) and q.strip()):
+            continue  # empty queries just get no results
+        key = query_cache.result_key('jobs', job_art.version, q, k, NPROBE, None, 'any')
+        cached = query_cache.results_cache.get(key)
+        if cached is not None:
+            results[i] = cached
+        else:
+            todo.setdefault(key, []).append(i)
+
+    if todo:
+        texts = [queries[idxs[0]] for idxs in todo.values()]
+        with span('encode'):
+            query_vecs = query_cache.embeddings(texts)
+        matches = find_jobs(query_vecs, texts, k=k)
+        for (key, idxs), match in zip(todo.items(), matches):
+            formatted = search_results(*match)
+            query_cache.results_cache.put(key, formatted)
+            for i in idxs:
+                results[i] = formatted
+    with span('serialize'):
+        return jsonify({'results': results})
 
 @app.route('/api/candidates', methods=['GET'])
+@requires_models
 def list_candidates():
-    out = candidates_df[['candidate_id', 'first_name', 'email', 'skills']].fillna('').to_dict(orient='records')
+    out = candidates_df.records(columns=['candidate_id', 'first_name', 'email', 'skills'])
     return jsonify(out)
 
+# --- API: CANDIDATE <-> JOB MATCHES ---
+# Both directions are read from the table train_model.py precomputes
+# (matching.py): an id lookup plus one k-wide row, no scoring per request.
+def match_limit():
+    return min(max(int(request.args.get('k', 10)), 1), match_table.k)
+
+@app.route('/api/candidates/<candidate_id>/matches', methods=['GET'])
+@requires_models
+def candidate_matches(candidate_id):
+    """Best jobs for a candidate (same job format as search results). Query param: k."""
+    if match_table is None:
+        return jsonify({'error': "Match table not built. Run 'train_model.py'."}), 503
+    row = match_table.candidate_row(candidate_id)
+    if row is None:
+        return jsonify({'error': f"Unknown candidate '{candidate_id}'"}), 404
+    try:
+        k = match_limit()
+    except ValueError:
+        return jsonify({'error': 'k must be an integer'}), 400
+    with span('matches'):
+        job_rows, scores = match_table.jobs_for(row, k)
+    return jsonify({'candidate_id': candidate_id, 'matches': search_results(job_rows, scores)})
+
+@app.route('/api/jobs/<path:job_id>/candidates', methods=['GET'])
+@requires_models
+def job_candidates(job_id):
+    """Best candidates for a job. Query param: k."""
+    if match_table is None:
+        return jsonify({'error': "Match table not built. Run 'train_model.py'."}), 503
+    row = match_table.job_row(job_id)
+    if row is None:
+        return jsonify({'error': f"Unknown job '{job_id}'"}), 404
+    try:
+        k = match_limit()
+    except ValueError:
+        return jsonify({'error': 'k must be an integer'}), 400
+    with span('matches'):
+        cand_rows, scores = match_table.candidates_for(row, k)
+        rows = candidates_df.rows(cand_rows, columns=['candidate_id', 'first_name', 'email', 'skills'])
+    results = [dict(c, match_score=round(float(score) * 100, 1)) for c, score in zip(rows, scores)]
+    return jsonify({'job_id': job_id, 'candidates': results})
+
 # --- API: POSTS ---
 @app.route('/api/posts', methods=['GET'])
 def get_posts():
-    return jsonify(posts)
+    """
+    Newest posts first (a JSON list, as before). Query params: limit
+    (default 20, max 100) and cursor; the next page's cursor is sent in the
+    X-Next-Cursor and Link headers, and there is none on the last page.
+    """
+    try:
+        limit = min(max(int(request.args.get('limit', POSTS_DEFAULT_LIMIT)), 1), POSTS_MAX_LIMIT)
+        with span('posts_page'):
+            page, next_cursor = posts.page(request.args.get('cursor') or None, limit)
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer and cursor a value from X-Next-Cursor'}), 400
+    response = jsonify(page)
+    if next_cursor is not None:
+        response.headers['X-Next-Cursor'] = next_cursor
+        response.headers['Link'] = f'</api/posts?cursor={next_cursor}&limit={limit}>; rel="next"'
+    return response
 
 @app.route('/api/posts', methods=['POST'])
 def create_post():
-    data = request.json
+    data = request.get_json(silent=True) or {}
     new_post = {
         "id": str(uuid.uuid4()),
         "author": "Current User", # In a real app, get from session
@@ -140,73 +382,36 @@ def create_post():
         "likes": 0,
         "comments": 0,
         "shares": 0,
-        "time": "Just now"
     }
-    posts.insert(0, new_post) # Add to top
-    return jsonify(new_post)
+    return jsonify(posts.create(new_post))
 
 @app.route('/api/posts/<post_id>', methods=['DELETE'])
 def delete_post(post_id):
-    global posts
-    posts = [p for p in posts if p['id'] != post_id]
+    posts.delete(post_id)
     return jsonify({'success': True})
-# --- HELPER: Extract Text from Resume ---
-def extract_text_from_file(file, filename):
-    text = ""
-    try:
-        if filename.endswith('.pdf'):
-            reader = pypdf.PdfReader(file)
-            for page in reader.pages:
-                text += page.extract_text() + " "
-        elif filename.endswith('.docx'):
-            doc = docx.Document(file)
-            for para in doc.paragraphs:
-                text += para.text + " "
-        elif filename.endswith('.txt'):
-            text = file.read().decode('utf-8')
-    except Exception as e:
-        print(f"Error parsing file: {e}")
-        return ""
-    
-    # Basic cleaning: Remove newlines and extra spaces
-    return " ".join(text.split())
 
-# --- API: Resume Upload & Match ---
-@app.route('/api/upload-resume', methods=['POST'])
-def upload_resume():
-    if 'resume' not in request.files:
-        return jsonify({'error': 'No file part'}), 400
-    
-    file = request.files['resume']
-    if file.filename == '':
-        return jsonify({'error': 'No selected file'}), 400
-
-    # 1. Extract Text from the uploaded file
-    print(f"DEBUG: Processing upload for {file.filename}")
-    resume_text = extract_text_from_file(file, file.filename)
-    
-    if not resume_text:
-        print("DEBUG: Resume text extraction failed")
-        return jsonify({'error': 'Could not extract text from file'}), 400
-    
-    print(f"DEBUG: Extracted text preview: {resume_text[:50]}...")
+# --- RESUME PROCESSING ---
+# Parsing happens in a process pool (with size/page/time limits) and the text is
+# cached by file hash. Async uploads run on this worker's threads and their
+# state is kept in SQLite, so a poll can be answered by any serve.py worker.
+resume_processor = ResumeProcessor()
+resume_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='resume')
+resume_jobs = ResumeJobStore()
+app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_BYTES + 1024 * 1024  # room for the multipart envelope
 
-    # 2. (Optional) Intelligent Truncation 
-    # Since resumes are long, we focus on the first 500 words or look for "Skills" keyword
-    # But for this prototype, let's feed the first 1000 chars to the AI to get the gist
-    # OR: If your resumes are standard, the AI often understands the whole context better.
-    
-    # 3. Create Embedding from Resume Text
+def resume_payload(resume_text):
+    """Encode the resume text and find its best jobs, in the format the frontend expects."""
     # The AI converts your Resume -> Math Vector
-    resume_vec = model.encode([resume_text])
+    with span('encode'):
+        resume_vec = encoder.encode_documents([resume_text])
     
-    # 4. Find Matching Jobs (Cosine Similarity)
-    job_scores = cosine_similarity(resume_vec, job_embeddings)[0]
-    top_job_indices = job_scores.argsort()[-10:][::-1] # Top 10
+    # Find Matching Jobs (Cosine Similarity, fused with skill overlap when the skill index exists)
+    top_job_indices, top_scores, matched_skills = find_jobs(resume_vec, [resume_text], k=10)[0] # Top 10
     
+    with span('format'):
+        rows = jobs_df.rows(top_job_indices)
     jobs_list = []
-    for idx in top_job_indices:
-        job = jobs_df.iloc[idx]
+    for rank, (row, job, score) in enumerate(zip(top_job_indices, rows, top_scores)):
         company = job['unified_company']
         logo_text = company[:2].upper() if company and isinstance(company, str) else "CV"
 
@@ -214,7 +419,9 @@ def upload_resume():
             'job_id': str(job['unified_id']),
             'title': job['unified_title'],
             'company': company if company else "Confidential",
-            'match_score': round(float(job_scores[idx]) * 100, 1),
+            'match_score': round(float(score) * 100, 1),
+            'matched_skills': matched_skills[rank] if matched_skills else [],
+            'duplicates': duplicates.count(row) if duplicates is not None else 0,
             'location': "Resume Match",
             'posted': "Best fit for you",
             'logo': logo_text,
@@ -222,11 +429,143 @@ def upload_resume():
             'source_type': job['source_type']
         })
 
-    # Return results in the format the frontend expects
-    return jsonify({
+    with span('extract_skills'):
+        extracted_skills = skill_index.extract(resume_text) if skill_index is not None else []
+    return {
         'results': jobs_list,
         'extracted_text_preview': resume_text[:200] + "...",
-        'extracted_skills': [] # Frontend expects this key, even if empty
+        'extracted_skills': extracted_skills
+    }
+
+def match_resume(data, filename):
+    """Extract (pool + cache) -> encode -> match. Raises ResumeError."""
+    with span('parse_resume'):
+        file_hash, resume_text = resume_processor.extract(data, filename)
+    # Same file against the same jobs artifact -> same answer
+    return query_cache.results('resume', job_art.version, file_hash, (10, NPROBE), lambda: resume_payload(resume_text))
+
+def run_resume_job(job_id, data, filename):
+    """Background half of an async upload: records the payload or the error for any worker to read."""
+    try:
+        resume_jobs.finish(job_id, match_resume(data, filename))
+    except ResumeError as e:
+        resume_jobs.fail(job_id, str(e), e.status)
+    except Exception as e:
+        print(f"❌ Error: async resume job {job_id} failed: {e}")
+        resume_jobs.fail(job_id, 'Resume processing failed', 500)
+
+# --- API: Resume Upload & Match ---
+@app.route('/api/upload-resume', methods=['POST'])
+@requires_models
+def upload_resume():
+    """
+    Synchronous by default. With ?async=1 (or an 'async' form field) it
+    returns 202 + a job id straight away; poll GET /api/upload-resume/<job_id>.
+    """
+    if 'resume' not in request.files:
+        return jsonify({'error': 'No file part'}), 400
+    
+    file = request.files['resume']
+    if file.filename == '':
+        return jsonify({'error': 'No selected file'}), 400
+
+    data = file.read()
+    try:
+        resume_processor.check(data, file.filename)
+    except ResumeError as e:
+        return jsonify({'error': str(e)}), e.status
+
+    if str(request.args.get('async', request.form.get('async', ''))).lower() in ('1', 'true', 'yes'):
+        job_id = str(uuid.uuid4())
+        resume_jobs.create(job_id)
+        resume_executor.submit(run_resume_job, job_id, data, file.filename)
+        return jsonify({'job_id': job_id, 'status': 'pending'}), 202
+
+    try:
+        payload = match_resume(data, file.filename)
+    except ResumeError as e:
+        return jsonify({'error': str(e)}), e.status
+    with span('serialize'):
+        return jsonify(payload)
+
+@app.route('/api/upload-resume/<job_id>', methods=['GET'])
+def upload_resume_status(job_id):
+    """Result of an async upload: 202 while pending, then the normal payload."""
+    job = resume_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown or expired job id'}), 404
+    if job['status'] == 'pending':
+        return jsonify({'job_id': job_id, 'status': 'pending'}), 202
+    if job['status'] == 'error':
+        return jsonify({'job_id': job_id, 'status': 'error', 'error': job['error']}), job['http_status']
+    return jsonify(dict(job['payload'], job_id=job_id, status='done'))
+
+# --- API: SKILL GAP ---
+TRAINING_FIELDS = ('module_id', 'title', 'description', 'duration_days')
+
+def training_entry(row, covers, score):
+    # trainings.csv may lack optional columns (duration_days): they come back as None
+    training = tr_df.row(row, columns=[c for c in TRAINING_FIELDS if c in tr_df])
+    for c in TRAINING_FIELDS:
+        training.setdefault(c, None)
+    training['covers'] = covers
+    training['similarity'] = round(score * 100, 1) if score is not None else None
+    return training
+
+@app.route('/api/skill-gap', methods=['POST'])
+@requires_models
+def skill_gap_report():
+    """
+    Skills a candidate lacks for a job and the training modules that cover them.
+    JSON body: {"job_id": ..., plus "candidate_id", "resume_text" or "skills": [...]},
+    or a multipart upload with a 'resume' file and a 'job_id' field.
+    """
+    if skill_index is None or skill_gap is None:
+        return jsonify({'error': "Skill-gap data not built. Run 'train_model.py'."}), 503
+    data = request.get_json(silent=True) or {}
+    job_id = data.get('job_id') or request.form.get('job_id')
+    if not job_id:
+        return jsonify({'error': 'job_id is required'}), 400
+    job_row = skill_gap.job_row(job_id)
+    if job_row is None:
+        return jsonify({'error': f"Unknown job '{job_id}'"}), 404
+
+    if 'resume' in request.files:
+        file = request.files['resume']
+        try:
+            with span('parse_resume'):
+                _, resume_text = resume_processor.extract(file.read(), file.filename)
+        except ResumeError as e:
+            return jsonify({'error': str(e)}), e.status
+        have = skill_index.extract_ids(resume_text)
+    elif data.get('candidate_id') is not None:
+        cand_row = find_row(*candidate_keys, data['candidate_id']) if candidate_keys is not None else None
+        if cand_row is None:
+            return jsonify({'error': f"Unknown candidate '{data['candidate_id']}'"}), 404
+        have = skill_index.skill_ids(str(candidates_df['skills'][cand_row]))
+    elif data.get('resume_text'):
+        have = skill_index.extract_ids(data['resume_text'])
+    elif data.get('skills'):
+        have = skill_index.skill_ids(data['skills'])
+    else:
+        return jsonify({'error': 'Send candidate_id, resume_text, skills or a resume file'}), 400
+
+    with span('skill_gap'):
+        target, missing, picked, uncovered = skill_gap.plan(skill_index, job_row, have)
+        trainings = [training_entry(t, [skill_index.vocab[s] for s in covers], score) for t, covers, score in picked]
+        # Nothing in the catalogue teaches the missing skills: fall back to the modules closest to the job
+        related = [training_entry(t, [], score) for t, score in skill_gap.related(job_row, exclude={p[0] for p in picked})] \
+            if missing and not trainings else []
+    return jsonify({
+        'job_id': job_id,
+        'job_skills': [skill_index.vocab[s] for s in target],
+        'matched_skills': [skill_index.vocab[s] for s in target if s not in missing],
+        'missing_skills': [skill_index.vocab[s] for s in missing],
+        'trainings': trainings,
+        'uncovered_skills': [skill_index.vocab[s] for s in uncovered],
+        'related_trainings': related,
     })
+
 if __name__ == "__main__":
-    app.run(port=5000, debug=True)
\ No newline at end of file
+    # The reloader would run a second process that loads everything again; opt in with SKILLBRIDGE_RELOAD=1
+    app.run(port=5000, debug=True, use_reloader=os.environ.get('SKILLBRIDGE_RELOAD') == '1')
\ No newline at end of file
@@ -0,0 +1,630 @@
+import os
+import json
+import time
+import shutil
+import pickle
+import hashlib
+import numpy as np
+
+# --- ARTIFACT LAYOUT ---
+# Every model artifact (jobs, candidates, trainings) is a folder under models/:
+#
+#   models/jobs/
+#   ├── manifest.json          rows, dim, dtype, model name, checksums, columns
+#   ├── emb.npy                embedding matrix, opened with np.load(mmap_mode='r')
+#   ├── emb_scale.npy          int8 only: one float32 scale per row
+#   ├── emb_full.npy           int8/float16 only: float32 copy used for re-scoring
+#   └── meta/
+#       ├── <col>.npy          numeric column
+#       ├── <col>.idx.npy      string column: int64 offsets (rows + 1)
+#       └── <col>.bin          string column: utf-8 bytes
+#
+# Nothing is unpickled at load time. The OS maps the files into memory, so
+# several Flask workers on one box share the same page-cache pages.
+# pandas is only imported by the training-side helpers that take or build
+# DataFrames, so serving code that reads artifacts never loads it.
+#
+# With emb_dtype 'int8' or 'float16' searches scan the compact emb.npy and
+# only re-score their best candidates against emb_full.npy, so the float32
+# copy stays on disk and only a few of its rows are ever paged in.
+
+FORMAT_VERSION = 1
+MODELS_DIR = os.environ.get('SKILLBRIDGE_MODELS_DIR', 'models')
+EMB_DTYPES = ('float32', 'float16', 'int8')
+SCALE_FILE = 'emb_scale.npy'
+FULL_EMB_FILE = 'emb_full.npy'
+
+
+def artifact_path(name, models_dir=None):
+    return os.path.join(models_dir or MODELS_DIR, name)
+
+
+def file_checksum(path, block_size=1 << 20):
+    """sha256 of a file, read in 1MB blocks so big matrices never sit in RAM."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def meta_checksum(meta_dir):
+    """sha256 over every metadata file (names and contents), in name order."""
+    h = hashlib.sha256()
+    for fname in sorted(os.listdir(meta_dir)):
+        h.update(f"{fname}\0{file_checksum(os.path.join(meta_dir, fname))}\0".encode('utf-8'))
+    return h.hexdigest()
+
+
+# --- COLUMNS ---
+class StringColumn:
+    """
+    A string column backed by an offsets array and one utf-8 blob.
+    Values are only decoded when a row is actually asked for.
+    """
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, (int, np.integer)):
+            if i < 0:
+                i += len(self)
+            start, end = self.offsets[i], self.offsets[i + 1]
+            return bytes(self.blob[start:end]).decode('utf-8')
+        if isinstance(i, slice):
+            i = range(*i.indices(len(self)))
+        return [self[int(j)] for j in i]
+
+    def tolist(self):
+        return self[:]
+
+
+def _to_text(value):
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (list, tuple)):
+        return "; ".join(str(v) for v in value)
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return ""
+    return str(value)
+
+
+def encode_strings(values):
+    """Turns an iterable of values into (offsets, blob) for a StringColumn."""
+    encoded = [_to_text(v).encode('utf-8') for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    if encoded:
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    blob = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    return offsets, blob
+
+
+def _python_value(value):
+    # numpy scalars -> plain python so rows can go straight into jsonify()
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class ColumnTable:
+    """
+    Read-only, column-oriented view of an artifact's metadata.
+    Columns are opened lazily and rows are built on demand, which replaces
+    the old pickled DataFrame + iloc access.
+    """
+
+    def __init__(self, columns, loaders=None, num_rows=0):
+        self._columns = dict(columns)
+        self._loaders = loaders or {}
+        self._order = list(self._columns) + [c for c in self._loaders if c not in self._columns]
+        self._num_rows = num_rows
+
+    @classmethod
+    def from_frame(cls, df):
+        columns = {}
+        for col in df.columns:
+            if column_kind(df[col]) == 'numeric':
+                columns[col] = df[col].to_numpy()
+            else:
+                columns[col] = StringColumn(*encode_strings(df[col].tolist()))
+        return cls(columns, num_rows=len(df))
+
+    @property
+    def columns(self):
+        return list(self._order)
+
+    def __len__(self):
+        return self._num_rows
+
+    def __contains__(self, name):
+        return name in self._columns or name in self._loaders
+
+    def __getitem__(self, name):
+        if name not in self._columns:
+            if name not in self._loaders:
+                raise KeyError(name)
+            self._columns[name] = self._loaders.pop(name)()
+        return self._columns[name]
+
+    def row(self, i, columns=None):
+        i = int(i)
+        return {c: _python_value(self[c][i]) for c in (columns or self._order)}
+
+    def rows(self, indices, columns=None):
+        return [self.row(i, columns) for i in indices]
+
+    def records(self, columns=None):
+        return self.rows(range(len(self)), columns)
+
+    def to_frame(self, columns=None):
+        import pandas as pd
+        cols = columns or self._order
+        return pd.DataFrame({c: (self[c].tolist() if isinstance(self[c], StringColumn) else self[c]) for c in cols})
+
+
+# --- QUANTIZATION ---
+def quantize_int8(emb):
+    """Symmetric per-row scalar quantization: emb ~= codes * scale[:, None]."""
+    emb = np.atleast_2d(np.asarray(emb, dtype=np.float32))
+    scale = np.abs(emb).max(axis=1) / 127.0 if emb.shape[1] else np.ones(len(emb), dtype=np.float32)
+    scale[scale == 0] = 1.0
+    codes = np.clip(np.rint(emb / scale[:, None]), -127, 127).astype(np.int8)
+    return codes, scale.astype(np.float32)
+
+
+class QuantizedMatrix:
+    """
+    int8 codes plus one scale per row, indexed like the float matrix it
+    replaces (emb[i], emb[a:b], emb[ids]); rows are dequantized on access.
+    """
+
+    def __init__(self, codes, scale):
+        self.codes = codes
+        self.scale = scale
+        self.shape = codes.shape
+        self.dtype = np.dtype(np.float32)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, key):
+        codes = np.asarray(self.codes[key], dtype=np.float32)
+        scale = np.asarray(self.scale[key], dtype=np.float32)
+        return codes * (scale[..., None] if codes.ndim > 1 else scale)
+
+    def __array__(self, dtype=None, copy=None):
+        out = self[:]
+        return out.astype(dtype) if dtype is not None else out
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + self.scale.nbytes
+
+
+# --- STREAMING WRITERS ---
+class NpyAppender:
+    """
+    Writes a .npy file block by block, so arrays bigger than RAM can be
+    produced one chunk at a time. A fixed-size header is reserved up front
+    and patched with the final row count on close().
+    """
+    HEADER_LEN = 128
+
+    def __init__(self, path, dtype, row_shape=()):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.row_shape = tuple(row_shape)
+        self.rows = 0
+        self._f = open(path, 'wb')
+        self._f.write(self._header(0))
+
+    def _header(self, rows):
+        header = "{'descr': %r, 'fortran_order': False, 'shape': %r, }" % (
+            np.lib.format.dtype_to_descr(self.dtype), (rows,) + self.row_shape)
+        header = header.ljust(self.HEADER_LEN - 11) + '\n'
+        return b'\x93NUMPY\x01\x00' + np.uint16(len(header)).tobytes() + header.encode('latin1')
+
+    def append(self, block):
+        block = np.ascontiguousarray(block, dtype=self.dtype)
+        # An empty block has no rows to infer (-1 cannot be solved when a row holds 0 values)
+        block = block.reshape(((-1,) if block.size else (0,)) + self.row_shape)
+        self._f.write(block.tobytes())
+        self.rows += len(block)
+        return self.rows
+
+    def view(self):
+        """Read-only map of the rows written so far (the file stays open for appends)."""
+        self._f.flush()
+        if self.rows == 0 or self.dtype.itemsize == 0:
+            return np.zeros((self.rows,) + self.row_shape, dtype=self.dtype)
+        return np.memmap(self.path, dtype=self.dtype, mode='r', offset=self.HEADER_LEN,
+                         shape=(self.rows,) + self.row_shape)
+
+    def close(self):
+        if self._f.closed:
+            return
+        self._f.seek(0)
+        self._f.write(self._header(self.rows))
+        self._f.close()
+
+
+class _StringColumnWriter:
+    def __init__(self, meta_dir, col):
+        self.offsets = NpyAppender(os.path.join(meta_dir, f"{col}.idx.npy"), np.int64)
+        self.offsets.append([0])
+        self.blob = open(os.path.join(meta_dir, f"{col}.bin"), 'wb')
+        self.size = 0
+
+    def append(self, values):
+        offsets, blob = encode_strings(values)
+        self.offsets.append(offsets[1:] + self.size)
+        self.blob.write(blob.tobytes())
+        self.size += len(blob)
+
+    def close(self):
+        self.offsets.close()
+        self.blob.close()
+
+
+class _NumericColumnWriter:
+    def __init__(self, meta_dir, col, dtype):
+        self.out = NpyAppender(os.path.join(meta_dir, f"{col}.npy"), dtype)
+
+    def append(self, values):
+        import pandas as pd
+        self.out.append(pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=self.out.dtype))
+
+    def close(self):
+        self.out.close()
+
+
+def column_kind(series):
+    import pandas as pd
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return 'numeric'
+    return 'string'
+
+
+def _column_loader(meta_dir, col, kind):
+    if kind == 'string':
+        def load():
+            offsets = np.load(os.path.join(meta_dir, f"{col}.idx.npy"), mmap_mode='r')
+            blob_path = os.path.join(meta_dir, f"{col}.bin")
+            if os.path.getsize(blob_path) == 0:
+                blob = np.zeros(0, dtype=np.uint8)
+            else:
+                blob = np.memmap(blob_path, dtype=np.uint8, mode='r')
+            return StringColumn(offsets, blob)
+    else:
+        def load():
+            return np.load(os.path.join(meta_dir, f"{col}.npy"), mmap_mode='r')
+    return load
+
+
+# --- ARTIFACTS ---
+class Artifact:
+    """An embedding matrix plus its metadata table and manifest."""
+
+    def __init__(self, name, manifest, meta, emb, path=None, full=None):
+        self.name = name
+        self.manifest = manifest
+        self.meta = meta
+        self.emb = emb
+        self.path = path
+        # float32 rows for re-scoring when emb is int8/float16 (None otherwise)
+        self.full = full
+
+    def __len__(self):
+        return len(self.meta)
+
+    @property
+    def version(self):
+        """
+        Identifies this exact build of the artifact (used for cache keys, ETags
+        and sidecar staleness checks). Covers the embeddings and the metadata,
+        so a retrain that only changes a column still gets a new version.
+        """
+        checksum, meta = self.manifest.get('checksum'), self.manifest.get('meta_checksum')
+        if checksum and meta:
+            return hashlib.sha256(f"{checksum}|{meta}".encode('utf-8')).hexdigest()
+        return checksum or self.manifest.get('created_at')
+
+    @property
+    def emb_bytes(self):
+        """Bytes of the matrix that searches scan (codes + scales for int8)."""
+        return int(self.emb.nbytes)
+
+    def similarity(self, query_vecs, block_size=65536, full=False):
+        """
+        Cosine similarity of each query against every row.
+        Rows are stored L2-normalised, so this is a blocked dot product that
+        upcasts one block at a time instead of copying the whole matrix.
+        full=True scans the float32 copy instead of the compact matrix.
+        """
+        emb = self.full if full and self.full is not None else self.emb
+        q = np.atleast_2d(np.asarray(query_vecs, dtype=np.float32))
+        q = q / np.maximum(np.linalg.norm(q, axis=1, keepdims=True), 1e-12)
+        out = np.empty((q.shape[0], len(emb)), dtype=np.float32)
+        for start in range(0, len(emb), block_size):
+            block = np.asarray(emb[start:start + block_size], dtype=np.float32)
+            out[:, start:start + len(block)] = q @ block.T
+        return out
+
+    def exact_scores(self, query_vec, ids):
+        """Full-precision cosine scores of one query against the given rows (sorted ids read fastest)."""
+        q = np.asarray(query_vec, dtype=np.float32).reshape(-1)
+        q = q / max(float(np.linalg.norm(q)), 1e-12)
+        emb = self.full if self.full is not None else self.emb
+        if not len(ids):
+            return np.zeros(0, dtype=np.float32)
+        return np.asarray(emb[ids], dtype=np.float32) @ q
+
+
+def _as_matrix(emb, rows, dim=None):
+    emb = np.asarray(emb, dtype=np.float32)
+    if emb.size == 0:
+        # No vectors (e.g. an empty candidates.csv): keep the artifact's dim so it still loads as (0, dim)
+        return np.zeros((0, dim if dim is not None else (emb.shape[1] if emb.ndim == 2 else 0)), dtype=np.float32)
+    if emb.ndim != 2:
+        emb = emb.reshape(rows, -1) if rows else np.zeros((0, dim or 0), dtype=np.float32)
+    return emb
+
+
+class ArtifactWriter:
+    """
+    Builds an artifact folder chunk by chunk: append(df_chunk, emb_chunk)
+    streams rows straight to disk, so memory stays flat however big the
+    corpus is. Column types are fixed by the first chunk. Everything is
+    written to a temp folder and swapped in on close(), so a crash never
+    leaves a half written artifact behind.
+    """
+
+    def __init__(self, name, model_name, emb_dtype='float32', models_dir=None, dim=None):
+        if emb_dtype not in EMB_DTYPES:
+            raise ValueError(f"emb_dtype must be one of {EMB_DTYPES}, got {emb_dtype!r}")
+        self.name = name
+        self.model_name = model_name
+        self.emb_dtype = emb_dtype
+        self.dim = dim
+        self.rows = 0
+        self.final_dir = artifact_path(name, models_dir)
+        self.tmp_dir = f"{self.final_dir}.tmp-{os.getpid()}"
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        os.makedirs(os.path.join(self.tmp_dir, 'meta'))
+        self._emb = None
+        self._scale = None
+        self._full = None
+        self._columns = None
+        self._writers = {}
+
+    def _open_columns(self, df):
+        self._columns = {col: column_kind(df[col]) for col in df.columns}
+        meta_dir = os.path.join(self.tmp_dir, 'meta')
+        for col, kind in self._columns.items():
+            if kind == 'string':
+                self._writers[col] = _StringColumnWriter(meta_dir, col)
+            else:
+                self._writers[col] = _NumericColumnWriter(meta_dir, col, df[col].dtype)
+
+    def _open_emb(self, dim):
+        self.dim = dim
+        self._emb = NpyAppender(os.path.join(self.tmp_dir, 'emb.npy'), self.emb_dtype, (dim,))
+        if self.emb_dtype == 'int8':
+            self._scale = NpyAppender(os.path.join(self.tmp_dir, SCALE_FILE), np.float32)
+        if self.emb_dtype != 'float32':
+            self._full = NpyAppender(os.path.join(self.tmp_dir, FULL_EMB_FILE), np.float32, (dim,))
+
+    def append(self, df, emb):
+        emb = _as_matrix(emb, len(df), self.dim)
+        if len(emb) != len(df):
+            raise ValueError(f"{self.name}: {len(df)} rows but {len(emb)} embeddings")
+        if self._emb is None:
+            self._open_emb(self.dim or emb.shape[1])
+        if self._columns is None:
+            self._open_columns(df)
+
+        norms = np.linalg.norm(emb, axis=1, keepdims=True)
+        emb = (emb / np.maximum(norms, 1e-12)).astype(np.float32)
+        if self.emb_dtype == 'int8':
+            codes, scale = quantize_int8(emb)
+            self._emb.append(codes)
+            self._scale.append(scale)
+        else:
+            self._emb.append(emb.astype(self.emb_dtype))
+        if self._full is not None:
+            self._full.append(emb)
+        for col, writer in self._writers.items():
+            writer.append(df[col].tolist() if self._columns[col] == 'string' else df[col].to_numpy())
+        self.rows += len(df)
+
+    def close(self, extra=None):
+        if self._emb is None:
+            self._open_emb(self.dim or 0)
+        if self._columns is None:
+            self._columns = {}
+        for out in [self._emb, self._scale, self._full]:
+            if out is not None:
+                out.close()
+        for writer in self._writers.values():
+            writer.close()
+
+        manifest = {
+            'format_version': FORMAT_VERSION,
+            'name': self.name,
+            'rows': int(self.rows),
+            'dim': int(self.dim),
+            'dtype': self.emb_dtype,
+            'normalized': True,
+            'model_name': self.model_name,
+            'checksum': file_checksum(self._emb.path),
+            'meta_checksum': meta_checksum(os.path.join(self.tmp_dir, 'meta')),
+            'columns': self._columns,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'quantization': {'scheme': 'symmetric_per_row', 'scale': SCALE_FILE} if self.emb_dtype == 'int8' else None,
+            'full_precision': FULL_EMB_FILE if self._full is not None else None,
+        }
+        if extra:
+            manifest.update(extra)
+        with open(os.path.join(self.tmp_dir, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        _swap_dir(self.tmp_dir, self.final_dir)
+        return manifest
+
+    def abort(self):
+        for out in [self._emb, self._scale, self._full] + list(self._writers.values()):
+            if out is not None:
+                out.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+
+def save_artifact(name, df, emb, model_name, emb_dtype='float32', models_dir=None, dim=None, extra=None):
+    """Writes df + emb as a versioned artifact folder in one go."""
+    writer = ArtifactWriter(name, model_name, emb_dtype=emb_dtype, models_dir=models_dir, dim=dim)
+    try:
+        writer.append(df.reset_index(drop=True), emb)
+        return writer.close(extra)
+    except BaseException:
+        writer.abort()
+        raise
+
+
+def _swap_dir(tmp_dir, final_dir):
+    old_dir = f"{final_dir}.old-{os.getpid()}"
+    if os.path.exists(final_dir):
+        os.replace(final_dir, old_dir)
+    os.replace(tmp_dir, final_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+# --- SIDECARS ---
+# Indexes and tables derived from an artifact (ivf/, skills/, matches/, gap/)
+# are stored in a subfolder of it: one .npy per array, optional JSON
+# documents (e.g. a vocabulary) and a small JSON manifest recording the
+# artifact versions they were built from. A sidecar is written to a temp
+# folder and swapped in whole; on load, a manifest that does not match the
+# loaded artifacts means the sidecar is stale and is ignored.
+
+SIDECAR_MANIFEST = 'info.json'
+
+
+def sidecar_dir(art, name):
+    """Folder of a sidecar of `art` (None for legacy pickled artifacts, which have none)."""
+    return os.path.join(art.path, name) if art.path and os.path.isdir(art.path) else None
+
+
+def save_sidecar(dirpath, arrays, manifest, manifest_name=SIDECAR_MANIFEST, documents=None):
+    """Writes arrays (<name>.npy), JSON documents (<name>.json) and the manifest, then swaps the folder in."""
+    tmp_dir = f"{dirpath}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    try:
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), array)
+        for name, doc in (documents or {}).items():
+            with open(os.path.join(tmp_dir, f"{name}.json"), 'w') as f:
+                json.dump(doc, f)
+        with open(os.path.join(tmp_dir, manifest_name), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        _swap_dir(tmp_dir, dirpath)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+def load_sidecar(dirpath, names, expect=None, stale_warning=None, manifest_name=SIDECAR_MANIFEST, documents=()):
+    """
+    (arrays, manifest) of a sidecar, arrays memory-mapped and keyed by name
+    (JSON documents included). None if the folder is missing, or if a key of
+    `expect` differs in the manifest (then `stale_warning` is printed).
+    """
+    if not dirpath or not os.path.exists(os.path.join(dirpath, manifest_name)):
+        return None
+    with open(os.path.join(dirpath, manifest_name)) as f:
+        manifest = json.load(f)
+    if any(manifest.get(key) != value for key, value in (expect or {}).items()):
+        if stale_warning:
+            print(f"⚠️ Warning: {stale_warning}")
+        return None
+    arrays = {name: np.load(os.path.join(dirpath, f"{name}.npy"), mmap_mode='r') for name in names}
+    for name in documents:
+        with open(os.path.join(dirpath, f"{name}.json")) as f:
+            arrays[name] = json.load(f)
+    return arrays, manifest
+
+
+def load_artifact(name, models_dir=None, verify=False):
+    """
+    Opens an artifact without reading it: embeddings are memory-mapped and
+    metadata columns are mapped on first access. Falls back to the old
+    models/<name>.pkl files so existing checkouts keep working.
+    Raises FileNotFoundError if neither exists.
+    """
+    path = artifact_path(name, models_dir)
+    manifest_path = os.path.join(path, 'manifest.json')
+    if not os.path.exists(manifest_path):
+        return _load_legacy_pickle(name, models_dir)
+
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if manifest.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"{name}: unsupported artifact format {manifest.get('format_version')}")
+
+    emb_path = os.path.join(path, 'emb.npy')
+    meta_dir = os.path.join(path, 'meta')
+    if verify and file_checksum(emb_path) != manifest['checksum']:
+        raise ValueError(f"{name}: checksum mismatch for {emb_path}")
+    if verify and manifest.get('meta_checksum') and meta_checksum(meta_dir) != manifest['meta_checksum']:
+        raise ValueError(f"{name}: checksum mismatch for {meta_dir}")
+    emb = np.load(emb_path, mmap_mode='r')
+    if manifest.get('quantization'):
+        emb = QuantizedMatrix(emb, np.load(os.path.join(path, manifest['quantization']['scale']), mmap_mode='r'))
+    full = None
+    if manifest.get('full_precision'):
+        full = np.load(os.path.join(path, manifest['full_precision']), mmap_mode='r')
+
+    loaders = {col: _column_loader(meta_dir, col, kind) for col, kind in manifest['columns'].items()}
+    meta = ColumnTable({}, loaders=loaders, num_rows=manifest['rows'])
+    return Artifact(name, manifest, meta, emb, path=path, full=full)
+
+
+def _load_legacy_pickle(name, models_dir=None):
+    pkl_path = os.path.join(models_dir or MODELS_DIR, f"{name}.pkl")
+    with open(pkl_path, 'rb') as f:
+        data = pickle.load(f)
+
+    df = data['df']
+    emb = _as_matrix(data['emb'], len(df))
+    emb = emb / np.maximum(np.linalg.norm(emb, axis=1, keepdims=True), 1e-12)
+    manifest = {
+        'format_version': 0,
+        'name': name,
+        'rows': int(len(df)),
+        'dim': int(emb.shape[1]),
+        'dtype': 'float32',
+        'normalized': True,
+        'model_name': None,
+        'checksum': None,
+        'columns': {},
+        'created_at': str(os.path.getmtime(pkl_path)),
+    }
+    return Artifact(name, manifest, ColumnTable.from_frame(df), emb, path=pkl_path)
+
+
+def convert_legacy(names=('candidates', 'jobs', 'trainings'), models_dir=None, model_name="all-MiniLM-L6-v2"):
+    """One-off migration of models/*.pkl into the artifact layout."""
+    for name in names:
+        pkl_path = os.path.join(models_dir or MODELS_DIR, f"{name}.pkl")
+        if not os.path.exists(pkl_path):
+            print(f"   - Skipping {name}: {pkl_path} not found")
+            continue
+        art = _load_legacy_pickle(name, models_dir)
+        save_artifact(name, art.meta.to_frame(), art.emb, model_name, models_dir=models_dir)
+        print(f"   - Converted {pkl_path} -> {artifact_path(name, models_dir)}/")
+
+
+if __name__ == "__main__":
+    convert_legacy()
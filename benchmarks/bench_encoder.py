@@ -0,0 +1,111 @@
+import sys
+import time
+import random
+import argparse
+import numpy as np
+from benchmarks.common import REPO_ROOT, latency_summary, environment, write_report
+from benchmarks import synthetic
+
+# --- ENCODER BENCHMARK + PARITY CHECK ---
+# Loads the real transformer once per backend (float32, then dynamic int8)
+# and encodes a fixed set of queries and resumes with each. Reports:
+#   - parity: cosine between the float32 and int8 vector of every text
+#     (mean / p1 / min), and exits non-zero if the minimum is below --min-cosine
+#   - latency: one query at a time (what a lone request pays), a batch of
+#     --batch-size queries (what the micro-batcher pays) and one resume at a time
+# Needs torch + sentence-transformers (no stub: there is nothing to compare).
+#
+#   python -m benchmarks.bench_encoder --queries 300 --threads 4 --out encoder.json
+
+BACKENDS = ('sentence-transformers', 'int8')
+
+
+def timed(fn, items):
+    latencies, out = [], []
+    start = time.perf_counter()
+    for item in items:
+        t0 = time.perf_counter()
+        out.append(fn(item))
+        latencies.append((time.perf_counter() - t0) * 1000.0)
+    return out, latency_summary(latencies, time.perf_counter() - start)
+
+
+def run_backend(backend, model_name, queries, resumes, batch_size, threads):
+    from encoding import load_encoder, DOCUMENT_MAX_TOKENS
+    if threads:
+        from parallel_encode import limit_torch_threads
+        limit_torch_threads(threads)
+    started = time.perf_counter()
+    model = load_encoder(model_name, backend=backend)
+    load_seconds = time.perf_counter() - started
+    model.encode(["warm up"])
+
+    single, single_stats = timed(lambda q: model.encode([q])[0], queries)
+    batches = [queries[i:i + batch_size] for i in range(0, len(queries), batch_size)]
+    _, batch_stats = timed(lambda b: model.encode(b, batch_size=len(b)), batches)
+    batch_stats['texts_per_second'] = round(batch_stats['throughput_rps'] * len(queries) / len(batches), 1)
+    docs, doc_stats = timed(lambda r: model.encode([r], max_seq_length=DOCUMENT_MAX_TOKENS)[0], resumes)
+    print(f"   {backend:<22} query p50 {single_stats['p50_ms']:>7.2f} ms  batch of {batch_size} p50 "
+          f"{batch_stats['p50_ms']:>8.2f} ms  resume p50 {doc_stats['p50_ms']:>8.2f} ms")
+    result = {'load_seconds': round(load_seconds, 3), 'query': single_stats, 'batch': batch_stats, 'resume': doc_stats}
+    return np.vstack(single), np.vstack(docs), result
+
+
+def cosine_agreement(a, b):
+    a = a / np.maximum(np.linalg.norm(a, axis=1, keepdims=True), 1e-12)
+    b = b / np.maximum(np.linalg.norm(b, axis=1, keepdims=True), 1e-12)
+    cos = (a * b).sum(axis=1)
+    return {'mean': round(float(cos.mean()), 5), 'p1': round(float(np.percentile(cos, 1)), 5),
+            'min': round(float(cos.min()), 5)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="float32 vs int8 query encoder: cosine parity and latency.")
+    parser.add_argument('--model', default="all-MiniLM-L6-v2")
+    parser.add_argument('--queries', type=int, default=200, help="Fixed query set size (resumes: a quarter of it).")
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--threads', type=int, default=None, help="torch intra-op threads (default: torch's choice).")
+    parser.add_argument('--min-cosine', type=float, default=0.98, help="Parity fails below this per-text cosine.")
+    parser.add_argument('--out', default=None, help="Write the JSON report here (default: stdout).")
+    args = parser.parse_args()
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+
+    queries = synthetic.queries(args.queries, seed=5)
+    rng = random.Random(6)
+    resumes = [" ".join(synthetic.resume_text(rng)) for _ in range(max(1, args.queries // 4))]
+
+    print(f"--- Encoding {len(queries)} queries and {len(resumes)} resumes per backend ---")
+    vectors, results = {}, {}
+    for backend in BACKENDS:
+        q, d, results[backend] = run_backend(backend, args.model, queries, resumes, args.batch_size, args.threads)
+        vectors[backend] = (q, d)
+
+    base, fast = results['sentence-transformers'], results['int8']
+    parity = {
+        'queries': cosine_agreement(vectors['sentence-transformers'][0], vectors['int8'][0]),
+        'resumes': cosine_agreement(vectors['sentence-transformers'][1], vectors['int8'][1]),
+    }
+    speedup = {stage: round(base[stage]['p50_ms'] / max(fast[stage]['p50_ms'], 1e-9), 2) for stage in ('query', 'batch', 'resume')}
+    passed = min(parity['queries']['min'], parity['resumes']['min']) >= args.min_cosine
+    print(f"   parity (cosine float32 vs int8): queries mean {parity['queries']['mean']:.4f} min {parity['queries']['min']:.4f}, "
+          f"resumes mean {parity['resumes']['mean']:.4f} min {parity['resumes']['min']:.4f}")
+    print(f"   int8 speed-up (p50): query x{speedup['query']}, batch x{speedup['batch']}, resume x{speedup['resume']}")
+
+    report = {
+        'benchmark': 'encoder',
+        'environment': environment(),
+        'config': {'model': args.model, 'queries': len(queries), 'resumes': len(resumes),
+                   'batch_size': args.batch_size, 'threads': args.threads, 'min_cosine': args.min_cosine},
+        'results': results,
+        'parity': dict(parity, passed=passed),
+        'speedup_p50': speedup,
+    }
+    write_report(report, args.out)
+    if not passed:
+        print(f"❌ Error: int8 vectors fall below cosine {args.min_cosine} of float32; keep SKILLBRIDGE_ENCODER unset.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import io
+import os
+import time
+import random
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.common import use_stub_encoder, latency_summary, environment, write_report
+from benchmarks import synthetic
+
+# --- SERVING BENCHMARK ---
+# Trains a synthetic corpus with the stub encoder, imports the real app.py
+# and drives it through Flask's test client from `--concurrency` threads.
+# Every scenario reports p50/p95/p99 latency and throughput.
+#
+#   python -m benchmarks.bench_serving --jobs 5000 --requests 300 --out serving.json
+
+
+def build_models(workdir, n_jobs):
+    import train_model
+    synthetic.write_corpus(workdir, n_jobs)
+    cwd = os.getcwd()
+    os.chdir(workdir)  # train_model reads data/ relative to the working directory
+    try:
+        return train_model.prepare_unified_model(workers=1)
+    finally:
+        os.chdir(cwd)
+
+
+def run_scenario(app, name, send, n, concurrency, warmup=5):
+    """send(client, i) -> response. Returns the latency summary for n calls."""
+    local = threading.local()
+
+    def client():
+        if not hasattr(local, 'client'):
+            local.client = app.test_client()
+        return local.client
+
+    for i in range(min(warmup, n)):
+        send(client(), i)
+
+    def one(i):
+        start = time.perf_counter()
+        resp = send(client(), i)
+        return (time.perf_counter() - start) * 1000.0, resp.status_code >= 400
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(n)))
+    wall = time.perf_counter() - start
+    summary = latency_summary([r[0] for r in results], wall, errors=sum(r[1] for r in results))
+    print(f"   {name:<22} p50 {summary['p50_ms']:>8.2f} ms  p95 {summary['p95_ms']:>8.2f} ms  "
+          f"p99 {summary['p99_ms']:>8.2f} ms  {summary['throughput_rps']:>8.1f} req/s  errors {summary['errors']}")
+    return summary
+
+
+def scenarios(n):
+    queries = synthetic.queries(n)
+    hot = queries[:10]
+    batch_queries = synthetic.queries(n + 10, seed=4)  # not seen by the single-query scenarios
+    files = {kind: synthetic.resumes(kind, n) for kind in synthetic.RESUME_MAKERS}
+    rng = random.Random(3)
+    cursors = [rng.randrange(0, 5000) for _ in range(n)]
+
+    def upload(kind):
+        def send(c, i):
+            filename, data = files[kind][i % n]
+            return c.post('/api/upload-resume', data={'resume': (io.BytesIO(data), filename)},
+                          content_type='multipart/form-data')
+        return send
+
+    return {
+        'recommend': lambda c, i: c.post('/api/recommend', json={'query': queries[i % n]}),
+        'recommend_repeat': lambda c, i: c.post('/api/recommend', json={'query': hot[i % len(hot)]}),
+        'recommend_batch_10': lambda c, i: c.post('/api/recommend/batch', json={'queries': batch_queries[i % n:i % n + 10]}),
+        'upload_resume_txt': upload('txt'),
+        'upload_resume_docx': upload('docx'),
+        'upload_resume_pdf': upload('pdf'),
+        'jobs': lambda c, i: c.get(f'/api/jobs?cursor={cursors[i % n]}'),
+        'posts': lambda c, i: c.get('/api/posts'),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency/throughput of the SkillBridge API under concurrent load.")
+    parser.add_argument('--jobs', type=int, default=5000, help="Size of the synthetic job corpus.")
+    parser.add_argument('--requests', type=int, default=200, help="Requests per scenario.")
+    parser.add_argument('--concurrency', type=int, default=8, help="Client threads.")
+    parser.add_argument('--stub-ms', type=float, default=0.0, help="Fake encoder cost per text, in ms.")
+    parser.add_argument('--only', default=None, help="Comma-separated scenario names to run.")
+    parser.add_argument('--workdir', default=None, help="Where to build the corpus and models (default: a temp dir).")
+    parser.add_argument('--out', default=None, help="Write the JSON report here (default: stdout).")
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='skillbridge-bench-')
+    use_stub_encoder(os.path.join(workdir, 'models'), args.stub_ms)
+    os.environ['SKILLBRIDGE_POSTS_DB'] = os.path.join(workdir, 'posts.db')  # never the real feed
+    os.environ['SKILLBRIDGE_RESUME_JOBS_DB'] = os.path.join(workdir, 'resume_jobs.db')
+    print(f"--- Building {args.jobs} synthetic jobs in {workdir} ---")
+    build_models(workdir, args.jobs)
+
+    print("--- Loading app ---")
+    started = time.perf_counter()
+    import app as skillbridge
+    startup = time.perf_counter() - started
+    skillbridge.load_models()  # waits for the background load + warm-up
+    ready = time.perf_counter() - started
+
+    print(f"--- Running scenarios ({args.requests} requests, {args.concurrency} threads) ---")
+    wanted = set(args.only.split(',')) if args.only else None
+    results = {}
+    for name, send in scenarios(args.requests).items():
+        if wanted is None or name in wanted:
+            results[name] = run_scenario(skillbridge.app, name, send, args.requests, args.concurrency)
+
+    report = {
+        'benchmark': 'serving',
+        'environment': environment(),
+        'config': {'jobs': args.jobs, 'requests': args.requests, 'concurrency': args.concurrency,
+                   'encoder': 'stub', 'stub_ms_per_text': args.stub_ms},
+        'startup_seconds': round(startup, 3),
+        'ready_seconds': round(ready, 3),
+        'encoder_avg_batch_size': round(skillbridge.encoder.avg_batch_size, 2),
+        'cache': skillbridge.query_cache.stats(),
+        'results': results,
+    }
+    skillbridge.resume_processor.close()
+    write_report(report, args.out)
+
+
+if __name__ == "__main__":
+    main()
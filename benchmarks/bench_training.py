@@ -0,0 +1,109 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+import subprocess
+from benchmarks.common import REPO_ROOT, use_stub_encoder, environment, write_report
+from benchmarks import synthetic
+
+# --- TRAINING BENCHMARK ---
+# Times every prepare_unified_model() stage on synthetic corpora of growing
+# size. Each size runs in its own process (fresh imports, fresh models dir,
+# honest peak RSS), once from scratch and, with --rerun, once more to time
+# an incremental run where every embedding is reused.
+#
+#   python -m benchmarks.bench_training --sizes 10000,100000,1000000 --out training.json
+
+DEFAULT_SIZES = "10000,100000,1000000"
+
+
+def run_one(workdir, n_jobs, workers, chunk_size, rerun, stub_ms):
+    """Child process: build the corpus and train on it, return the stage times."""
+    use_stub_encoder(os.path.join(workdir, 'models'), stub_ms)
+    started = time.perf_counter()
+    corpus = synthetic.write_corpus(workdir, n_jobs)
+    generate = time.perf_counter() - started
+
+    import train_model
+    os.chdir(workdir)
+    runs = []
+    for _ in range(2 if rerun else 1):
+        started = time.perf_counter()
+        stages = train_model.prepare_unified_model(workers=workers, chunksize=chunk_size)
+        runs.append({'total_seconds': round(time.perf_counter() - started, 3), 'stages': stages})
+
+    result = {
+        'jobs': corpus['jobs'],
+        'corpus': corpus,
+        'generate_seconds': round(generate, 3),
+        'train': runs[0],
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0, 1),
+        'jobs_per_second': round(corpus['jobs'] / max(runs[0]['total_seconds'], 1e-9), 1),
+    }
+    if rerun:
+        result['incremental'] = runs[1]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stage timings of train_model.py on synthetic corpora.")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help="Comma-separated corpus sizes (jobs).")
+    parser.add_argument('--workers', type=int, default=1, help="Encoder worker processes.")
+    parser.add_argument('--chunk-size', type=int, default=2000, help="Rows per streamed chunk.")
+    parser.add_argument('--rerun', action='store_true', help="Also time an incremental second run.")
+    parser.add_argument('--stub-ms', type=float, default=0.0, help="Fake encoder cost per text, in ms.")
+    parser.add_argument('--workdir', default=None, help="Where to build corpora (default: a temp dir, removed after).")
+    parser.add_argument('--out', default=None, help="Write the JSON report here (default: stdout).")
+    parser.add_argument('--child', type=int, default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--child-out', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        result = run_one(args.workdir, args.child, args.workers, args.chunk_size, args.rerun, args.stub_ms)
+        with open(args.child_out, 'w') as f:
+            json.dump(result, f)
+        return
+
+    root = args.workdir or tempfile.mkdtemp(prefix='skillbridge-train-bench-')
+    results = []
+    for size in [int(s) for s in args.sizes.split(',') if s.strip()]:
+        print(f"--- {size} jobs ---")
+        workdir = os.path.join(root, f"jobs_{size}")
+        shutil.rmtree(workdir, ignore_errors=True)
+        os.makedirs(workdir)
+        out = os.path.join(workdir, 'result.json')
+        cmd = [sys.executable, '-m', 'benchmarks.bench_training', '--child', str(size), '--child-out', out,
+               '--workdir', workdir, '--workers', str(args.workers), '--chunk-size', str(args.chunk_size),
+               '--stub-ms', str(args.stub_ms)] + (['--rerun'] if args.rerun else [])
+        proc = subprocess.run(cmd, cwd=REPO_ROOT, stdout=subprocess.DEVNULL)
+        if proc.returncode != 0:
+            print(f"❌ Error: training benchmark for {size} jobs failed (exit {proc.returncode})")
+            results.append({'jobs': size, 'error': proc.returncode})
+            continue
+        with open(out) as f:
+            result = json.load(f)
+        results.append(result)
+        stages = ", ".join(f"{k} {v:.2f}s" for k, v in result['train']['stages'].items())
+        print(f"   {result['train']['total_seconds']:.2f}s total ({result['jobs_per_second']:.0f} jobs/s, "
+              f"peak {result['peak_rss_mb']:.0f} MB): {stages}")
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'benchmark': 'training',
+        'environment': environment(),
+        'config': {'sizes': args.sizes, 'workers': args.workers, 'chunk_size': args.chunk_size,
+                   'encoder': 'stub', 'stub_ms_per_text': args.stub_ms},
+        'results': results,
+    }
+    if not args.workdir:
+        shutil.rmtree(root, ignore_errors=True)
+    write_report(report, args.out)
+
+
+if __name__ == "__main__":
+    main()
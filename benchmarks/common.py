@@ -0,0 +1,61 @@
+import os
+import sys
+import json
+import platform
+import subprocess
+from datetime import datetime
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def use_stub_encoder(models_dir, ms_per_text=0.0):
+    """Must run before the SkillBridge modules are imported (they read these at import time)."""
+    os.environ['SKILLBRIDGE_ENCODER'] = 'stub'
+    os.environ['SKILLBRIDGE_STUB_MS_PER_TEXT'] = str(ms_per_text)
+    os.environ['SKILLBRIDGE_MODELS_DIR'] = os.path.abspath(models_dir)
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+
+
+def latency_summary(latencies_ms, wall_seconds, errors=0):
+    lat = np.asarray(latencies_ms, dtype=np.float64)
+    if not len(lat):
+        return {'requests': 0, 'errors': errors}
+    p50, p95, p99 = np.percentile(lat, [50, 95, 99])
+    return {
+        'requests': int(len(lat)),
+        'errors': int(errors),
+        'p50_ms': round(float(p50), 3),
+        'p95_ms': round(float(p95), 3),
+        'p99_ms': round(float(p99), 3),
+        'mean_ms': round(float(lat.mean()), 3),
+        'max_ms': round(float(lat.max()), 3),
+        'throughput_rps': round(len(lat) / max(wall_seconds, 1e-9), 1),
+    }
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                                capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+    }
+
+
+def write_report(report, path=None):
+    """Writes the JSON report to `path` (or stdout when no path is given)."""
+    text = json.dumps(report, indent=2)
+    if path:
+        with open(path, 'w') as f:
+            f.write(text + "\n")
+        print(f"✅ Report written to {path}")
+    else:
+        print(text)
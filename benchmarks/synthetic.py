@@ -0,0 +1,163 @@
+import io
+import os
+import csv
+import json
+import random
+
+# --- SYNTHETIC DATA ---
+# Corpora in the exact layout train_model.py reads (data/job_dataset.csv,
+# data/job_dataset.json, data/all.csv, candidates.csv, trainings.csv) and
+# resumes as real TXT, DOCX and PDF bytes. Everything is seeded, so two runs
+# of a benchmark see the same data.
+
+SKILLS = ["Python", "SQL", "Java", "JavaScript", "React", "Node.js", "Docker", "Kubernetes", "AWS", "Azure",
+          "Git", "Linux", "Machine Learning", "Deep Learning", "Pandas", "Excel", "Tableau", "Power BI",
+          "Spring Boot", "C#", "ASP.NET", "Go", "Rust", "PostgreSQL", "MongoDB", "Spark", "Kafka", "Figma",
+          "Scrum", "REST APIs", "GraphQL", "TensorFlow", "PyTorch", "Terraform", "CI/CD", "Selenium"]
+ROLES = ["Developer", "Engineer", "Analyst", "Manager", "Consultant", "Architect", "Designer", "Scientist", "Tester"]
+FIELDS = ["Backend", "Frontend", "Data", "Cloud", "DevOps", "QA", "Mobile", "Security", "ML", "Full Stack"]
+LEVELS = ["Fresher", "Junior", "Mid", "Senior", "Lead"]
+DUTIES = ["build and maintain services", "write clean tested code", "review pull requests", "design data pipelines",
+          "work with stakeholders", "monitor production systems", "mentor junior staff", "automate deployments",
+          "analyse business metrics", "improve performance", "document APIs", "migrate legacy systems"]
+INDUSTRIES = ["Tech", "Finance", "Retail", "Healthcare", "Education", "Logistics", "Media"]
+FUNCTIONS = ["IT", "Engineering", "Analytics", "Operations", "Product"]
+
+
+def _title(rng):
+    return f"{rng.choice(FIELDS)} {rng.choice(ROLES)}"
+
+
+def _skills(rng, n=None):
+    return rng.sample(SKILLS, n or rng.randint(3, 8))
+
+
+def write_corpus(workdir, n_jobs, n_candidates=1000, seed=0):
+    """
+    Writes a workdir with data/ holding n_jobs jobs in total: about 10% premium
+    (split between the CSV and the JSON, with a few duplicate JobIDs) and the
+    rest in the pipe-separated all.csv. Rows are streamed to disk, so 1M jobs
+    never sit in memory.
+    """
+    rng = random.Random(seed)
+    data = os.path.join(workdir, 'data')
+    os.makedirs(data, exist_ok=True)
+    n_premium = min(max(n_jobs // 10, 1), 20000)
+    n_general = max(n_jobs - n_premium, 0)
+
+    premium = []
+    for i in range(n_premium):
+        skills = _skills(rng)
+        premium.append({
+            'JobID': f"SYN-{i:06d}",
+            'Title': _title(rng),
+            'ExperienceLevel': rng.choice(LEVELS),
+            'YearsOfExperience': f"{rng.randint(0, 5)}-{rng.randint(6, 12)}",
+            'Skills': skills,
+            'Responsibilities': rng.sample(DUTIES, 3),
+            'Keywords': skills[:3],
+        })
+    half = n_premium // 2
+    fields = list(premium[0]) if premium else ['JobID']
+    with open(os.path.join(data, 'job_dataset.csv'), 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for job in premium[:half]:
+            writer.writerow({k: "; ".join(v) if isinstance(v, list) else v for k, v in job.items()})
+    # JSON overlaps the CSV by a few rows, like the real files do
+    with open(os.path.join(data, 'job_dataset.json'), 'w', encoding='utf-8') as f:
+        json.dump(premium[max(half - 5, 0):], f)
+
+    with open(os.path.join(data, 'all.csv'), 'w', newline='', encoding='utf-8') as f:
+        f.write("id|job_title|job_description|job_function|company_industry\n")
+        for i in range(n_general):
+            words = rng.sample(DUTIES, 2) + [s.lower() for s in _skills(rng, 4)]
+            f.write(f"{i}|{_title(rng).lower()}|{' '.join(words)}|{rng.choice(FUNCTIONS)}|{rng.choice(INDUSTRIES)}\n")
+
+    with open(os.path.join(data, 'candidates.csv'), 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['candidate_id', 'first_name', 'last_name', 'email', 'education', 'experience_years', 'summary', 'skills'])
+        for i in range(n_candidates):
+            skills = _skills(rng)
+            writer.writerow([i, f"Candidate {i}", "", f"c{i}@example.com", "B.Tech", rng.randint(0, 15),
+                             f"{rng.choice(LEVELS)} {_title(rng)} who likes to {rng.choice(DUTIES)}", ";".join(skills)])
+
+    with open(os.path.join(data, 'trainings.csv'), 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['module_id', 'title', 'description', 'skills_covered', 'duration_days'])
+        for i, skill in enumerate(SKILLS):
+            writer.writerow([i + 1, f"{skill} Essentials", f"Hands-on course covering {skill} from the basics", skill, rng.randint(2, 10)])
+    return {'jobs': n_premium + n_general, 'premium': n_premium, 'general': n_general, 'candidates': n_candidates}
+
+
+def queries(n, seed=1):
+    """Search strings like the ones users type ('senior data engineer python aws')."""
+    rng = random.Random(seed)
+    return [f"{rng.choice(LEVELS).lower()} {_title(rng).lower()} {' '.join(s.lower() for s in _skills(rng, 2))}"
+            for _ in range(n)]
+
+
+def resume_text(rng, paragraphs=6):
+    lines = [f"{rng.choice(LEVELS)} {_title(rng)}", "Skills: " + ", ".join(_skills(rng, 6))]
+    for _ in range(paragraphs):
+        lines.append(f"Worked as {_title(rng)} at a {rng.choice(INDUSTRIES)} company where I had to "
+                     f"{rng.choice(DUTIES)} and {rng.choice(DUTIES)} using {', '.join(_skills(rng, 3))}.")
+    return lines
+
+
+def make_txt(lines):
+    return "\n".join(lines).encode('utf-8')
+
+
+def make_docx(lines):
+    import docx
+    document = docx.Document()
+    for line in lines:
+        document.add_paragraph(line)
+    buf = io.BytesIO()
+    document.save(buf)
+    return buf.getvalue()
+
+
+def _pdf_escape(line):
+    return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def make_pdf(lines, lines_per_page=40):
+    """A minimal valid PDF (Helvetica text, one content stream per page), no extra dependency."""
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    n = len(pages)
+    font_id = 3 + 2 * n
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        ("<< /Type /Pages /Kids [" + " ".join(f"{3 + 2 * i} 0 R" for i in range(n)) + f"] /Count {n} >>").encode(),
+    ]
+    for i, page in enumerate(pages):
+        stream = "BT /F1 10 Tf 14 TL 50 750 Td " + " ".join(f"({_pdf_escape(l)}) Tj T*" for l in page) + " ET"
+        stream = stream.encode('latin-1', errors='replace')
+        objects.append((f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + 2 * i} 0 R "
+                        f"/Resources << /Font << /F1 {font_id} 0 R >> >> >>").encode())
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream")
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for num, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{num} 0 obj\n".encode() + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for off in offsets:
+        out.write(f"{off:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+
+RESUME_MAKERS = {'txt': make_txt, 'docx': make_docx, 'pdf': make_pdf}
+
+
+def resumes(kind, n, seed=2):
+    """n distinct resumes of one kind as (filename, bytes)."""
+    rng = random.Random(f"{kind}-{seed}")
+    return [(f"resume_{i}.{kind}", RESUME_MAKERS[kind](resume_text(rng))) for i in range(n)]
@@ -0,0 +1,126 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# --- QUERY CACHE ---
+# Search traffic repeats a lot ("python developer", "data analyst"...), so
+# both the query embedding and the final top-k list are worth keeping.
+#
+#   level 1: normalised query text -> embedding (independent of the jobs)
+#   level 2: (namespace, artifact version, query, k, ...) -> result list
+#
+# Level 2 keys carry the artifact version (its checksum), and the level is
+# cleared as soon as a different version shows up, so results computed from
+# an old models/jobs build are never served after a retrain.
+
+EMB_CACHE_SIZE = int(os.environ.get('SKILLBRIDGE_EMB_CACHE_SIZE', 10000))
+RESULT_CACHE_SIZE = int(os.environ.get('SKILLBRIDGE_RESULT_CACHE_SIZE', 10000))
+RESULT_CACHE_TTL = float(os.environ.get('SKILLBRIDGE_RESULT_CACHE_TTL', 0)) or None
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe LRU cache with optional TTL (seconds) and hit/miss counters."""
+
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING and self.ttl is not None and time.monotonic() - entry[1] > self.ttl:
+                del self._data[key]
+                entry = _MISSING
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+def normalize_query(text):
+    """
+    '  Python  Developer ' and 'python developer' share one cache entry.
+    all-MiniLM-L6-v2 is uncased, so lower-casing does not change the embedding.
+    """
+    return " ".join(str(text).lower().split())
+
+
+class QueryCache:
+    def __init__(self, encode_fn, emb_size=EMB_CACHE_SIZE, result_size=RESULT_CACHE_SIZE, result_ttl=RESULT_CACHE_TTL):
+        self.encode_fn = encode_fn
+        self.embeddings_cache = LRUCache(emb_size)
+        self.results_cache = LRUCache(result_size, ttl=result_ttl)
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def embeddings(self, queries):
+        """Vectors for a list of queries; only the cache misses are encoded (in one call)."""
+        keys = [normalize_query(q) for q in queries]
+        vecs = [self.embeddings_cache.get(k) for k in keys]
+        missing = list(dict.fromkeys(k for k, v in zip(keys, vecs) if v is None))
+        if missing:
+            fresh = dict(zip(missing, self.encode_fn(missing)))
+            for k, v in fresh.items():
+                self.embeddings_cache.put(k, v)
+            vecs = [fresh[k] if v is None else v for k, v in zip(keys, vecs)]
+        return np.vstack(vecs)
+
+    def embedding(self, query):
+        return self.embeddings([query])
+
+    def _check_version(self, namespace, version):
+        with self._lock:
+            if self._versions.get(namespace, version) != version:
+                # A new artifact was loaded: everything computed before is stale
+                self.results_cache.clear()
+            self._versions[namespace] = version
+
+    def result_key(self, namespace, version, query, *params):
+        self._check_version(namespace, version)
+        return (namespace, version, normalize_query(query)) + params
+
+    def results(self, namespace, version, query, params, compute):
+        """Cached compute() for this query against this artifact version."""
+        key = self.result_key(namespace, version, query, *params)
+        value = self.results_cache.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.results_cache.put(key, value)
+        return value
+
+    def stats(self):
+        return {'embeddings': self.embeddings_cache.stats(), 'results': self.results_cache.stats()}
@@ -0,0 +1,152 @@
+import os
+import re
+import zlib
+import numpy as np
+from artifacts import StringColumn, encode_strings
+
+# --- NEAR-DUPLICATE JOBS (MinHash + LSH) ---
+# all.csv is full of reposted listings that differ by a date or a sentence.
+# NearDuplicateFilter runs inside the streaming loop of train_model.py,
+# before embedding: every job's word 3-gram shingles get a MinHash
+# signature, the signature is cut into bands, and a job whose band collides
+# with an already kept job (and whose signatures agree on at least
+# `threshold` of their hashes, i.e. estimated Jaccard) is folded into that
+# job instead of being embedded, stored and scored again. The first job of a
+# cluster is kept, so premium rows (streamed first) win over raw reposts.
+#
+# The members of each cluster are stored with the jobs artifact:
+#
+#   models/jobs/duplicates/indptr.npy                      CSR kept job row -> its duplicates
+#   models/jobs/duplicates/id_offsets.npy + id_blob.npy    their unified_ids (StringColumn)
+#
+# Memory is one band dict entry per kept job and band, plus NUM_PERM
+# 16-bit hash fragments per kept job for the agreement check.
+
+DUP_DIR = 'duplicates'
+DEFAULT_THRESHOLD = float(os.environ.get('SKILLBRIDGE_DEDUP_THRESHOLD', 0.85))
+NUM_PERM = 32
+BANDS = 4
+SHINGLE = 3
+_WORD = re.compile(r'\w+')
+_MASK = np.uint64(0xFFFFFFFF)
+
+
+def shingle_hashes(text, size=SHINGLE):
+    """crc32 of every word `size`-gram of the text (all of it if shorter), as uint64."""
+    words = _WORD.findall(str(text).lower())
+    if not words:
+        return None
+    if len(words) <= size:
+        return np.array([zlib.crc32(" ".join(words).encode('utf-8'))], dtype=np.uint64)
+    grams = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    return np.fromiter((zlib.crc32(g.encode('utf-8')) for g in grams), dtype=np.uint64, count=len(grams))
+
+
+class NearDuplicateFilter:
+    def __init__(self, threshold=DEFAULT_THRESHOLD, num_perm=NUM_PERM, bands=BANDS, seed=1):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        rng = np.random.RandomState(seed)
+        # Multiply-shift hash family: h(x) = ((a*x + b) mod 2^64) >> 32 with random 64-bit odd a.
+        # a must wrap around 2^64, otherwise h is monotonic in x and every "permutation" picks the same shingle.
+        self.a = rng.randint(0, 2 ** 32, (num_perm, 2)).astype(np.uint64)
+        self.a = (self.a[:, 0] << np.uint64(32)) | self.a[:, 1] | np.uint64(1)
+        self.b = rng.randint(0, 2 ** 32, (num_perm, 2)).astype(np.uint64)
+        self.b = (self.b[:, 0] << np.uint64(32)) | self.b[:, 1]
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.threshold = threshold
+        self.tables = [{} for _ in range(bands)]
+        self.fragments = np.zeros((1024, num_perm), dtype=np.uint16)  # low bits of each kept signature
+        self.kept = 0
+        self.members = []  # (kept row, duplicate unified_id)
+
+    def signature(self, hashes):
+        with np.errstate(over='ignore'):
+            mixed = (np.outer(self.a, hashes) + self.b[:, None]) >> np.uint64(32)
+        return (mixed & _MASK).min(axis=1)
+
+    def _find(self, sig, keys):
+        frag = sig.astype(np.uint16)
+        for band, key in enumerate(keys):
+            row = self.tables[band].get(key)
+            if row is not None and np.mean(self.fragments[row] == frag) >= self.threshold:
+                return row
+        return None
+
+    def _keep(self, sig=None, keys=()):
+        row = self.kept
+        if row == len(self.fragments):
+            self.fragments = np.concatenate([self.fragments, np.zeros_like(self.fragments)])
+        if sig is not None:
+            self.fragments[row] = sig.astype(np.uint16)
+        for band, key in enumerate(keys):
+            self.tables[band].setdefault(key, row)
+        self.kept += 1
+        return row
+
+    def filter(self, chunk, text_col='text_for_emb', id_col='unified_id'):
+        """Drops the near-duplicates of already kept jobs from a unified chunk (kept rows are numbered in order)."""
+        keep = np.ones(len(chunk), dtype=bool)
+        for i, (text, job_id) in enumerate(zip(chunk[text_col].tolist(), chunk[id_col].tolist())):
+            hashes = shingle_hashes(text)
+            if hashes is None:  # nothing to compare on, always kept
+                self._keep()
+                continue
+            sig = self.signature(hashes)
+            keys = [hash(sig[b * self.rows_per_band:(b + 1) * self.rows_per_band].tobytes()) for b in range(self.bands)]
+            row = self._find(sig, keys)
+            if row is None:
+                self._keep(sig, keys)
+            else:
+                keep[i] = False
+                self.members.append((row, str(job_id)))
+        return chunk[keep]
+
+    @property
+    def dropped(self):
+        return len(self.members)
+
+    def save(self, artifact_dir):
+        """Writes the cluster members into an artifact folder (call before the writer swaps it in)."""
+        path = os.path.join(artifact_dir, DUP_DIR)
+        os.makedirs(path, exist_ok=True)
+        members = sorted(self.members, key=lambda m: m[0])
+        indptr = np.zeros(self.kept + 1, dtype=np.int64)
+        if members:
+            np.cumsum(np.bincount([m[0] for m in members], minlength=self.kept), out=indptr[1:])
+        offsets, blob = encode_strings(m[1] for m in members)
+        np.save(os.path.join(path, 'indptr.npy'), indptr)
+        np.save(os.path.join(path, 'id_offsets.npy'), offsets)
+        np.save(os.path.join(path, 'id_blob.npy'), blob)
+
+
+class DuplicateGroups:
+    """Read side: the unified_ids folded into each kept job."""
+
+    def __init__(self, indptr, ids):
+        self.indptr = indptr
+        self.ids = ids
+
+    def members(self, row):
+        return self.ids[range(self.indptr[row], self.indptr[row + 1])]
+
+    def count(self, row):
+        return int(self.indptr[row + 1] - self.indptr[row])
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def load_duplicates(art):
+    """Duplicate groups stored with an artifact, or None (no dedup ran, or a legacy artifact)."""
+    path = os.path.join(art.path, DUP_DIR) if art.path else None
+    if path is None or not os.path.exists(os.path.join(path, 'indptr.npy')):
+        return None
+    indptr = np.load(os.path.join(path, 'indptr.npy'), mmap_mode='r')
+    if len(indptr) != len(art) + 1:
+        return None
+    ids = StringColumn(np.load(os.path.join(path, 'id_offsets.npy'), mmap_mode='r'),
+                       np.load(os.path.join(path, 'id_blob.npy'), mmap_mode='r'))
+    return DuplicateGroups(indptr, ids)
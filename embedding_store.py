@@ -0,0 +1,144 @@
+import os
+import re
+import shutil
+import hashlib
+import numpy as np
+from artifacts import MODELS_DIR, NpyAppender
+
+# --- CONTENT-HASHED EMBEDDING STORE ---
+# Remembers the vector of every text we have encoded, keyed by
+# sha1(model name + text_for_emb). A re-run of train_model.py only encodes
+# rows whose text is new or changed; everything else is copied from here.
+#
+#   models/emb_store/<model>/keys.npy   sorted 16-byte keys (S16)
+#   models/emb_store/<model>/vecs.npy   float32 vectors, same order as keys
+#
+# Vectors used in a run are streamed into a new store next to the old one
+# (only the keys stay in memory), and commit() swaps it in. Rows deleted
+# from the sources are therefore dropped instead of piling up forever.
+
+KEY_BYTES = 16
+KEY_DTYPE = f'S{KEY_BYTES}'
+
+
+def text_key(text, model_name):
+    return hashlib.sha1(f"{model_name}\0{text}".encode('utf-8')).digest()[:KEY_BYTES]
+
+
+def store_path(model_name, models_dir=None):
+    safe = re.sub(r'[^A-Za-z0-9._-]+', '_', model_name)
+    return os.path.join(models_dir or MODELS_DIR, 'emb_store', safe)
+
+
+class EmbeddingStore:
+    def __init__(self, model_name, models_dir=None):
+        self.model_name = model_name
+        self.path = store_path(model_name, models_dir)
+        self.keys = np.zeros(0, dtype=KEY_DTYPE)
+        self.vecs = None
+        if os.path.exists(os.path.join(self.path, 'keys.npy')):
+            self.keys = np.load(os.path.join(self.path, 'keys.npy'))
+            self.vecs = np.load(os.path.join(self.path, 'vecs.npy'), mmap_mode='r')
+
+        # The store being written by this run: key -> row in the new vecs file
+        self.tmp_dir = f"{self.path}.tmp-{os.getpid()}"
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        os.makedirs(self.tmp_dir)
+        self._written = {}
+        self._keys_out = NpyAppender(os.path.join(self.tmp_dir, 'keys.unsorted.npy'), KEY_DTYPE)
+        self._vecs_out = None
+        self.reused = 0
+        self.encoded = 0
+
+    def __len__(self):
+        return len(self.keys)
+
+    @property
+    def dim(self):
+        if self._vecs_out is not None:
+            return self._vecs_out.row_shape[0]
+        return self.vecs.shape[1] if self.vecs is not None else None
+
+    def lookup(self, keys):
+        """Row of each key in the stored vectors, or -1 when it is not there."""
+        keys = np.asarray(keys, dtype=KEY_DTYPE)
+        if not len(self.keys):
+            return np.full(len(keys), -1, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        return np.where(self.keys[pos] == keys, pos, -1)
+
+    def _write(self, keys, vecs):
+        if self._vecs_out is None:
+            self._vecs_out = NpyAppender(os.path.join(self.tmp_dir, 'vecs.unsorted.npy'), np.float32, (vecs.shape[1],))
+        for key in keys:
+            self._written[key] = len(self._written)
+        self._keys_out.append(np.array(keys, dtype=KEY_DTYPE))
+        self._vecs_out.append(vecs)
+
+    def embed(self, texts, encode_fn):
+        """
+        Vectors for texts, calling encode_fn(list_of_texts) only for texts
+        that are neither in the store nor already encoded in this run.
+        Meant to be called chunk by chunk; only the chunk's vectors are in memory.
+        """
+        texts = [str(t) for t in texts]
+        keys = [text_key(t, self.model_name) for t in texts]
+        if not keys:
+            return np.zeros((0, self.dim or 0), dtype=np.float32)
+
+        first = {}
+        for i, key in enumerate(keys):
+            first.setdefault(key, i)
+        new_keys = [k for k in first if k not in self._written]
+        rows = self.lookup(new_keys)
+
+        reuse = [(k, r) for k, r in zip(new_keys, rows) if r >= 0]
+        todo = [k for k, r in zip(new_keys, rows) if r < 0]
+        if reuse:
+            order = np.argsort([r for _, r in reuse])  # sequential reads from the old store
+            self._write([reuse[i][0] for i in order], np.asarray(self.vecs[np.array([reuse[i][1] for i in order])], dtype=np.float32))
+            self.reused += len(reuse)
+        if todo:
+            fresh = np.asarray(encode_fn([texts[first[k]] for k in todo]), dtype=np.float32)
+            self._write(todo, fresh)
+            self.encoded += len(todo)
+
+        written = self._vecs_out.view()
+        return np.asarray(written[[self._written[k] for k in keys]], dtype=np.float32)
+
+    def commit(self, block_size=65536):
+        """Sorts the vectors written in this run into a new store and swaps it in."""
+        self._keys_out.close()
+        if self._vecs_out is None:
+            self._vecs_out = NpyAppender(os.path.join(self.tmp_dir, 'vecs.unsorted.npy'), np.float32, (self.dim or 0,))
+        self._vecs_out.close()
+
+        keys = np.load(self._keys_out.path)
+        vecs = np.load(self._vecs_out.path, mmap_mode='r')
+        order = np.argsort(keys, kind='stable')
+        out = NpyAppender(os.path.join(self.tmp_dir, 'vecs.npy'), np.float32, vecs.shape[1:])
+        for start in range(0, len(order), block_size):
+            out.append(vecs[order[start:start + block_size]])
+        out.close()
+        np.save(os.path.join(self.tmp_dir, 'keys.npy'), keys[order])
+        del vecs
+        os.remove(self._keys_out.path)
+        os.remove(self._vecs_out.path)
+        dropped = len(self.keys) - int((self.lookup(keys) >= 0).sum())
+
+        old_dir = f"{self.path}.old-{os.getpid()}"
+        if os.path.exists(self.path):
+            os.replace(self.path, old_dir)
+        os.replace(self.tmp_dir, self.path)
+        shutil.rmtree(old_dir, ignore_errors=True)
+        return dropped
+
+    def abort(self):
+        """Drops this run's half-written store (the previous one stays in place)."""
+        for out in (self._keys_out, self._vecs_out):
+            if out is not None:
+                out.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def report(self):
+        return f"{self.reused} rows reused, {self.encoded} rows encoded"
@@ -0,0 +1,201 @@
+import os
+import time
+import zlib
+import queue
+import threading
+from concurrent.futures import Future
+import numpy as np
+
+# --- MICRO-BATCHING ENCODER ---
+# Each Flask request used to call model.encode([query]) on its own, so N
+# concurrent users meant N batch-of-one transformer passes. BatchingEncoder
+# puts every text on a shared queue; one background thread waits up to
+# `max_wait_ms` (or until `max_batch` texts are queued), runs a single
+# model.encode() over the whole batch and hands each caller its vector.
+
+DEFAULT_MAX_BATCH = int(os.environ.get('SKILLBRIDGE_BATCH_SIZE', 32))
+DEFAULT_MAX_WAIT_MS = float(os.environ.get('SKILLBRIDGE_BATCH_WAIT_MS', 5))
+STUB_DIM = 384
+
+
+# --- ENCODER BACKENDS ---
+# SKILLBRIDGE_ENCODER=stub swaps the transformer for StubEncoder everywhere
+# (app, training workers, predictor), so benchmarks run offline without
+# downloading all-MiniLM-L6-v2. Only meant for benchmarks and smoke tests.
+
+class StubEncoder:
+    """
+    Offline stand-in for SentenceTransformer: a hashed bag of words projected
+    to STUB_DIM dimensions. Deterministic and cheap, and texts sharing words
+    still land close together. `ms_per_text` adds a fake model cost.
+    """
+
+    def __init__(self, dim=STUB_DIM, ms_per_text=0.0):
+        self.dim = dim
+        self.ms_per_text = ms_per_text
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+    def encode(self, sentences, batch_size=32, show_progress_bar=False, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for tok in str(text).lower().split():
+                h = zlib.crc32(tok.encode('utf-8'))
+                out[i, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        out /= np.maximum(np.linalg.norm(out, axis=1, keepdims=True), 1e-12)
+        if self.ms_per_text:
+            time.sleep(self.ms_per_text * len(texts) / 1000.0)
+        return out[0] if single else out
+
+
+# SKILLBRIDGE_ENCODER=int8 serves queries with the transformer's Linear layers
+# dynamically quantized to int8 (weights int8, activations quantized on the
+# fly), which is most of MiniLM's CPU time. Documents (the training corpus)
+# are always encoded in float32 so stored vectors never depend on the
+# serving backend; `python -m benchmarks.bench_encoder` checks that int8
+# query vectors still agree with float32 ones and measures the speed-up.
+#
+# Queries are truncated at SKILLBRIDGE_QUERY_MAX_TOKENS (default 64): a
+# pasted wall of text can no longer pad a whole micro-batch to 256 tokens.
+# Resumes use SKILLBRIDGE_DOCUMENT_MAX_TOKENS (default 256, the model's own
+# window). SKILLBRIDGE_ENCODER_THREADS pins torch's intra-op threads.
+
+BACKENDS = ('sentence-transformers', 'int8', 'stub')
+QUERY_MAX_TOKENS = int(os.environ.get('SKILLBRIDGE_QUERY_MAX_TOKENS', 64))
+DOCUMENT_MAX_TOKENS = int(os.environ.get('SKILLBRIDGE_DOCUMENT_MAX_TOKENS', 256))
+
+
+class TorchEncoder:
+    """
+    SentenceTransformer tuned for CPU inference: eval mode, torch.inference_mode(),
+    optional dynamic int8 quantization and a per-call token limit.
+    Calls are serialised (each one already uses every intra-op thread).
+    """
+
+    def __init__(self, model_name, quantize=False, max_seq_length=None, threads=None):
+        import torch
+        from sentence_transformers import SentenceTransformer
+        if threads:
+            from parallel_encode import limit_torch_threads
+            limit_torch_threads(threads)
+        model = SentenceTransformer(model_name, device='cpu')
+        model.eval()
+        if quantize:
+            quantization = getattr(torch, 'ao', torch).quantization
+            model = quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self._torch = torch
+        self.model = model
+        self.quantized = quantize
+        self.max_seq_length = max_seq_length or model.max_seq_length
+        self._lock = threading.Lock()
+
+    def get_sentence_embedding_dimension(self):
+        return self.model.get_sentence_embedding_dimension()
+
+    def encode(self, sentences, batch_size=32, show_progress_bar=False, max_seq_length=None, **kwargs):
+        with self._lock, self._torch.inference_mode():
+            self.model.max_seq_length = max_seq_length or self.max_seq_length
+            return self.model.encode(sentences, batch_size=batch_size, show_progress_bar=show_progress_bar,
+                                     convert_to_numpy=True, **kwargs)
+
+
+def load_encoder(model_name, backend=None, purpose='query'):
+    """
+    The sentence encoder picked by SKILLBRIDGE_ENCODER (default: the float32 transformer).
+    purpose='document' (training) never quantizes and keeps the model's full window.
+    """
+    backend = backend or os.environ.get('SKILLBRIDGE_ENCODER', 'sentence-transformers')
+    if backend not in BACKENDS:
+        raise ValueError(f"SKILLBRIDGE_ENCODER must be one of {BACKENDS}, got {backend!r}")
+    if backend == 'stub':
+        return StubEncoder(ms_per_text=float(os.environ.get('SKILLBRIDGE_STUB_MS_PER_TEXT', 0)))
+    threads = int(os.environ.get('SKILLBRIDGE_ENCODER_THREADS', 0)) or None
+    if purpose == 'document':
+        return TorchEncoder(model_name, threads=threads)
+    return TorchEncoder(model_name, quantize=backend == 'int8', max_seq_length=QUERY_MAX_TOKENS, threads=threads)
+
+
+class BatchingEncoder:
+    def __init__(self, model, max_batch=DEFAULT_MAX_BATCH, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        self.model = model
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = max_wait_ms / 1000.0
+        self._closed = False
+        # Counters so the batching can be checked under load
+        self.batches = 0
+        self.texts = 0
+        self._start()
+        # Threads do not survive fork(): pre-fork servers (serve.py) get a fresh one per worker
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._start)
+
+    def _start(self):
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='batching-encoder', daemon=True)
+        self._thread.start()
+
+    def submit(self, text):
+        """Queues one text and returns a Future resolving to its vector."""
+        if self._closed:
+            raise RuntimeError("BatchingEncoder is closed")
+        fut = Future()
+        self._queue.put((text, fut))
+        return fut
+
+    def encode(self, texts, timeout=None):
+        """Drop-in for model.encode(list_of_texts): blocks until every vector is ready."""
+        if isinstance(texts, str):
+            texts = [texts]
+        futures = [self.submit(t) for t in texts]
+        return np.vstack([f.result(timeout=timeout) for f in futures])
+
+    def encode_documents(self, texts):
+        """Long texts (resumes) skip the query queue, so they never pad a batch of short queries."""
+        return np.atleast_2d(self.model.encode(texts, batch_size=len(texts), max_seq_length=DOCUMENT_MAX_TOKENS))
+
+    def close(self):
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout=1)
+
+    @property
+    def avg_batch_size(self):
+        return self.texts / self.batches if self.batches else 0.0
+
+    def _collect(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)  # let the loop see the shutdown after this batch
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            texts = [t for t, _ in batch]
+            try:
+                vecs = self.model.encode(texts, batch_size=len(texts))
+            except Exception as e:
+                for _, fut in batch:
+                    fut.set_exception(e)
+                continue
+            self.batches += 1
+            self.texts += len(texts)
+            for (_, fut), vec in zip(batch, vecs):
+                fut.set_result(vec)
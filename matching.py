@@ -0,0 +1,184 @@
+import os
+import numpy as np
+from artifacts import save_sidecar, load_sidecar, sidecar_dir
+
+# --- CANDIDATE <-> JOB MATCH TABLE ---
+# Precomputed at train time so the app never scores candidates against jobs
+# per request. The similarity matrix is never built whole: candidates and
+# jobs are walked in blocks and each block's scores are merged into two
+# running top-k tables, so memory is one cand_block x job_block tile plus
+# the tables themselves.
+#
+#   models/jobs/matches/cand_jobs.npy     (candidates, k) int32 job rows, best first
+#   models/jobs/matches/cand_scores.npy   (candidates, k) float16 cosine scores
+#   models/jobs/matches/job_cands.npy     (jobs, k) int32 candidate rows, best first
+#   models/jobs/matches/job_scores.npy    (jobs, k) float16 cosine scores
+#   models/jobs/matches/cand_keys.npy     sorted candidate ids (+ cand_order.npy: their rows)
+#   models/jobs/matches/job_keys.npy      sorted job ids (+ job_order.npy: their rows)
+#   models/jobs/matches/info.json         k and the artifact versions it was built from
+#
+# Everything is memory-mapped at load. A lookup is one binary search of the
+# sorted id keys plus one k-wide row read, whatever the corpus size.
+
+MATCH_DIR = 'matches'
+DEFAULT_K = 20
+CAND_BLOCK = 1024
+JOB_BLOCK = 16384
+TABLES = ('cand_jobs', 'cand_scores', 'job_cands', 'job_scores', 'cand_keys', 'cand_order', 'job_keys', 'job_order')
+
+
+def _block_top_k(scores, k):
+    """Per-row top-k of a score tile (unordered): (columns, scores)."""
+    k = min(k, scores.shape[1])
+    cols = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return cols, np.take_along_axis(scores, cols, axis=1)
+
+
+def _merge(ids, scores, new_ids, new_scores, k):
+    """Keeps the best k of the current and new candidates, row by row."""
+    ids = np.concatenate([ids, new_ids], axis=1)
+    scores = np.concatenate([scores, new_scores], axis=1)
+    keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return np.take_along_axis(ids, keep, axis=1), np.take_along_axis(scores, keep, axis=1)
+
+
+def _sorted_rows(ids, scores):
+    order = np.argsort(-scores, axis=1, kind='stable')
+    return np.take_along_axis(ids, order, axis=1), np.take_along_axis(scores, order, axis=1)
+
+
+def exact_matrix(art):
+    """Full precision rows when the artifact is quantized."""
+    return art.full if art.full is not None else art.emb
+
+
+def query_top_k(query_vecs, emb, k=10, block_size=JOB_BLOCK):
+    """
+    Top-k rows of `emb` for every query at once: one (queries x block) matrix
+    product per block of rows and a running argpartition top-k per query.
+    Returns (rows, scores), each (queries, k), best first.
+    """
+    q = np.atleast_2d(np.asarray(query_vecs, dtype=np.float32))
+    q = q / np.maximum(np.linalg.norm(q, axis=1, keepdims=True), 1e-12)
+    k = min(k, len(emb))
+    ids = np.zeros((len(q), k), dtype=np.int32)
+    scores = np.full((len(q), k), -np.inf, dtype=np.float32)
+    if not k or not len(q):
+        return ids, scores
+    for start in range(0, len(emb), block_size):
+        block = np.asarray(emb[start:start + block_size], dtype=np.float32)
+        cols, s = _block_top_k(q @ block.T, k)
+        ids, scores = _merge(ids, scores, (cols + start).astype(np.int32), s, k)
+    return _sorted_rows(ids, scores)
+
+
+def match_top_k(cand_emb, job_emb, k=DEFAULT_K, cand_block=CAND_BLOCK, job_block=JOB_BLOCK):
+    """
+    Top-k jobs per candidate and top-k candidates per job, in one blocked pass.
+    Rows are L2-normalised, so a dot product is the cosine similarity.
+    """
+    n_cand, n_jobs = len(cand_emb), len(job_emb)
+    k_jobs, k_cands = min(k, n_jobs), min(k, n_cand)
+    # Running tables start at -inf so the first real scores always win
+    cand_ids = np.zeros((n_cand, k_jobs), dtype=np.int32)
+    cand_scores = np.full((n_cand, k_jobs), -np.inf, dtype=np.float32)
+    job_ids = np.zeros((n_jobs, k_cands), dtype=np.int32)
+    job_scores = np.full((n_jobs, k_cands), -np.inf, dtype=np.float32)
+    if not n_cand or not n_jobs:
+        return cand_ids, cand_scores, job_ids, job_scores
+
+    for j0 in range(0, n_jobs, job_block):
+        jobs = np.asarray(job_emb[j0:j0 + job_block], dtype=np.float32)
+        j1 = j0 + len(jobs)
+        for c0 in range(0, n_cand, cand_block):
+            cands = np.asarray(cand_emb[c0:c0 + cand_block], dtype=np.float32)
+            c1 = c0 + len(cands)
+            tile = cands @ jobs.T  # the only cand_block x job_block allocation
+
+            cols, s = _block_top_k(tile, k_jobs)
+            cand_ids[c0:c1], cand_scores[c0:c1] = _merge(
+                cand_ids[c0:c1], cand_scores[c0:c1], (cols + j0).astype(np.int32), s, k_jobs)
+
+            cols, s = _block_top_k(tile.T, k_cands)
+            job_ids[j0:j1], job_scores[j0:j1] = _merge(
+                job_ids[j0:j1], job_scores[j0:j1], (cols + c0).astype(np.int32), s, k_cands)
+
+    return _sorted_rows(cand_ids, cand_scores) + _sorted_rows(job_ids, job_scores)
+
+
+def id_keys(ids):
+    """Sorted utf-8 id keys and the row each one belongs to (look ids up with find_row())."""
+    keys = np.array([str(v).encode('utf-8') for v in ids], dtype=bytes)
+    if not len(keys):
+        keys = keys.astype('S1')
+    order = np.argsort(keys, kind='stable').astype(np.int32)
+    return keys[order], order
+
+
+def find_row(keys, order, id_value):
+    """Row of an id in id_keys() output (one binary search), or None."""
+    key = str(id_value).encode('utf-8')
+    i = int(np.searchsorted(keys, key))
+    if i < len(keys) and keys[i] == key:
+        return int(order[i])
+    return None
+
+
+class MatchTable:
+    def __init__(self, arrays, info=None):
+        for name in TABLES:
+            setattr(self, name, arrays[name])
+        self.info = info or {}
+        self.k = self.cand_jobs.shape[1] if self.cand_jobs.ndim == 2 else 0
+
+    # --- training stage ---
+    @classmethod
+    def build(cls, cand_art, job_art, k=DEFAULT_K, cand_block=CAND_BLOCK, job_block=JOB_BLOCK):
+        cand_jobs, cand_scores, job_cands, job_scores = match_top_k(
+            exact_matrix(cand_art), exact_matrix(job_art), k, cand_block, job_block)
+        cand_keys, cand_order = id_keys(cand_art.meta['candidate_id'][:])
+        job_keys, job_order = id_keys(job_art.meta['unified_id'][:])
+        arrays = {
+            'cand_jobs': cand_jobs, 'cand_scores': cand_scores.astype(np.float16),
+            'job_cands': job_cands, 'job_scores': job_scores.astype(np.float16),
+            'cand_keys': cand_keys, 'cand_order': cand_order,
+            'job_keys': job_keys, 'job_order': job_order,
+        }
+        return cls(arrays)
+
+    def save(self, artifact_dir):
+        save_sidecar(os.path.join(artifact_dir, MATCH_DIR), {name: getattr(self, name) for name in TABLES},
+                     dict(self.info, k=self.k))
+
+    # --- lookups ---
+    def candidate_row(self, candidate_id):
+        return find_row(self.cand_keys, self.cand_order, candidate_id)
+
+    def job_row(self, job_id):
+        return find_row(self.job_keys, self.job_order, job_id)
+
+    def jobs_for(self, cand_row, k=None):
+        """(job rows, scores) of a candidate's best jobs."""
+        k = self.k if k is None else min(k, self.k)
+        return np.asarray(self.cand_jobs[cand_row, :k]), np.asarray(self.cand_scores[cand_row, :k], dtype=np.float32)
+
+    def candidates_for(self, job_row, k=None):
+        """(candidate rows, scores) of a job's best candidates."""
+        k = self.k if k is None else min(k, self.job_cands.shape[1])
+        return np.asarray(self.job_cands[job_row, :k]), np.asarray(self.job_scores[job_row, :k], dtype=np.float32)
+
+
+def load_match_table(cand_art, job_art):
+    """The match table stored with the jobs artifact, or None if missing or built from other versions."""
+    loaded = load_sidecar(sidecar_dir(job_art, MATCH_DIR), TABLES,
+                          expect={'jobs_version': job_art.version, 'candidates_version': cand_art.version},
+                          stale_warning="candidate/job match table is stale. Match endpoints disabled until retrain.")
+    return MatchTable(*loaded) if loaded is not None else None
+
+
+def build_match_table(cand_art, job_art, k=DEFAULT_K):
+    """Training stage: builds and saves the candidate <-> job match table."""
+    table = MatchTable.build(cand_art, job_art, k)
+    table.info = {'candidates_version': cand_art.version, 'jobs_version': job_art.version}
+    table.save(job_art.path)
+    return table
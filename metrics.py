@@ -0,0 +1,289 @@
+import os
+import json
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# --- METRICS ---
+# span('encode') times a block of code and adds it to the
+# skillbridge_stage_seconds histogram. instrument(app) also times every
+# request and serves everything in the Prometheus text format at /metrics.
+#
+# Opt-in profiling: send `X-SkillBridge-Profile: 1` and the response gets a
+# Server-Timing header with the stage breakdown of that request (browsers
+# show it in the network tab). A span costs two perf_counter() calls and a
+# short lock, so it is cheap enough to leave on in production.
+#
+# Pre-fork workers (serve.py) each hold their own registry but share one
+# socket, so REGISTRY.share(directory) makes every worker dump its
+# histograms and counters to <directory>/<pid>.json (every FLUSH_SECONDS,
+# and at each scrape). /metrics then sums all the files: counters and
+# histograms cover every worker, including ones that died and were
+# restarted, and never go backwards. Gauges are read live in the worker
+# that answers the scrape.
+
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+PROFILE_HEADER = 'X-SkillBridge-Profile'
+FLUSH_SECONDS = float(os.environ.get('SKILLBRIDGE_METRICS_FLUSH', 1.0))
+
+_profile = ContextVar('skillbridge_profile', default=None)
+
+
+def _escape(value):
+    """Label value escaping of the Prometheus text format: backslash, double quote and newline."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return '{' + pairs + '}'
+
+
+class Histogram:
+    def __init__(self, name, help_text, labelnames=(), buckets=BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labelvalues):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0] * len(self.buckets) + [0.0, 0]
+            if i < len(self.buckets):
+                series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def clear(self):
+        with self._lock:
+            self._series = {}
+
+    def snapshot(self):
+        """{label values: [bucket counts..., sum, count]}, copied under the lock."""
+        with self._lock:
+            return {k: list(v) for k, v in self._series.items()}
+
+    def render(self, merged=None):
+        """Text lines for this histogram, or for `merged` series (e.g. summed over every worker)."""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        items = sorted((self.snapshot() if merged is None else merged).items())
+        for labelvalues, series in items:
+            running = 0
+            for bound, n in zip(self.buckets, series):
+                running += n
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames + ('le',), labelvalues + (bound,))} {running}")
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames + ('le',), labelvalues + ('+Inf',))} {series[-1]}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labelvalues)} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labelvalues)} {series[-1]}")
+        return lines
+
+
+class Callback:
+    """A gauge or counter read from `fn` at scrape time: a number, or {label value: number}."""
+
+    def __init__(self, name, help_text, fn, kind='gauge', labelname=None):
+        self.name = name
+        self.help = help_text
+        self.fn = fn
+        self.kind = kind
+        self.labelname = labelname
+
+    def read(self):
+        try:
+            return self.fn()
+        except Exception:
+            return None  # a broken collector must not break /metrics
+
+    def render(self, value=None):
+        """Text lines for the current value, or for `value` (e.g. summed over every worker)."""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        if value is None:
+            value = self.read()
+        if value is None:
+            return []
+        if isinstance(value, dict):
+            for label, v in sorted(value.items()):
+                lines.append(f"{self.name}{_labels((self.labelname,), (label,))} {float(v)}")
+        elif value is not None:
+            lines.append(f"{self.name} {float(value)}")
+        return lines
+
+
+def _add(total, value):
+    """Sums counter values: numbers, or {label value: number} dicts."""
+    if total is None:
+        return value
+    if isinstance(value, dict):
+        merged = dict(total)
+        for label, v in value.items():
+            merged[label] = merged.get(label, 0) + v
+        return merged
+    return total + value
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self.directory = None
+
+    def histogram(self, name, help_text, labelnames=()):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = Histogram(name, help_text, labelnames)
+            return self._metrics[name]
+
+    def callback(self, name, help_text, fn, kind='gauge', labelname=None):
+        with self._lock:
+            self._metrics[name] = Callback(name, help_text, fn, kind, labelname)
+
+    # --- pre-fork workers ---
+    def share(self, directory, interval=FLUSH_SECONDS):
+        """
+        Call in each worker after the fork: dumps this process's metrics next
+        to the other workers'. Histograms inherited from the parent are
+        dropped here (the parent flush()es its own file before forking), so
+        they are not counted once per worker.
+        """
+        self.directory = directory
+        for metric in list(self._metrics.values()):
+            if isinstance(metric, Histogram):
+                metric.clear()
+        def flush_loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.flush()
+                except OSError as e:
+                    print(f"❌ Error: could not write metrics: {e}")
+        threading.Thread(target=flush_loop, name='metrics-flush', daemon=True).start()
+
+    def snapshot(self):
+        """Histogram series and counter values of this process (gauges stay live)."""
+        snap = {}
+        for name, metric in list(self._metrics.items()):
+            if isinstance(metric, Histogram):
+                snap[name] = [[list(labels), series] for labels, series in metric.snapshot().items()]
+            elif metric.kind == 'counter':
+                snap[name] = metric.read()
+        return snap
+
+    def flush(self, directory=None):
+        path = os.path.join(directory or self.directory, f"{os.getpid()}.json")
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp, path)
+
+    def _merged(self):
+        """Histogram series and counter values summed over every worker's file."""
+        totals = {}
+        for fname in os.listdir(self.directory):
+            if not fname.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.directory, fname)) as f:
+                    snap = json.load(f)
+            except (OSError, ValueError):
+                continue  # a worker that died mid-write; its next flush (or none) decides
+            for name, value in snap.items():
+                metric = self._metrics.get(name)
+                if isinstance(metric, Histogram):
+                    series = totals.setdefault(name, {})
+                    for labels, counts in value:
+                        key = tuple(labels)
+                        series[key] = counts if key not in series else [a + b for a, b in zip(series[key], counts)]
+                elif value is not None:
+                    totals[name] = _add(totals.get(name), value)
+        return totals
+
+    def render(self):
+        merged = None
+        if self.directory is not None:
+            self.flush()  # so this worker's part is as fresh as the scrape
+            merged = self._merged()
+        lines = []
+        for name, metric in list(self._metrics.items()):
+            if merged is None or (isinstance(metric, Callback) and metric.kind != 'counter'):
+                lines.extend(metric.render())
+            elif isinstance(metric, Histogram):
+                lines.extend(metric.render(merged.get(name, {})))
+            else:
+                lines.extend(metric.render(merged.get(name)))
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Prometheus textfile-collector style dump (used for batch jobs like train_model.py)."""
+        tmp = f"{path}.tmp-{os.getpid()}"
+        with open(tmp, 'w') as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+
+REGISTRY = Registry()
+STAGE_SECONDS = REGISTRY.histogram('skillbridge_stage_seconds', 'Time spent in each stage of a request or training run.', ('stage',))
+REQUEST_SECONDS = REGISTRY.histogram('skillbridge_request_seconds', 'HTTP request latency.', ('method', 'endpoint', 'status'))
+
+
+def observe_stage(stage, seconds):
+    STAGE_SECONDS.observe(seconds, stage)
+    profile = _profile.get()
+    if profile is not None:
+        profile.append((stage, seconds))
+
+
+@contextmanager
+def span(stage):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - start)
+
+
+def server_timing(profile, total=None):
+    """Server-Timing header value: 'encode;dur=1.20, search;dur=3.41, total;dur=5.02' (ms)."""
+    parts = [f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in profile]
+    if total is not None:
+        parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts)
+
+
+def instrument(app, path='/metrics'):
+    """Times every request of a Flask app and adds the /metrics endpoint."""
+    from flask import g, request, Response
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_start = time.perf_counter()
+        if request.headers.get(PROFILE_HEADER, '').lower() in ('1', 'true', 'yes'):
+            g._metrics_profile = _profile.set([])
+
+    @app.after_request
+    def _stop_timer(response):
+        started = g.pop('_metrics_start', None)
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        REQUEST_SECONDS.observe(elapsed, request.method, endpoint, str(response.status_code))
+        token = g.pop('_metrics_profile', None)
+        if token is not None:
+            response.headers['Server-Timing'] = server_timing(_profile.get(), total=elapsed)
+            _profile.reset(token)
+        return response
+
+    @app.route(path, methods=['GET'])
+    def metrics():
+        return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+    return app
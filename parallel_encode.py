@@ -0,0 +1,160 @@
+import os
+import time
+import shutil
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from artifacts import MODELS_DIR
+from embedding_store import store_path
+from encoding import load_encoder
+
+# --- PARALLEL, CHECKPOINTED ENCODING ---
+# ParallelEncoder is a drop-in encode_fn for EmbeddingStore.embed(). Texts
+# are cut into shards and spread over a pool of worker processes, each with
+# its own SentenceTransformer and a fixed share of the CPU threads.
+#
+# Every finished shard is saved under models/emb_store/<model>.checkpoints/
+# named by a hash of its texts. If a run dies, the next run rebuilds the
+# same shards (the embedding store has not changed), finds them on disk
+# and only encodes what was left. Checkpoints are cleared once the store
+# has been committed.
+
+DEFAULT_WORKERS = max(1, min(4, (os.cpu_count() or 1) // 2))
+DEFAULT_SHARD_SIZE = 512
+DEFAULT_BATCH_SIZE = 64
+
+_worker_model = None
+
+
+def limit_torch_threads(threads):
+    """Pins torch (and the BLAS libraries under it) to `threads` intra-op threads."""
+    for var in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+        os.environ[var] = str(threads)
+    try:
+        import torch
+    except ImportError:
+        return  # stub encoder (SKILLBRIDGE_ENCODER=stub), nothing to pin
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # already set once in this process
+
+
+def _init_worker(model_name, threads):
+    global _worker_model
+    limit_torch_threads(threads)
+    _worker_model = load_encoder(model_name, purpose='document')
+
+
+def _encode_shard(texts, batch_size):
+    start = time.perf_counter()
+    vecs = _worker_model.encode(texts, batch_size=batch_size, show_progress_bar=False)
+    return np.asarray(vecs, dtype=np.float32), time.perf_counter() - start
+
+
+def shard_key(model_name, texts):
+    h = hashlib.sha1(model_name.encode('utf-8'))
+    for t in texts:
+        h.update(b'\0' + t.encode('utf-8'))
+    return h.hexdigest()
+
+
+class ParallelEncoder:
+    def __init__(self, model_name, workers=DEFAULT_WORKERS, shard_size=DEFAULT_SHARD_SIZE,
+                 batch_size=DEFAULT_BATCH_SIZE, models_dir=None, threads_per_worker=None):
+        self.model_name = model_name
+        self.workers = max(1, int(workers))
+        self.shard_size = max(1, int(shard_size))
+        self.batch_size = batch_size
+        self.threads = threads_per_worker or max(1, (os.cpu_count() or 1) // self.workers)
+        self.checkpoint_dir = store_path(model_name, models_dir or MODELS_DIR) + '.checkpoints'
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        self._pool = None
+        self._model = None
+        self.encoded = 0
+        self.resumed = 0
+        self.seconds = 0.0
+        self.wall = 0.0
+
+    def _executor(self):
+        # Started on first use, so a run where nothing changed never loads a model
+        if self._pool is None:
+            print(f"   - Starting {self.workers} encoder worker(s) x {self.threads} thread(s)")
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),  # torch is not fork-safe
+                initializer=_init_worker,
+                initargs=(self.model_name, self.threads),
+            )
+        return self._pool
+
+    def _encode_local(self, texts):
+        if self._model is None:
+            self._model = load_encoder(self.model_name, purpose='document')
+        start = time.perf_counter()
+        vecs = self._model.encode(texts, batch_size=self.batch_size, show_progress_bar=False)
+        return np.asarray(vecs, dtype=np.float32), time.perf_counter() - start
+
+    def _checkpoint(self, key):
+        return os.path.join(self.checkpoint_dir, f"{key}.npy")
+
+    def _save(self, key, vecs):
+        tmp = self._checkpoint(key) + f".tmp-{os.getpid()}.npy"
+        np.save(tmp, vecs)
+        os.replace(tmp, self._checkpoint(key))
+
+    def _report(self, n, seconds):
+        self.encoded += n
+        self.seconds += seconds
+        print(f"     shard: {n} texts in {seconds:.2f}s ({n / max(seconds, 1e-9):.0f} texts/sec)")
+
+    def __call__(self, texts):
+        texts = list(texts)
+        shards = [texts[i:i + self.shard_size] for i in range(0, len(texts), self.shard_size)]
+        results = [None] * len(shards)
+        pending = []
+        for i, shard in enumerate(shards):
+            key = shard_key(self.model_name, shard)
+            if os.path.exists(self._checkpoint(key)):
+                results[i] = np.load(self._checkpoint(key))
+                self.resumed += len(shard)
+            else:
+                pending.append((i, key, shard))
+
+        start = time.perf_counter()
+        if self.workers == 1:
+            for i, key, shard in pending:
+                results[i], seconds = self._encode_local(shard)
+                self._save(key, results[i])
+                self._report(len(shard), seconds)
+        elif pending:
+            futures = {self._executor().submit(_encode_shard, shard, self.batch_size): (i, key)
+                       for i, key, shard in pending}
+            for fut in as_completed(futures):
+                i, key = futures[fut]
+                results[i], seconds = fut.result()
+                self._save(key, results[i])
+                self._report(len(results[i]), seconds)
+        if pending:
+            self.wall += time.perf_counter() - start
+
+        if not results:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack(results)
+
+    def summary(self):
+        per_worker = self.encoded / self.seconds if self.seconds else 0.0
+        overall = self.encoded / self.wall if self.wall else 0.0
+        return (f"{self.encoded} texts encoded in {self.wall:.1f}s ({overall:.0f} texts/sec overall, "
+                f"{per_worker:.0f} per worker), {self.resumed} resumed from checkpoints")
+
+    def clear_checkpoints(self):
+        """Call once the embedding store has been committed."""
+        shutil.rmtree(self.checkpoint_dir, ignore_errors=True)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
@@ -0,0 +1,112 @@
+import os
+import time
+from sqlite_store import SQLiteStore
+
+# --- COMMUNITY POSTS STORE ---
+# Posts used to be a module-level list: lost on restart, O(n) insert/delete,
+# the whole list serialised on every GET and every worker had its own copy.
+# They now live in SQLite (SKILLBRIDGE_POSTS_DB, default data/posts.db,
+# WAL mode, see sqlite_store.py):
+#
+#   - seq INTEGER PRIMARY KEY (the rowid b-tree) + a unique index on id and
+#     an index on (created_us, seq): insert, delete by id and each feed page
+#     are O(log n)
+#   - keyset pagination: the cursor is the (created_us, seq) of the last post
+#     of a page, so page N costs the same as page 1 (no OFFSET scan)
+
+POSTS_DB = os.environ.get('SKILLBRIDGE_POSTS_DB', os.path.join('data', 'posts.db'))
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+COLUMNS = ('id', 'author', 'role', 'avatar', 'content', 'image', 'likes', 'comments', 'shares')
+COUNTERS = ('likes', 'comments', 'shares')
+
+SEED_POSTS = [
+    {
+        "id": "1",
+        "author": "Sarah Chen",
+        "role": "Senior AI Engineer at TechCorp",
+        "avatar": "https://ui-avatars.com/api/?name=Sarah+Chen&background=06b6d4&color=fff&bold=true",
+        "content": "🚀 Excited to share that our AI team just launched a groundbreaking feature that improved model accuracy by 35%! The journey from research to production taught us invaluable lessons about scalability and teamwork.",
+        "image": "https://images.unsplash.com/photo-1677442136019-21780ecad995?w=800&h=400&fit=crop",
+        "likes": 247,
+        "comments": 52,
+        "shares": 18,
+        "age_seconds": 2 * 3600,
+    }
+]
+
+
+def time_ago(created_us, now=None):
+    """'Just now', '5m ago', '2h ago', '3d ago' (the feed's display format)."""
+    seconds = max(0, int((now or time.time()) - created_us / 1e6))
+    if seconds < 60:
+        return "Just now"
+    for unit, size in (('d', 86400), ('h', 3600), ('m', 60)):
+        if seconds >= size:
+            return f"{seconds // size}{unit} ago"
+
+
+class PostStore(SQLiteStore):
+    def __init__(self, path=POSTS_DB):
+        super().__init__(path)
+
+    def _create_schema(self, conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS posts (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                id TEXT NOT NULL UNIQUE,
+                author TEXT, role TEXT, avatar TEXT, content TEXT, image TEXT,
+                likes INTEGER NOT NULL DEFAULT 0,
+                comments INTEGER NOT NULL DEFAULT 0,
+                shares INTEGER NOT NULL DEFAULT 0,
+                created_us INTEGER NOT NULL
+            )""")
+        conn.execute("CREATE INDEX IF NOT EXISTS posts_feed ON posts (created_us DESC, seq DESC)")
+        now_us = int(time.time() * 1e6)
+        for post in SEED_POSTS:  # first run only: a deleted seed post stays deleted
+            self._insert(conn, post, now_us - post['age_seconds'] * 1000000, ignore_existing=True)
+
+    @staticmethod
+    def _insert(conn, post, created_us, ignore_existing=False):
+        values = [(post.get(c) or 0) if c in COUNTERS else post.get(c) for c in COLUMNS]
+        verb = "INSERT OR IGNORE" if ignore_existing else "INSERT"
+        conn.execute(f"{verb} INTO posts ({', '.join(COLUMNS)}, created_us) VALUES ({', '.join('?' * (len(COLUMNS) + 1))})",
+                     values + [created_us])
+
+    @staticmethod
+    def _to_post(row, now):
+        post = {c: row[c] for c in COLUMNS}
+        post['time'] = time_ago(row['created_us'], now)
+        return post
+
+    @staticmethod
+    def _cursor(row):
+        return f"{row['created_us']}-{row['seq']}"
+
+    def page(self, cursor=None, limit=DEFAULT_LIMIT):
+        """Newest first. Returns (posts, next_cursor); next_cursor is None on the last page. Bad cursors raise ValueError."""
+        limit = min(max(int(limit), 1), MAX_LIMIT)
+        conn = self._connect()
+        select = f"SELECT seq, created_us, {', '.join(COLUMNS)} FROM posts"
+        if cursor:
+            created_us, seq = (int(v) for v in str(cursor).split('-', 1))
+            rows = conn.execute(f"{select} WHERE (created_us, seq) < (?, ?) ORDER BY created_us DESC, seq DESC LIMIT ?",
+                                (created_us, seq, limit + 1)).fetchall()
+        else:
+            rows = conn.execute(f"{select} ORDER BY created_us DESC, seq DESC LIMIT ?", (limit + 1,)).fetchall()
+        now = time.time()
+        next_cursor = self._cursor(rows[limit - 1]) if len(rows) > limit else None
+        return [self._to_post(r, now) for r in rows[:limit]], next_cursor
+
+    def create(self, post):
+        """Stores a post (a dict with COLUMNS) and returns it as the feed shows it."""
+        created_us = int(time.time() * 1e6)
+        self._insert(self._connect(), post, created_us)
+        return dict({c: post.get(c) for c in COLUMNS}, time=time_ago(created_us))
+
+    def delete(self, post_id):
+        """True if a post was removed."""
+        return self._connect().execute("DELETE FROM posts WHERE id = ?", (str(post_id),)).rowcount > 0
+
+    def count(self):
+        return self._connect().execute("SELECT COUNT(*) FROM posts").fetchone()[0]
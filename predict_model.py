@@ -1,17 +1,24 @@
-import pickle
-import pandas as pd
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
-from sentence_transformers import SentenceTransformer
+from encoding import load_encoder
 from utils import parse_skills
+from artifacts import load_artifact
+from ann_index import load_index, top_k
+from matching import query_top_k, exact_matrix
+from cache import QueryCache
 import os
+import sys
+import json
+import time
+import argparse
+import itertools
+from contextlib import redirect_stdout
 
 def load_models():
     print("Loading Unified AI Models... (This might take a moment)")
     try:
-        with open('models/candidates.pkl', 'rb') as f: cand_data = pickle.load(f)
-        with open('models/jobs.pkl', 'rb') as f: job_data = pickle.load(f)
-        with open('models/trainings.pkl', 'rb') as f: train_data = pickle.load(f)
+        cand_data = load_artifact('candidates')
+        job_data = load_artifact('jobs')
+        train_data = load_artifact('trainings')
         return cand_data, job_data, train_data
     except FileNotFoundError:
         print("❌ Error: 'models/' folder not found. Please run 'python train_model.py' first.")
@@ -19,17 +26,16 @@ def load_models():
 
 def start_prediction_tool():
     cand_data, job_data, train_data = load_models()
-    if not cand_data: return
+    if cand_data is None: return
 
     # Extract DataFrames and Embeddings
-    jobs_df = job_data['df']
-    job_embeddings = job_data['emb']
-    
-    tr_df = train_data['df']
-    tr_embeddings = train_data['emb']
+    jobs_df = job_data.meta
+    tr_df = train_data.meta
+    job_index = load_index(job_data)
     
     # Load the AI for on-the-fly encoding
-    model = SentenceTransformer("all-MiniLM-L6-v2")
+    model = load_encoder(job_data.manifest.get('model_name') or "all-MiniLM-L6-v2")
+    query_cache = QueryCache(model.encode)
 
     print("\n" + "="*60)
     print(f"🤖  SKILLBRIDGE UNIFIED PREDICTOR  🤖")
@@ -49,20 +55,15 @@ def start_prediction_tool():
             query_text = input("Enter Job Search Query: ").strip()
             if not query_text: continue
             
-            # 1. Encode the query
-            query_vec = model.encode([query_text])
-            
-            # 2. Calculate Similarity against ALL jobs
-            scores = cosine_similarity(query_vec, job_embeddings)[0]
-            
-            # 3. Get Top 5 Matches
-            top_indices = scores.argsort()[-5:][::-1]
+            # 1. Encode the query, 2 + 3. Get Top 5 Matches (IVF index if built, otherwise every job)
+            # Repeated queries come straight from the cache
+            top_indices, top_scores = query_cache.results('jobs', job_data.version, query_text, (5,), lambda: top_k(
+                job_data, query_cache.embedding(query_text), k=5, index=job_index)[0])
             
             print(f"\n🎯 Top 5 Job Recommendations:")
             print("-" * 70)
-            for idx in top_indices:
-                job = jobs_df.iloc[idx]
-                score = scores[idx] * 100
+            for idx, score in zip(top_indices, top_scores * 100):
+                job = jobs_df.row(idx)
                 
                 # Display logic based on Source Type
                 source_badge = "⭐ PREMIUM" if job['source_type'] == 'Premium' else "🌍 GENERAL"
@@ -86,18 +87,103 @@ def start_prediction_tool():
             query_text = input("Enter Training Topic: ").strip()
             if not query_text: continue
             
-            query_vec = model.encode([query_text])
-            scores = cosine_similarity(query_vec, tr_embeddings)[0]
-            top_indices = scores.argsort()[-3:][::-1]
+            top_indices, top_scores = query_cache.results('trainings', train_data.version, query_text, (3,), lambda: top_k(
+                train_data, query_cache.embedding(query_text), k=3)[0])
             
             print(f"\n📚 Recommended Training Modules:")
             print("-" * 70)
-            for idx in top_indices:
-                tr = tr_df.iloc[idx]
-                score = scores[idx] * 100
+            for idx, score in zip(top_indices, top_scores * 100):
+                tr = tr_df.row(idx)
                 print(f"[{score:.1f}%] {tr['title']}")
                 print(f"       {tr['description']}")
             print("-" * 70)
 
+# --- BATCH MODE ---
+# Non-interactive: queries come from a file or stdin ('-'), as plain lines or
+# JSONL ({"id": ..., "query": ...}). They are encoded --batch-size at a time,
+# each batch is scored against every row with blocked matrix products and an
+# argpartition top-k per query (full precision rows, no IVF), and one JSON
+# line per query is streamed to stdout. Progress goes to stderr.
+#
+#   python predict_model.py --batch queries.txt --k 10 > recommendations.jsonl
+#   cat queries.jsonl | python predict_model.py --batch - --target trainings
+
+RESULT_COLUMNS = {
+    'jobs': ['unified_id', 'unified_title', 'unified_company', 'source_type'],
+    'trainings': ['module_id', 'title'],
+}
+
+def read_queries(stream):
+    """Yields (id, text) per non-blank line; plain lines are numbered, bad JSONL gives text None."""
+    for n, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        if not line.startswith('{'):
+            yield n, line
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield n, None
+            continue
+        yield record.get('id', n), record.get('query') or record.get('text')
+
+def format_result(target, row, score):
+    score = round(float(score) * 100, 1)
+    if target == 'jobs':
+        return {'job_id': str(row['unified_id']), 'title': row['unified_title'], 'company': row['unified_company'],
+                'source_type': row['source_type'], 'match_score': score}
+    return {'module_id': row['module_id'], 'title': row['title'], 'match_score': score}
+
+def run_batch(source, target='jobs', k=10, batch_size=1024, out=None):
+    """Streams JSONL recommendations for every query in `source` (a path or '-' for stdin). Returns the count."""
+    out = out or sys.stdout
+    with redirect_stdout(sys.stderr):  # keep stdout pure JSONL
+        art = load_artifact(target)
+        model = load_encoder(art.manifest.get('model_name') or "all-MiniLM-L6-v2")
+    meta, emb = art.meta, exact_matrix(art)
+    stream = sys.stdin if source == '-' else open(source, encoding='utf-8')
+
+    done, started = 0, time.perf_counter()
+    try:
+        queries = read_queries(stream)
+        while True:
+            batch = list(itertools.islice(queries, batch_size))
+            if not batch:
+                break
+            texts = [text for _, text in batch if text]
+            if texts:
+                vecs = model.encode(texts, batch_size=64, show_progress_bar=False)
+                rows, scores = query_top_k(vecs, emb, k)
+            lines, i = [], 0
+            for qid, text in batch:
+                if not text:
+                    lines.append(json.dumps({'id': qid, 'error': 'no query text'}))
+                    continue
+                results = [format_result(target, meta.row(r, RESULT_COLUMNS[target]), s) for r, s in zip(rows[i], scores[i])]
+                lines.append(json.dumps({'id': qid, 'query': text, 'results': results}, ensure_ascii=False))
+                i += 1
+            out.write("\n".join(lines) + "\n")
+            out.flush()
+            done += len(batch)
+            elapsed = time.perf_counter() - started
+            print(f"   {done} queries ({done / max(elapsed, 1e-9):.0f}/s)", file=sys.stderr)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    print(f"✅ {done} queries in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return done
+
 if __name__ == "__main__":
-    start_prediction_tool()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="SkillBridge predictor: interactive, or bulk JSONL recommendations with --batch.")
+    parser.add_argument('--batch', metavar='PATH', default=None,
+                        help="Read queries (plain lines or JSONL) from PATH, or '-' for stdin, and write JSONL to stdout.")
+    parser.add_argument('--target', choices=sorted(RESULT_COLUMNS), default='jobs', help="What to recommend in batch mode.")
+    parser.add_argument('--k', type=int, default=10, help="Results per query in batch mode.")
+    parser.add_argument('--batch-size', type=int, default=1024, help="Queries encoded and scored together.")
+    args = parser.parse_args()
+    if args.batch is None:
+        start_prediction_tool()
+    else:
+        run_batch(args.batch, target=args.target, k=args.k, batch_size=args.batch_size)
\ No newline at end of file
@@ -0,0 +1,233 @@
+import io
+import os
+import json
+import time
+import signal
+import hashlib
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from cache import LRUCache
+from sqlite_store import SQLiteStore
+
+# --- RESUME PROCESSING POOL ---
+# Parsing a PDF/DOCX is CPU heavy and a malformed file can take seconds, so
+# it never runs in a Flask request thread. ResumeProcessor sends the raw
+# bytes to a small process pool where every file gets:
+#   - a size limit (checked before it is even queued)
+#   - a page limit and a character limit (pages are extracted one by one
+#     and extraction stops once enough text has been collected)
+#   - a time limit, enforced inside the worker with SIGALRM
+# A worker killed by a file (segfault, OOM kill) breaks the whole pool, and a
+# worker stuck past the backstop timeout (e.g. hung in C code, where SIGALRM
+# never fires) is terminated together with its pool: that file gets a 422
+# and the next upload starts a fresh pool.
+# Extracted text is cached by the sha256 of the file, so re-uploading the
+# same CV skips parsing entirely.
+
+MAX_FILE_BYTES = int(os.environ.get('SKILLBRIDGE_RESUME_MAX_BYTES', 5 * 1024 * 1024))
+MAX_PAGES = int(os.environ.get('SKILLBRIDGE_RESUME_MAX_PAGES', 20))
+MAX_CHARS = int(os.environ.get('SKILLBRIDGE_RESUME_MAX_CHARS', 20000))
+TIMEOUT_SECONDS = float(os.environ.get('SKILLBRIDGE_RESUME_TIMEOUT', 10))
+BACKSTOP_GRACE = 5  # extra seconds before the request thread gives up on a worker
+POOL_SIZE = int(os.environ.get('SKILLBRIDGE_RESUME_WORKERS', 2))
+CACHE_SIZE = int(os.environ.get('SKILLBRIDGE_RESUME_CACHE_SIZE', 1000))
+JOBS_DB = os.environ.get('SKILLBRIDGE_RESUME_JOBS_DB', os.path.join('data', 'resume_jobs.db'))
+JOB_TTL_SECONDS = int(os.environ.get('SKILLBRIDGE_RESUME_JOB_TTL', 3600))
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx', '.txt')
+
+
+class ResumeError(Exception):
+    """A resume we refuse or fail to process; `status` is the HTTP code to return."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _iter_pdf_text(data, max_pages):
+    import pypdf
+    reader = pypdf.PdfReader(io.BytesIO(data))
+    for i, page in enumerate(reader.pages):
+        if i >= max_pages:
+            break
+        yield page.extract_text() or ""
+
+
+def _iter_docx_text(data):
+    import docx
+    for para in docx.Document(io.BytesIO(data)).paragraphs:
+        yield para.text
+
+
+def _on_timeout(signum, frame):
+    raise TimeoutError("resume parsing timed out")
+
+
+def extract_text(data, filename, max_pages=MAX_PAGES, max_chars=MAX_CHARS, timeout=TIMEOUT_SECONDS):
+    """
+    Runs inside a pool worker. Returns the cleaned text (possibly '').
+    Parts are collected in a list and joined once, and extraction stops as
+    soon as max_chars have been read.
+    """
+    name = filename.lower()
+    if name.endswith('.pdf'):
+        parts = _iter_pdf_text(data, max_pages)
+    elif name.endswith('.docx'):
+        parts = _iter_docx_text(data)
+    elif name.endswith('.txt'):
+        parts = iter([data.decode('utf-8', errors='replace')])
+    else:
+        return ""
+
+    use_alarm = timeout and hasattr(signal, 'setitimer')
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _on_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    collected, size = [], 0
+    try:
+        for part in parts:
+            collected.append(part)
+            size += len(part)
+            if size >= max_chars:
+                break
+    except TimeoutError:
+        raise
+    except Exception as e:
+        print(f"Error parsing file: {e}")
+        return ""
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+    # Basic cleaning: Remove newlines and extra spaces
+    return " ".join(" ".join(collected).split())[:max_chars]
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class ResumeProcessor:
+    def __init__(self, workers=POOL_SIZE, timeout=TIMEOUT_SECONDS, max_bytes=MAX_FILE_BYTES, cache_size=CACHE_SIZE,
+                 grace=BACKSTOP_GRACE):
+        self.workers = workers
+        self.timeout = timeout
+        self.grace = grace
+        self.max_bytes = max_bytes
+        self.cache = LRUCache(cache_size)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def _executor(self):
+        with self._pool_lock:
+            if self._pool is None:
+                # Never fork: this process runs the batching encoder's and Flask's
+                # threads, and a fork copies whatever locks they hold. forkserver
+                # forks workers from a clean single-threaded server instead.
+                method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context(method))
+            return self._pool
+
+    def _discard(self, pool):
+        """
+        Drops a broken or stuck pool (once, however many requests saw it fail)
+        and terminates its workers; the next extract() starts a new pool.
+        """
+        with self._pool_lock:
+            if self._pool is pool:
+                self._pool = None
+        for process in list((pool._processes or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def check(self, data, filename):
+        """Cheap checks done in the request thread before anything is queued."""
+        if not filename.lower().endswith(SUPPORTED_EXTENSIONS):
+            raise ResumeError(f"Unsupported file type. Upload one of: {', '.join(SUPPORTED_EXTENSIONS)}", 415)
+        if len(data) > self.max_bytes:
+            raise ResumeError(f"File too large (max {self.max_bytes // (1024 * 1024)} MB)", 413)
+        if not data:
+            raise ResumeError("Empty file", 400)
+
+    def extract(self, data, filename):
+        """Text of a resume, from the cache or the pool. Raises ResumeError."""
+        self.check(data, filename)
+        key = content_hash(data)
+        text = self.cache.get(key)
+        if text is not None:
+            return key, text
+
+        pool = self._executor()
+        try:
+            future = pool.submit(extract_text, data, filename, timeout=self.timeout)
+            # The worker enforces the timeout itself; this is only a backstop
+            text = future.result(timeout=self.timeout + self.grace)
+        except (TimeoutError, FutureTimeout):
+            if not future.done():
+                # The worker ignored its own alarm: it is stuck and would hold a pool slot forever
+                self._discard(pool)
+            raise ResumeError("Resume took too long to process", 422)
+        except BrokenProcessPool:
+            self._discard(pool)
+            raise ResumeError("Could not process this file", 422)
+        if not text:
+            raise ResumeError("Could not extract text from file", 400)
+        self.cache.put(key, text)
+        return key, text
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+
+# --- ASYNC UPLOAD JOBS ---
+# ?async=1 uploads are processed by the worker that accepted them, but the
+# poll can land on any serve.py worker, so their state lives in SQLite
+# (SKILLBRIDGE_RESUME_JOBS_DB, default data/resume_jobs.db) instead of in
+# process memory. Jobs older than SKILLBRIDGE_RESUME_JOB_TTL seconds
+# (default 1 hour) are dropped, including ones whose worker died mid-way.
+
+class ResumeJobStore(SQLiteStore):
+    def __init__(self, path=JOBS_DB, ttl=JOB_TTL_SECONDS):
+        super().__init__(path)
+        self.ttl = ttl
+
+    def _create_schema(self, conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS resume_jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                payload TEXT,
+                error TEXT,
+                http_status INTEGER,
+                created REAL NOT NULL
+            )""")
+        conn.execute("CREATE INDEX IF NOT EXISTS resume_jobs_created ON resume_jobs (created)")
+
+    def create(self, job_id):
+        conn = self._connect()
+        now = time.time()
+        conn.execute("DELETE FROM resume_jobs WHERE created < ?", (now - self.ttl,))
+        conn.execute("INSERT INTO resume_jobs (id, status, created) VALUES (?, 'pending', ?)", (job_id, now))
+
+    def finish(self, job_id, payload):
+        self._connect().execute("UPDATE resume_jobs SET status = 'done', payload = ? WHERE id = ?",
+                                (json.dumps(payload), job_id))
+
+    def fail(self, job_id, message, status):
+        self._connect().execute("UPDATE resume_jobs SET status = 'error', error = ?, http_status = ? WHERE id = ?",
+                                (message, status, job_id))
+
+    def get(self, job_id):
+        """{'status', 'payload', 'error', 'http_status'} of a job, or None if unknown or expired."""
+        row = self._connect().execute("SELECT status, payload, error, http_status FROM resume_jobs WHERE id = ? AND created >= ?",
+                                      (str(job_id), time.time() - self.ttl)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job['payload'] = json.loads(job['payload']) if job['payload'] else None
+        return job
@@ -0,0 +1,141 @@
+import os
+import gc
+import sys
+import time
+import signal
+import shutil
+import socket
+import argparse
+import tempfile
+
+# --- PRE-FORK SERVER ---
+# Production entry point (python app.py is the single-process dev server).
+# The parent opens the listening socket and runs app.load_models() once, which
+# loads the artifacts, indexes and the SentenceTransformer. It then forks N workers
+# that share all of that copy-on-write. gc.freeze() before the fork keeps
+# the garbage collector from touching (and so copying) those pages. The
+# kernel spreads incoming connections over the workers, each running a
+# threaded werkzeug server on the inherited socket.
+#
+# /metrics sums every worker's counters and histograms: each worker dumps
+# them into SKILLBRIDGE_METRICS_DIR (default: a temp dir removed on exit),
+# see metrics.py.
+#
+# CPU threads are split up front: each worker gets cores // workers torch
+# intra-op threads. The parent stays at one thread and never encodes, so no
+# OpenMP pool exists yet at fork time.
+#
+#   python serve.py --workers 4 --port 5000
+
+DEFAULT_WORKERS = int(os.environ.get('SKILLBRIDGE_WORKERS', os.cpu_count() or 1))
+
+
+def run_worker(server_app, sock, threads, number, metrics_dir):
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    from parallel_encode import limit_torch_threads
+    from werkzeug.serving import make_server
+    from metrics import REGISTRY
+    limit_torch_threads(threads)
+    REGISTRY.share(metrics_dir)
+    import app as skillbridge
+    skillbridge.warm_up_models()  # builds this worker's thread pool before real traffic (and flips /readyz)
+    print(f"   - worker {number} (pid {os.getpid()}) ready, {threads} torch thread(s)")
+    server = make_server(sock.getsockname()[0], sock.getsockname()[1], server_app, threaded=True, fd=sock.fileno())
+    server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve SkillBridge with N pre-forked workers sharing one model load.")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--threads-per-worker', type=int, default=None,
+                        help="torch intra-op threads per worker (default: cores // workers).")
+    parser.add_argument('--backlog', type=int, default=2048)
+    args = parser.parse_args()
+
+    if not hasattr(os, 'fork'):
+        sys.exit("❌ Error: serve.py needs fork(); use 'python app.py' on this platform.")
+    workers = max(1, args.workers)
+    threads = args.threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+
+    from parallel_encode import limit_torch_threads
+    limit_torch_threads(1)
+    sock = socket.create_server((args.host, args.port), backlog=args.backlog)
+    sock.set_inheritable(True)
+
+    print(f"--- Loading models once in the parent (pid {os.getpid()}) ---")
+    os.environ['SKILLBRIDGE_BACKGROUND_LOAD'] = '0'
+    import app as skillbridge
+    try:
+        skillbridge.load_models(warm_up=False)  # no encode here: workers warm up after the fork
+    except FileNotFoundError:
+        sys.exit("❌ Error: Models not found. Run 'train_model.py' first.")
+    metrics_dir = os.environ.get('SKILLBRIDGE_METRICS_DIR')
+    if metrics_dir:
+        # Files from a previous run would be added to this run's counters
+        os.makedirs(metrics_dir, exist_ok=True)
+        for fname in os.listdir(metrics_dir):
+            if fname.endswith(('.json', '.tmp')):
+                os.remove(os.path.join(metrics_dir, fname))
+    else:
+        metrics_dir = tempfile.mkdtemp(prefix='skillbridge-metrics-')
+    from metrics import REGISTRY
+    REGISTRY.flush(metrics_dir)  # the load's stage timings; workers only report their own
+    # Everything allocated so far is shared with the workers; keep GC off it
+    gc.collect()
+    gc.freeze()
+
+    children = {}
+    stopping = False
+
+    def spawn(number):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                run_worker(skillbridge.app, sock, threads, number, metrics_dir)
+            except KeyboardInterrupt:
+                pass
+            except Exception as e:
+                print(f"❌ Error: worker {number} crashed: {e}")
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = number
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    print(f"--- Forking {workers} worker(s) on http://{args.host}:{args.port} ---")
+    for number in range(workers):
+        spawn(number)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        number = children.pop(pid, None)
+        if number is not None and not stopping:
+            print(f"⚠️ Warning: worker {number} (pid {pid}) exited with status {status}, restarting")
+            time.sleep(1)  # no tight loop if it keeps dying
+            spawn(number)
+    sock.close()
+    if not os.environ.get('SKILLBRIDGE_METRICS_DIR'):
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+    print("✅ All workers stopped.")
+
+
+if __name__ == "__main__":
+    main()
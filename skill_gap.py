@@ -0,0 +1,116 @@
+import os
+import numpy as np
+from artifacts import save_sidecar, load_sidecar, sidecar_dir
+from matching import match_top_k, exact_matrix, id_keys, find_row
+
+# --- SKILL GAP: JOB -> TRAINING AND SKILL -> TRAINING RANKINGS ---
+# Built at train time next to the skill index, so a skill-gap request never
+# scans the training embeddings:
+#
+#   models/jobs/gap/job_trainings.npy     (jobs, k) int32 training rows, most similar first
+#   models/jobs/gap/job_scores.npy        (jobs, k) float16 cosine scores
+#   models/jobs/gap/skill_indptr.npy      CSR skill -> trainings that cover it,
+#   models/jobs/gap/skill_trainings.npy   broadest training (most skills) first
+#   models/jobs/gap/job_keys.npy          sorted job ids (+ job_order.npy: their rows)
+#   models/jobs/gap/info.json             k, format and the artifact versions it was built from
+#
+# A request diffs the candidate's skills against the job's, then greedily
+# picks the trainings that cover the most missing skills (set cover), using
+# the job -> training similarity to break ties.
+
+GAP_DIR = 'gap'
+DEFAULT_K = 10
+MAX_TRAININGS = 5
+ARRAYS = ('job_trainings', 'job_scores', 'skill_indptr', 'skill_trainings', 'job_keys', 'job_order')
+GAP_FORMAT = 2  # 2: job ids stored with the rankings
+
+
+def _skill_trainings(training_indptr, training_indices, n_skills):
+    """Inverts the training x skill CSR; each skill's trainings are ordered broadest first."""
+    n_train = len(training_indptr) - 1
+    breadth = np.diff(training_indptr)
+    rows = np.repeat(np.arange(n_train, dtype=np.int32), breadth)
+    order = np.lexsort((rows, -breadth[rows], training_indices))
+    indptr = np.zeros(n_skills + 1, dtype=np.int64)
+    np.cumsum(np.bincount(training_indices, minlength=n_skills), out=indptr[1:])
+    return indptr, rows[order]
+
+
+class SkillGapIndex:
+    def __init__(self, arrays, info=None):
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+        self.info = info or {}
+
+    # --- training stage ---
+    @classmethod
+    def build(cls, job_art, train_art, skill_idx, k=DEFAULT_K):
+        job_trainings, job_scores, _, _ = match_top_k(exact_matrix(job_art), exact_matrix(train_art), k)
+        skill_indptr, skill_trainings = _skill_trainings(
+            skill_idx.training_indptr, skill_idx.training_indices, len(skill_idx.vocab))
+        job_keys, job_order = id_keys(job_art.meta['unified_id'][:])
+        return cls({
+            'job_trainings': job_trainings, 'job_scores': job_scores.astype(np.float16),
+            'skill_indptr': skill_indptr, 'skill_trainings': skill_trainings,
+            'job_keys': job_keys, 'job_order': job_order,
+        })
+
+    def save(self, artifact_dir):
+        save_sidecar(os.path.join(artifact_dir, GAP_DIR), {name: getattr(self, name) for name in ARRAYS},
+                     dict(self.info, k=int(self.job_trainings.shape[1]), format=GAP_FORMAT))
+
+    # --- lookups ---
+    def job_row(self, job_id):
+        return find_row(self.job_keys, self.job_order, job_id)
+
+    def trainings_for_skill(self, sid):
+        return self.skill_trainings[self.skill_indptr[sid]:self.skill_indptr[sid + 1]]
+
+    def plan(self, skill_idx, job_row, have_sids, max_trainings=MAX_TRAININGS):
+        """
+        Missing skills of a job and the trainings that cover them.
+        Returns (target, missing, [(training row, covered sids, similarity)], uncovered).
+        """
+        target = [int(s) for s in skill_idx.job_skill_ids(job_row)]
+        have = set(int(s) for s in have_sids)
+        missing = [s for s in target if s not in have]
+
+        similarity = {int(t): float(s) for t, s in zip(self.job_trainings[job_row], self.job_scores[job_row])}
+        covers = {}
+        for sid in missing:
+            for t in self.trainings_for_skill(sid):
+                covers.setdefault(int(t), set()).add(sid)
+
+        # Greedy set cover: most new missing skills first, then closest to the job
+        remaining, picked = set(missing), []
+        while remaining and covers and len(picked) < max_trainings:
+            best = max(covers, key=lambda t: (len(covers[t] & remaining), similarity.get(t, -1.0), -t))
+            gain = covers.pop(best) & remaining
+            if not gain:
+                break
+            picked.append((best, [s for s in missing if s in gain], similarity.get(best)))
+            remaining -= gain
+        return target, missing, picked, [s for s in missing if s in remaining]
+
+    def related(self, job_row, k=3, exclude=()):
+        """Trainings closest to the job overall, for when no module covers a missing skill."""
+        out = [(int(t), float(s)) for t, s in zip(self.job_trainings[job_row], self.job_scores[job_row])
+               if int(t) not in exclude]
+        return out[:k]
+
+
+def load_skill_gap(job_art, train_art):
+    """The skill-gap rankings stored with the jobs artifact, or None if missing or built from other versions."""
+    loaded = load_sidecar(sidecar_dir(job_art, GAP_DIR), ARRAYS,
+                          expect={'jobs_version': job_art.version, 'trainings_version': train_art.version,
+                                  'format': GAP_FORMAT},
+                          stale_warning="skill-gap rankings are stale. Skill-gap endpoint disabled until retrain.")
+    return SkillGapIndex(*loaded) if loaded is not None else None
+
+
+def build_skill_gap(job_art, train_art, skill_idx, k=DEFAULT_K):
+    """Training stage: builds and saves the job -> training and skill -> training rankings."""
+    gap = SkillGapIndex.build(job_art, train_art, skill_idx, k)
+    gap.info = {'jobs_version': job_art.version, 'trainings_version': train_art.version}
+    gap.save(job_art.path)
+    return gap
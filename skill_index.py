@@ -0,0 +1,266 @@
+import os
+from collections import deque
+import numpy as np
+from scipy.sparse import csr_matrix
+from utils import parse_skills, normalize_skill_text
+from artifacts import save_sidecar, load_sidecar, sidecar_dir
+from ann_index import top_k, exact_top_k, RESCORE_FACTOR
+
+# --- SKILL INDEX ---
+# Built once at train time from the same parse_skills() the rest of the code
+# uses, and stored next to the jobs artifact:
+#
+#   models/jobs/skills/vocab.json                  every known skill (normalised)
+#   models/jobs/skills/job_indptr|job_indices      job x skill matrix (CSR)
+#   models/jobs/skills/skill_indptr|skill_jobs     inverted index: skill -> job rows
+#   models/jobs/skills/training_indptr|...indices  training x skill matrix (CSR)
+#
+# Premium jobs bring explicit skills. General jobs (all.csv) have none, so
+# their text is run through SkillMatcher to tag the vocabulary skills it
+# mentions. The same matcher pulls skills out of queries and resumes.
+
+INDEX_DIR = 'skills'
+INDEX_MANIFEST = 'index.json'
+ARRAYS = ('job_indptr', 'job_indices', 'skill_indptr', 'skill_jobs', 'training_indptr', 'training_indices')
+HYBRID_ALPHA = float(os.environ.get('SKILLBRIDGE_HYBRID_ALPHA', 0.8))
+RERANK_POOL = 50
+
+# Single words that are skills in a list but mostly plain English in free text
+AMBIGUOUS_SKILLS = {'go', 'basic', 'basics', 'core'}
+
+
+def skill_tokens(text):
+    """Tokenises like normalize_skill_text(), keeping '.net', 'c++', 'node.js' intact."""
+    out = []
+    for tok in normalize_skill_text(text).replace(';', ' ').split():
+        tok = tok.rstrip('.,:-').lstrip('-')
+        if tok:
+            out.append(tok)
+    return out
+
+
+class SkillMatcher:
+    """
+    Aho-Corasick automaton over skill tokens: finds every vocabulary skill in
+    a text in one left-to-right pass, whatever the size of the vocabulary.
+    Working on tokens rather than characters gives word boundaries for free
+    ('git' does not match inside 'digital').
+    """
+
+    def __init__(self, vocab, min_len=2):
+        self.vocab = list(vocab)
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+        for sid, skill in enumerate(self.vocab):
+            toks = skill_tokens(skill)
+            if not toks or (len(toks) == 1 and (len(toks[0]) < min_len or toks[0] in AMBIGUOUS_SKILLS)):
+                continue
+            node = 0
+            for tok in toks:
+                if tok not in self.goto[node]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                    self.goto[node][tok] = len(self.goto) - 1
+                node = self.goto[node][tok]
+            self.out[node].append(sid)
+
+        # Breadth-first failure links; outputs are merged along them
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for tok, child in self.goto[node].items():
+                queue.append(child)
+                f = self.fail[node]
+                while f and tok not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[child] = self.goto[f].get(tok, 0) if self.goto[f].get(tok) != child else 0
+                self.out[child] = self.out[child] + self.out[self.fail[child]]
+
+    def find_ids(self, text):
+        """Skill ids found in text, unique, in order of first appearance."""
+        found, node = {}, 0
+        for tok in skill_tokens(text):
+            while node and tok not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(tok, 0)
+            for sid in self.out[node]:
+                found.setdefault(sid, None)
+        return list(found)
+
+    def find(self, text):
+        return [self.vocab[i] for i in self.find_ids(text)]
+
+
+def _csr(rows, n_cols):
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum([len(r) for r in rows], out=indptr[1:])
+    indices = np.fromiter((c for r in rows for c in r), dtype=np.int32, count=int(indptr[-1]))
+    return indptr, indices
+
+
+def _invert(indptr, indices, n_cols):
+    """CSR rows->cols into cols->rows (the inverted index)."""
+    rows = np.repeat(np.arange(len(indptr) - 1, dtype=np.int32), np.diff(indptr))
+    order = np.argsort(indices, kind='stable')
+    col_indptr = np.zeros(n_cols + 1, dtype=np.int64)
+    np.cumsum(np.bincount(indices, minlength=n_cols), out=col_indptr[1:])
+    return col_indptr, rows[order]
+
+
+class SkillIndex:
+    def __init__(self, vocab, arrays, info=None):
+        self.vocab = vocab
+        self.skill_id = {s: i for i, s in enumerate(vocab)}
+        self.job_indptr = arrays['job_indptr']
+        self.job_indices = arrays['job_indices']
+        self.skill_indptr = arrays['skill_indptr']
+        self.skill_jobs = arrays['skill_jobs']
+        self.training_indptr = arrays['training_indptr']
+        self.training_indices = arrays['training_indices']
+        self.info = info or {}
+        self.job_skill_counts = np.diff(self.job_indptr)
+        self.matrix = csr_matrix(
+            (np.ones(len(self.job_indices), dtype=np.float32), self.job_indices, self.job_indptr),
+            shape=(len(self.job_indptr) - 1, len(vocab)),
+        )
+        self._matcher = None
+
+    @property
+    def matcher(self):
+        if self._matcher is None:
+            self._matcher = SkillMatcher(self.vocab)
+        return self._matcher
+
+    # --- training stage ---
+    @classmethod
+    def build(cls, jobs_meta, trainings_meta=None):
+        """parse_skills() over every job and training, plus matcher tagging for jobs without skills."""
+        # An empty jobs artifact has no columns at all
+        job_lists = [parse_skills(s) for s in jobs_meta['unified_skills'][:]] if 'unified_skills' in jobs_meta else []
+        tr_lists = [parse_skills(s) for s in trainings_meta['skills_covered'][:]] \
+            if trainings_meta is not None and 'skills_covered' in trainings_meta else []
+
+        vocab = sorted({s for lst in job_lists + tr_lists for s in lst})
+        skill_id = {s: i for i, s in enumerate(vocab)}
+        matcher = SkillMatcher(vocab)
+
+        texts = jobs_meta['text_for_emb'] if job_lists else []
+        job_rows = []
+        for i, lst in enumerate(job_lists):
+            ids = [skill_id[s] for s in lst] if lst else matcher.find_ids(texts[i])
+            job_rows.append(sorted(set(ids)))
+        tr_rows = [sorted({skill_id[s] for s in lst}) for lst in tr_lists]
+
+        job_indptr, job_indices = _csr(job_rows, len(vocab))
+        skill_indptr, skill_jobs = _invert(job_indptr, job_indices, len(vocab))
+        training_indptr, training_indices = _csr(tr_rows, len(vocab))
+        arrays = {
+            'job_indptr': job_indptr, 'job_indices': job_indices,
+            'skill_indptr': skill_indptr, 'skill_jobs': skill_jobs,
+            'training_indptr': training_indptr, 'training_indices': training_indices,
+        }
+        index = cls(vocab, arrays)
+        index._matcher = matcher
+        return index
+
+    def save(self, artifact_dir):
+        save_sidecar(os.path.join(artifact_dir, INDEX_DIR), {name: getattr(self, name) for name in ARRAYS},
+                     dict(self.info, skills=len(self.vocab)), INDEX_MANIFEST, documents={'vocab': self.vocab})
+
+    # --- lookups ---
+    def skill_ids(self, skills):
+        """Ids of known skills from a list or a 'python; sql' string (unknown ones are ignored)."""
+        items = skills if isinstance(skills, list) else [skills]
+        ids = []
+        for item in items:
+            for s in parse_skills(item):
+                if s in self.skill_id and self.skill_id[s] not in ids:
+                    ids.append(self.skill_id[s])
+        return ids
+
+    def extract_ids(self, text):
+        return self.matcher.find_ids(text)
+
+    def extract(self, text):
+        return self.matcher.find(text)
+
+    def job_skill_ids(self, row):
+        return self.job_indices[self.job_indptr[row]:self.job_indptr[row + 1]]
+
+    def jobs_with(self, sids, mode='any'):
+        """Sorted job rows having any (or all) of the skills, straight from the inverted index."""
+        lists = [self.skill_jobs[self.skill_indptr[s]:self.skill_indptr[s + 1]] for s in sids]
+        if not lists:
+            return np.zeros(0, dtype=np.int64)
+        if mode == 'all':
+            out = lists[0]
+            for lst in lists[1:]:
+                out = np.intersect1d(out, lst, assume_unique=True)
+            return np.asarray(out, dtype=np.int64)
+        return np.unique(np.concatenate(lists)).astype(np.int64)
+
+    def lexical_scores(self, rows, sids):
+        """Overlap coefficient |job ∩ query| / min(|job|, |query|) for each job row."""
+        if not len(sids) or not len(rows):
+            return np.zeros(len(rows), dtype=np.float32)
+        query = np.zeros(len(self.vocab), dtype=np.float32)
+        query[list(sids)] = 1.0
+        overlap = self.matrix[rows] @ query
+        denom = np.minimum(self.job_skill_counts[rows], len(sids))
+        return np.where(denom > 0, overlap / np.maximum(denom, 1), 0.0).astype(np.float32)
+
+    def matched_skills(self, row, sids):
+        wanted = set(sids)
+        return [self.vocab[s] for s in self.job_skill_ids(row) if s in wanted]
+
+    def hybrid_top_k(self, art, ann, query_vec, query_sids, k=10, alpha=HYBRID_ALPHA, nprobe=None,
+                     filter_sids=None, filter_mode='any'):
+        """
+        Fused alpha * semantic + (1 - alpha) * lexical ranking for one query.
+        With a skill filter only the jobs from the inverted index are scored;
+        otherwise the semantic top RERANK_POOL are re-ranked.
+        Returns (rows, fused_scores, matched_skill_names_per_row).
+        """
+        sids = list(dict.fromkeys(list(query_sids) + list(filter_sids or [])))
+        if filter_sids:
+            rows = self.jobs_with(filter_sids, filter_mode)
+            q = np.asarray(query_vec, dtype=np.float32).reshape(-1)
+            q = q / max(float(np.linalg.norm(q)), 1e-12)
+            semantic = np.asarray(art.emb[rows], dtype=np.float32) @ q if len(rows) else np.zeros(0, dtype=np.float32)
+        else:
+            rows, semantic = top_k(art, query_vec, k=max(k, RERANK_POOL), index=ann, nprobe=nprobe)[0]
+
+        lexical = self.lexical_scores(rows, sids)
+        fused = alpha * semantic + (1 - alpha) * lexical if sids else semantic
+        if filter_sids and art.full is not None and len(rows) > k:
+            # Compact vectors shortlist, float32 decides (top_k() already did this above)
+            pool = exact_top_k(fused, k * RESCORE_FACTOR)
+            rows, lexical = rows[pool], lexical[pool]
+            fused = alpha * art.exact_scores(q, rows) + (1 - alpha) * lexical
+        top = exact_top_k(fused, k)
+        rows = rows[top]
+        return rows, fused[top], [self.matched_skills(r, sids) for r in rows]
+
+
+def load_skill_index(art):
+    """The skill index stored with an artifact, or None if missing or built for another version."""
+    loaded = load_sidecar(sidecar_dir(art, INDEX_DIR), ARRAYS, expect={'artifact_version': art.version},
+                          stale_warning=f"{art.name} skill index is stale. Hybrid search disabled until retrain.",
+                          manifest_name=INDEX_MANIFEST, documents=('vocab',))
+    if loaded is None:
+        return None
+    arrays, info = loaded
+    return SkillIndex(arrays.pop('vocab'), arrays, info)
+
+
+def build_skill_index(job_art, train_art=None):
+    """Training stage: builds and saves the skill index for the jobs artifact."""
+    index = SkillIndex.build(job_art.meta, train_art.meta if train_art is not None else None)
+    index.info = {
+        'artifact_version': job_art.version,
+        'training_version': train_art.version if train_art is not None else None,
+    }
+    index.save(job_art.path)
+    return index
@@ -0,0 +1,58 @@
+import os
+import sqlite3
+import threading
+
+# --- SHARED SQLITE STORES ---
+# State every serve.py worker must see (community posts, async resume jobs)
+# lives in small SQLite files rather than in process memory:
+#
+#   - WAL journal: readers never block the writer and vice versa, so the
+#     workers and their threads can all share one file safely
+#     (busy_timeout covers the short write lock between processes)
+#   - connections are per thread and per process (sqlite3 connections must
+#     not cross a fork), opened lazily on first use
+#   - the schema is created once per file, tracked by PRAGMA user_version
+
+
+class SQLiteStore:
+    SCHEMA_VERSION = 1
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)  # autocommit; BEGIN where needed
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # durable at checkpoints, safe against corruption in WAL mode
+        conn.execute("PRAGMA busy_timeout=5000")
+        self._local.conn, self._local.pid = conn, os.getpid()
+        if not self._schema_ready:
+            with self._schema_lock:
+                if not self._schema_ready:
+                    self._migrate(conn)
+                    self._schema_ready = True
+        return conn
+
+    def _migrate(self, conn):
+        conn.execute("BEGIN IMMEDIATE")  # one process creates the schema, the others wait and see it done
+        try:
+            if conn.execute("PRAGMA user_version").fetchone()[0] < self.SCHEMA_VERSION:
+                self._create_schema(conn)
+                conn.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _create_schema(self, conn):
+        """Creates the tables (inside the migration transaction)."""
+        raise NotImplementedError
@@ -0,0 +1,43 @@
+import os
+import sys
+import shutil
+import tempfile
+import pytest
+
+# Tests run offline and never touch the real models/ or data/posts.db:
+# the stub encoder stands in for the transformer, and everything the app
+# reads at import time points into one throwaway folder.
+WORKDIR = tempfile.mkdtemp(prefix='skillbridge-tests-')
+os.environ['SKILLBRIDGE_ENCODER'] = 'stub'
+os.environ['SKILLBRIDGE_MODELS_DIR'] = os.path.join(WORKDIR, 'models')
+os.environ['SKILLBRIDGE_POSTS_DB'] = os.path.join(WORKDIR, 'posts.db')
+os.environ['SKILLBRIDGE_RESUME_JOBS_DB'] = os.path.join(WORKDIR, 'resume_jobs.db')
+os.environ['SKILLBRIDGE_BACKGROUND_LOAD'] = '0'
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(WORKDIR, ignore_errors=True)
+
+
+@pytest.fixture(scope='session')
+def app_module():
+    """app.py with models trained on a small synthetic corpus (once per test run)."""
+    import train_model
+    from benchmarks import synthetic
+    synthetic.write_corpus(WORKDIR, 400, n_candidates=40)
+    cwd = os.getcwd()
+    os.chdir(WORKDIR)  # train_model reads data/ relative to the working directory
+    try:
+        train_model.prepare_unified_model(workers=1)
+    finally:
+        os.chdir(cwd)
+    import app
+    app.load_models()
+    return app
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
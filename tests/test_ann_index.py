@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+from artifacts import save_artifact, load_artifact
+from ann_index import IVFIndex, build_index, load_index, sample_queries, exact_top_k, spherical_kmeans, top_k
+
+
+def _clustered(n=3000, dim=16, clusters=30, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    return (centers[rng.integers(clusters, size=n)] + rng.normal(scale=0.3, size=(n, dim))).astype(np.float32)
+
+
+@pytest.fixture
+def jobs(tmp_path):
+    emb = _clustered()
+    df = pd.DataFrame({'unified_id': [f"J{i}" for i in range(len(emb))]})
+    save_artifact('jobs', df, emb, 'test-model', models_dir=str(tmp_path))
+    return load_artifact('jobs', models_dir=str(tmp_path))
+
+
+def test_recall_against_exact_search(jobs):
+    index, report = build_index(jobs)
+    assert index.nlist == int(4 * np.sqrt(len(jobs)))
+    assert report[0]['nprobe'] == 'exact'
+    chosen = next(r for r in report if r['nprobe'] == index.info['nprobe'])
+    assert chosen['recall'] >= 0.95
+
+    queries = sample_queries(jobs.emb, n=50, seed=1)
+    exact = [ids for ids, _ in top_k(jobs, queries, k=10)]
+    approx = [ids for ids, _ in top_k(jobs, queries, k=10, index=index)]
+    recall = np.mean([len(np.intersect1d(a, e)) / 10 for a, e in zip(approx, exact)])
+    assert recall >= 0.9
+
+
+def test_probing_every_list_is_exact(jobs):
+    index = IVFIndex.build(jobs.emb, nlist=20)
+    assert np.array_equal(np.sort(index.list_ids), np.arange(len(jobs)))  # every row filed once
+    queries = sample_queries(jobs.emb, n=20, seed=2)
+    for nprobe in (index.nlist, index.nlist * 3):
+        for (ids, scores), q in zip(index.search(jobs.emb, queries, k=10, nprobe=nprobe), queries):
+            exact = exact_top_k(np.asarray(jobs.emb[:]) @ q, 10)
+            assert np.array_equal(ids, exact)
+            assert np.all(np.diff(scores) <= 0)
+
+
+def test_saved_index_is_tied_to_the_artifact_version(jobs, tmp_path):
+    index, _ = build_index(jobs)
+    loaded = load_index(jobs)
+    assert loaded.nlist == index.nlist and loaded.info['nprobe'] == index.info['nprobe']
+
+    emb = _clustered(seed=5)
+    save_artifact('jobs', pd.DataFrame({'unified_id': [f"J{i}" for i in range(len(emb))]}), emb,
+                  'test-model', models_dir=str(tmp_path))
+    assert load_index(load_artifact('jobs', models_dir=str(tmp_path))) is None
+
+
+def test_kmeans_reseeds_empty_clusters():
+    vectors = np.repeat(np.eye(4, dtype=np.float32), 10, axis=0)  # 4 distinct points, 6 clusters
+    centroids = spherical_kmeans(vectors, 6, iters=5)
+    assert centroids.shape == (6, 4)
+    assert np.allclose(np.linalg.norm(centroids, axis=1), 1.0)
+
+
+def test_empty_artifact_has_no_index(tmp_path):
+    save_artifact('jobs', pd.DataFrame(columns=['unified_id']), np.zeros((0, 0), dtype=np.float32),
+                  'test-model', models_dir=str(tmp_path), dim=16)
+    art = load_artifact('jobs', models_dir=str(tmp_path))
+    assert build_index(art) == (None, [])
+    with pytest.raises(ValueError):
+        IVFIndex.build(art.emb)
@@ -0,0 +1,156 @@
+def test_jobs_feed_revalidation_returns_304(client):
+    first = client.get('/api/jobs?limit=5')
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    assert etag.startswith('"') and etag.endswith('"')
+
+    again = client.get('/api/jobs?limit=5', headers={'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.data == b''
+    assert again.headers['ETag'] == etag
+
+    other_page = client.get('/api/jobs?limit=6', headers={'If-None-Match': etag})
+    assert other_page.status_code == 200
+
+
+def test_jobs_feed_pages_with_cursor(client):
+    first = client.get('/api/jobs?limit=3')
+    cursor = first.headers['X-Next-Cursor']
+    second = client.get(f'/api/jobs?limit=3&cursor={cursor}')
+    assert second.status_code == 200
+    ids = [j['job_id'] for j in first.json] + [j['job_id'] for j in second.json]
+    assert len(set(ids)) == 6
+    assert client.get('/api/jobs?limit=x').status_code == 400
+
+
+def test_recommend_batch(client):
+    resp = client.post('/api/recommend/batch', json={'queries': ['python developer', '', 'data analyst'], 'k': 3})
+    assert resp.status_code == 200
+    assert [len(r) for r in resp.json['results']] == [3, 0, 3]
+    # Same query twice in one batch gets the same answer
+    resp = client.post('/api/recommend/batch', json={'queries': ['sql analyst', 'sql analyst'], 'k': 2})
+    assert resp.json['results'][0] == resp.json['results'][1]
+
+
+def test_recommend_batch_validation(client):
+    for body in ({'queries': ['sql'], 'k': 'x'}, {'queries': ['sql'], 'k': None}, {'queries': 'sql'},
+                 {'queries': ['sql'] * 1001}, ['sql']):
+        resp = client.post('/api/recommend/batch', json=body)
+        assert resp.status_code == 400, body
+        assert 'error' in resp.json
+
+
+def test_async_resume_upload(client):
+    import io
+    import time
+    resp = client.post('/api/upload-resume?async=1',
+                       data={'resume': (io.BytesIO(b'python sql docker developer'), 'cv.txt')})
+    assert resp.status_code == 202
+    job_id = resp.json['job_id']
+    for _ in range(100):
+        poll = client.get(f'/api/upload-resume/{job_id}')
+        if poll.status_code != 202:
+            break
+        time.sleep(0.05)
+    assert poll.status_code == 200 and poll.json['status'] == 'done'
+    assert len(poll.json['results']) == 10
+    assert client.get('/api/upload-resume/not-a-job').status_code == 404
+
+
+def test_warm_up_runs_once(app_module, monkeypatch):
+    import threading
+    calls = []
+    real_encoder = app_module.encoder
+
+    class CountingEncoder:
+        def encode(self, texts):
+            calls.append(texts)
+            return real_encoder.encode(texts)
+
+    monkeypatch.setattr(app_module, 'encoder', CountingEncoder())
+    app_module.ready.clear()
+    try:
+        threads = [threading.Thread(target=app_module.warm_up_models) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        app_module.ready.set()
+    assert len(calls) == 1
+
+
+def test_skill_gap(client, app_module, monkeypatch):
+    job_id = app_module.jobs_df.row(0)['unified_id']
+    resp = client.post('/api/skill-gap', json={'job_id': job_id, 'skills': []})
+    assert resp.status_code == 400
+    resp = client.post('/api/skill-gap', json={'job_id': job_id, 'skills': ['python']})
+    assert resp.status_code == 200
+    body = resp.json
+    assert set(body['matched_skills']) | set(body['missing_skills']) == set(body['job_skills'])
+    # Covered skills are a subset of what is missing
+    covered = {s for t in body['trainings'] for s in t['covers']}
+    assert covered <= set(body['missing_skills'])
+
+    candidate_id = app_module.candidates_df.row(0)['candidate_id']
+    assert client.post('/api/skill-gap', json={'job_id': job_id, 'candidate_id': candidate_id}).status_code == 200
+    assert client.post('/api/skill-gap', json={'job_id': 'no-such-job', 'skills': 'sql'}).status_code == 404
+    assert client.post('/api/skill-gap', json={'skills': 'sql'}).status_code == 400
+
+    # Works without the candidate <-> job match table (e.g. no candidates.csv)
+    monkeypatch.setattr(app_module, 'match_table', None)
+    assert client.post('/api/skill-gap', json={'job_id': job_id, 'skills': ['python']}).json == body
+
+
+def test_match_endpoints(client, app_module):
+    candidate_id = app_module.candidates_df.row(0)['candidate_id']
+    resp = client.get(f'/api/candidates/{candidate_id}/matches?k=5')
+    assert resp.status_code == 200 and len(resp.json['matches']) == 5
+    job_id = resp.json['matches'][0]['job_id']
+    resp = client.get(f'/api/jobs/{job_id}/candidates?k=3')
+    assert resp.status_code == 200 and len(resp.json['candidates']) == 3
+    assert client.get(f'/api/candidates/{candidate_id}/matches?k=x').status_code == 400
+    assert client.get('/api/candidates/nobody/matches').status_code == 404
+
+
+def test_posts_api(client):
+    created = client.post('/api/posts', json={'content': 'hello from the tests'})
+    assert created.status_code == 200
+    post_id = created.json['id']
+
+    first = client.get('/api/posts?limit=1')
+    assert first.status_code == 200 and first.json[0]['id'] == post_id
+    cursor = first.headers['X-Next-Cursor']
+    assert f'cursor={cursor}' in first.headers['Link']
+    assert client.get(f'/api/posts?cursor={cursor}').json[0]['id'] != post_id
+
+    for bad in ('/api/posts?limit=x', '/api/posts?cursor=abc', '/api/posts?cursor=12'):
+        resp = client.get(bad)
+        assert resp.status_code == 400 and 'error' in resp.json
+
+    assert client.delete(f'/api/posts/{post_id}').json == {'success': True}
+    assert post_id not in [p['id'] for p in client.get('/api/posts?limit=100').json]
+
+
+def test_skill_gap_without_optional_training_columns(client, app_module, monkeypatch):
+    # A trainings.csv without duration_days
+    from artifacts import ColumnTable
+    trainings = app_module.tr_df.to_frame().drop(columns=['duration_days'])
+    monkeypatch.setattr(app_module, 'tr_df', ColumnTable.from_frame(trainings))
+    job_id = app_module.jobs_df.row(0)['unified_id']
+    resp = client.post('/api/skill-gap', json={'job_id': job_id, 'skills': ['python']})
+    assert resp.status_code == 200
+    entries = resp.json['trainings'] + resp.json['related_trainings']
+    assert entries and all(t['duration_days'] is None and t['title'] for t in entries)
+
+
+def test_importing_the_app_stays_light(tmp_path):
+    # pandas, scipy and torch are only needed once load_models() runs
+    import os
+    import subprocess
+    import sys
+    env = dict(os.environ, SKILLBRIDGE_POSTS_DB=str(tmp_path / 'posts.db'),
+               SKILLBRIDGE_RESUME_JOBS_DB=str(tmp_path / 'jobs.db'))
+    code = "import sys, app; print(sorted(m for m in ('pandas', 'scipy', 'torch', 'utils') if m in sys.modules))"
+    out = subprocess.run([sys.executable, '-c', code], cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), env=env, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == '[]'
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+from artifacts import save_artifact, load_artifact
+
+
+def test_empty_artifact_round_trip(tmp_path):
+    # A first run without data/candidates.csv embeds nothing: (0, 0) vectors, dim known from the jobs
+    df = pd.DataFrame(columns=['candidate_id', 'first_name', 'skills', 'summary'])
+    manifest = save_artifact('candidates', df, np.zeros((0, 0), dtype=np.float32), 'test-model',
+                             models_dir=str(tmp_path), dim=8)
+    assert manifest['rows'] == 0 and manifest['dim'] == 8
+
+    art = load_artifact('candidates', models_dir=str(tmp_path))
+    assert len(art) == 0
+    assert art.emb.shape == (0, 8)
+    assert art.similarity(np.ones(8)).shape == (1, 0)
+    assert [p.name for p in tmp_path.iterdir()] == ['candidates']
+
+
+def test_empty_artifact_without_dim(tmp_path):
+    df = pd.DataFrame(columns=['module_id', 'title'])
+    save_artifact('trainings', df, np.zeros((0, 0), dtype=np.float32), 'test-model', models_dir=str(tmp_path))
+    assert load_artifact('trainings', models_dir=str(tmp_path)).emb.shape == (0, 0)
+
+
+def test_int8_round_trip(tmp_path):
+    df = pd.DataFrame({'unified_id': ['a', 'b', 'c'], 'n': [1, 2, 3]})
+    emb = np.random.RandomState(0).randn(3, 8).astype(np.float32)
+    save_artifact('jobs', df, emb, 'test-model', emb_dtype='int8', models_dir=str(tmp_path))
+    art = load_artifact('jobs', models_dir=str(tmp_path), verify=True)
+    assert art.meta.row(1) == {'unified_id': 'b', 'n': 2}
+    expected = emb / np.linalg.norm(emb, axis=1, keepdims=True)
+    assert np.allclose(art.emb[:], expected, atol=0.02)
+    assert np.allclose(art.full[:], expected, atol=1e-6)
+
+
+def test_failed_save_leaves_no_tmp_dir(tmp_path):
+    df = pd.DataFrame({'unified_id': ['a', 'b']})
+    try:
+        save_artifact('jobs', df, np.ones((3, 4)), 'test-model', models_dir=str(tmp_path))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("row/embedding count mismatch was accepted")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_sidecar_round_trip_and_staleness(tmp_path, capsys):
+    from artifacts import save_sidecar, load_sidecar
+    path = str(tmp_path / 'side')
+    save_sidecar(path, {'ids': np.arange(4)}, {'artifact_version': 'v1'}, documents={'vocab': ['python', 'sql']})
+    arrays, manifest = load_sidecar(path, ('ids',), expect={'artifact_version': 'v1'}, documents=('vocab',))
+    assert list(arrays['ids']) == [0, 1, 2, 3] and arrays['vocab'] == ['python', 'sql']
+    assert manifest == {'artifact_version': 'v1'}
+
+    # Saving again swaps the whole folder; a manifest built for another version is ignored
+    save_sidecar(path, {'ids': np.arange(2)}, {'artifact_version': 'v2'})
+    assert load_sidecar(path, ('ids',), expect={'artifact_version': 'v1'}, stale_warning="stale!") is None
+    assert "stale!" in capsys.readouterr().out
+    assert len(load_sidecar(path, ('ids',))[0]['ids']) == 2
+    assert load_sidecar(str(tmp_path / 'missing'), ('ids',)) is None
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['side']
+
+
+def test_version_covers_metadata(tmp_path):
+    emb = np.eye(2, 4, dtype=np.float32)
+    save_artifact('jobs', pd.DataFrame({'unified_id': ['a', 'b'], 'company_industry': ['IT', 'Retail']}), emb,
+                  'test-model', models_dir=str(tmp_path))
+    before = load_artifact('jobs', models_dir=str(tmp_path), verify=True)
+    save_artifact('jobs', pd.DataFrame({'unified_id': ['a', 'b'], 'company_industry': ['IT', 'Banking']}), emb,
+                  'test-model', models_dir=str(tmp_path))
+    after = load_artifact('jobs', models_dir=str(tmp_path), verify=True)
+    assert after.manifest['checksum'] == before.manifest['checksum']
+    assert after.version != before.version  # same embeddings, new metadata
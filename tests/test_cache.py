@@ -0,0 +1,67 @@
+import types
+import numpy as np
+import cache
+from cache import LRUCache, QueryCache, normalize_query
+
+
+def test_lru_evicts_least_recently_used():
+    lru = LRUCache(maxsize=2)
+    lru.put('a', 1)
+    lru.put('b', 2)
+    assert lru.get('a') == 1  # 'a' is now the most recent
+    lru.put('c', 3)
+    assert lru.get('b') is None
+    assert (lru.get('a'), lru.get('c')) == (1, 3)
+    lru.put('a', 10)  # overwrite refreshes too
+    lru.put('d', 4)
+    assert lru.get('c') is None and lru.get('a') == 10
+    assert lru.stats()['size'] == 2 and lru.stats()['maxsize'] == 2
+
+
+def test_lru_ttl_expiry(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(cache, 'time', types.SimpleNamespace(monotonic=lambda: clock[0]))
+    lru = LRUCache(maxsize=10, ttl=5)
+    lru.put('q', 'result')
+    clock[0] += 4.9
+    assert lru.get('q') == 'result'
+    clock[0] += 0.2  # 5.1 s after the put: a hit does not extend the TTL
+    assert lru.get('q', 'gone') == 'gone'
+    assert len(lru) == 0
+    assert (lru.hits, lru.misses) == (1, 1)
+
+
+def test_normalize_query():
+    assert normalize_query('  Python \n Developer ') == normalize_query('python developer') == 'python developer'
+
+
+def test_embeddings_encode_only_misses_once():
+    calls = []
+
+    def encode(texts):
+        calls.append(list(texts))
+        return np.array([[len(t), 1.0] for t in texts], dtype=np.float32)
+
+    qc = QueryCache(encode)
+    first = qc.embeddings(['SQL', 'python', 'sql '])
+    assert calls == [['sql', 'python']]  # duplicates after normalisation are encoded once
+    assert np.array_equal(first[0], first[2])
+    qc.embeddings(['Python', 'java'])
+    assert calls[-1] == ['java']
+    assert qc.stats()['embeddings']['hits'] == 1
+
+
+def test_results_are_cleared_on_a_new_version():
+    qc = QueryCache(lambda texts: np.zeros((len(texts), 2)))
+    computed = []
+
+    def compute(tag):
+        return lambda: computed.append(tag) or tag
+
+    assert qc.results('jobs', 'v1', 'python', (10,), compute('a')) == 'a'
+    assert qc.results('jobs', 'v1', ' Python', (10,), compute('b')) == 'a'  # cached
+    assert qc.results('jobs', 'v1', 'python', (5,), compute('c')) == 'c'  # other params
+    assert qc.results('jobs', 'v2', 'python', (10,), compute('d')) == 'd'  # retrained artifact
+    assert len(qc.results_cache) == 1  # every v1 entry went with the switch
+    assert qc.results('jobs', 'v2', 'python', (10,), compute('e')) == 'd'
+    assert computed == ['a', 'c', 'd']
@@ -0,0 +1,57 @@
+import pandas as pd
+from dedup import NearDuplicateFilter, load_duplicates, shingle_hashes
+
+BASE = ("Senior Python developer to build and maintain REST APIs with Django and PostgreSQL, "
+        "review pull requests, mentor junior staff and automate deployments on AWS")
+
+
+def _chunk(texts, start=0):
+    return pd.DataFrame({'unified_id': [f"J{start + i}" for i in range(len(texts))], 'text_for_emb': texts})
+
+
+def test_folds_reposts_and_keeps_distinct_jobs():
+    dedup = NearDuplicateFilter(threshold=0.8)
+    texts = [
+        BASE,
+        BASE.upper().replace(",", ";"),             # repost with different case and punctuation
+        "Data analyst with Excel, Tableau and SQL to report on sales metrics for the retail team",
+        BASE,                                       # exact repost
+        "",                                         # nothing to compare: always kept
+    ]
+    kept = dedup.filter(_chunk(texts))
+    assert kept['unified_id'].tolist() == ['J0', 'J2', 'J4']
+    assert dedup.kept == 3 and dedup.dropped == 2
+    assert sorted(dedup.members) == [(0, 'J1'), (0, 'J3')]
+
+
+def test_threshold_matters():
+    texts = [BASE, BASE.replace("Django", "Flask").replace("AWS", "Azure")]
+    assert len(NearDuplicateFilter(threshold=0.99).filter(_chunk(texts))) == 2
+
+
+def test_signatures_are_not_degenerate():
+    # Every permutation must be able to pick a different shingle
+    dedup = NearDuplicateFilter()
+    sig = dedup.signature(shingle_hashes(BASE))
+    assert len(set(sig.tolist())) > dedup.num_perm // 2
+
+
+class _Artifact:
+    """The two things load_duplicates needs from a jobs artifact."""
+
+    def __init__(self, path, n):
+        self.path = path
+        self.n = n
+
+    def __len__(self):
+        return self.n
+
+
+def test_save_round_trip(tmp_path):
+    dedup = NearDuplicateFilter(threshold=0.8)
+    dedup.filter(_chunk([BASE, "Frontend React developer for a media site", BASE]))
+    dedup.save(str(tmp_path))
+    groups = load_duplicates(_Artifact(str(tmp_path), dedup.kept))
+    assert [groups.count(r) for r in range(2)] == [1, 0]
+    assert groups.members(0) == ['J2']
+    assert load_duplicates(_Artifact(str(tmp_path), 3)) is None  # written for another artifact
@@ -0,0 +1,54 @@
+import os
+import numpy as np
+from embedding_store import EmbeddingStore, store_path
+from encoding import StubEncoder
+
+MODEL = 'test-model'
+
+
+class CountingEncoder:
+    def __init__(self):
+        self.model = StubEncoder(dim=8)
+        self.texts = []
+
+    def __call__(self, texts):
+        self.texts += list(texts)
+        return self.model.encode(texts)
+
+
+def _run(tmp_path, chunks):
+    store, encode = EmbeddingStore(MODEL, models_dir=str(tmp_path)), CountingEncoder()
+    vecs = [store.embed(chunk, encode) for chunk in chunks]
+    return store, encode, vecs, store.commit()
+
+
+def test_rerun_reuses_unchanged_vectors(tmp_path):
+    store, encode, first, dropped = _run(tmp_path, [['python dev', 'sql analyst'], ['python dev', 'java dev']])
+    assert encode.texts == ['python dev', 'sql analyst', 'java dev']  # repeats encoded once per run
+    assert (store.encoded, store.reused, dropped) == (3, 0, 0)
+    assert np.array_equal(first[1][0], first[0][0])
+
+    # 'sql analyst' edited, 'java dev' deleted from the sources
+    store, encode, second, dropped = _run(tmp_path, [['python dev', 'sql analyst (remote)']])
+    assert encode.texts == ['sql analyst (remote)']
+    assert (store.encoded, store.reused, dropped) == (1, 1, 2)
+    assert np.array_equal(second[0][0], first[0][0])
+    assert len(EmbeddingStore(MODEL, models_dir=str(tmp_path))) == 2
+
+
+def test_chunk_order_does_not_matter(tmp_path):
+    _, _, first, _ = _run(tmp_path, [['b', 'a', 'c']])
+    store, encode, second, _ = _run(tmp_path, [['c', 'a'], ['b']])
+    assert encode.texts == [] and store.reused == 3
+    assert np.array_equal(np.vstack(second), first[0][[2, 1, 0]])
+
+
+def test_abort_keeps_the_previous_store(tmp_path):
+    _run(tmp_path, [['python dev']])
+    store = EmbeddingStore(MODEL, models_dir=str(tmp_path))
+    store.embed(['rust dev'], CountingEncoder())
+    store.abort()
+    assert not os.path.exists(store.tmp_dir)
+    reopened = EmbeddingStore(MODEL, models_dir=str(tmp_path))
+    assert len(reopened) == 1 and os.path.isdir(store_path(MODEL, str(tmp_path)))
+    reopened.abort()
@@ -0,0 +1,159 @@
+import os
+import sys
+import types
+import threading
+import contextlib
+import numpy as np
+import pytest
+import encoding
+from encoding import BatchingEncoder, StubEncoder, TorchEncoder, load_encoder
+
+
+# --- stand-ins for torch / sentence_transformers (only what TorchEncoder touches) ---
+class FakeSentenceTransformer:
+    def __init__(self, name, device=None):
+        self.name, self.device = name, device
+        self.max_seq_length = 256
+        self.training = True
+        self.seen_max_seq_length = []
+
+    def eval(self):
+        self.training = False
+
+    def get_sentence_embedding_dimension(self):
+        return 4
+
+    def encode(self, sentences, batch_size=32, show_progress_bar=False, convert_to_numpy=True):
+        self.seen_max_seq_length.append(self.max_seq_length)
+        return np.ones((len(sentences), 4), dtype=np.float32)
+
+
+@pytest.fixture
+def fake_torch(monkeypatch):
+    calls = {'quantized': [], 'threads': []}
+
+    def quantize_dynamic(model, layers, dtype):
+        calls['quantized'].append((layers, dtype))
+        return model
+
+    torch = types.SimpleNamespace(
+        nn=types.SimpleNamespace(Linear=object), qint8='qint8',
+        ao=types.SimpleNamespace(quantization=types.SimpleNamespace(quantize_dynamic=quantize_dynamic)),
+        inference_mode=contextlib.nullcontext,
+        set_num_threads=lambda n: calls['threads'].append(n), set_num_interop_threads=lambda n: None,
+    )
+    monkeypatch.setitem(sys.modules, 'torch', torch)
+    monkeypatch.setitem(sys.modules, 'sentence_transformers',
+                        types.SimpleNamespace(SentenceTransformer=FakeSentenceTransformer))
+    for var in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+        monkeypatch.delenv(var, raising=False)
+    return calls
+
+
+def test_backend_selection(fake_torch, monkeypatch):
+    assert isinstance(load_encoder('m'), StubEncoder)  # conftest sets SKILLBRIDGE_ENCODER=stub
+    with pytest.raises(ValueError):
+        load_encoder('m', backend='onnx')
+
+    query = load_encoder('m', backend='int8')
+    assert isinstance(query, TorchEncoder) and query.quantized and not query.model.training
+    assert query.max_seq_length == encoding.QUERY_MAX_TOKENS
+    assert fake_torch['quantized'] == [({object}, 'qint8')]
+
+    document = load_encoder('m', backend='int8', purpose='document')  # stored vectors never quantized
+    assert not document.quantized and document.max_seq_length == 256
+    plain = load_encoder('m', backend='sentence-transformers')
+    assert not plain.quantized and plain.max_seq_length == encoding.QUERY_MAX_TOKENS
+    assert len(fake_torch['quantized']) == 1
+
+    monkeypatch.setenv('SKILLBRIDGE_ENCODER_THREADS', '3')
+    load_encoder('m', backend='sentence-transformers')
+    assert fake_torch['threads'][-1] == 3
+
+
+def test_torch_encoder_token_limit_per_call(fake_torch):
+    encoder = TorchEncoder('m', max_seq_length=64)
+    encoder.encode(['query'])
+    encoder.encode(['a long resume'], max_seq_length=256)
+    encoder.encode(['query'])
+    assert encoder.model.seen_max_seq_length == [64, 256, 64]
+    assert encoder.get_sentence_embedding_dimension() == 4
+
+
+class RecordingModel(StubEncoder):
+    def __init__(self):
+        super().__init__(dim=8)
+        self.batches = []
+
+    def encode(self, sentences, batch_size=32, **kwargs):
+        self.batches.append(list(sentences))
+        if 'boom' in sentences:
+            raise RuntimeError('model failed')
+        return super().encode(sentences)
+
+
+def test_concurrent_texts_are_coalesced():
+    model = RecordingModel()
+    encoder = BatchingEncoder(model, max_batch=4, max_wait_ms=200)
+    try:
+        texts = [f"query {i}" for i in range(10)]
+        futures = [encoder.submit(t) for t in texts]
+        vecs = np.vstack([f.result(timeout=5) for f in futures])
+        assert np.allclose(vecs, StubEncoder(dim=8).encode(texts))  # each caller gets its own vector
+        assert sorted(t for b in model.batches for t in b) == sorted(texts)
+        assert max(len(b) for b in model.batches) <= 4 and len(model.batches) <= 4
+        assert encoder.texts == 10 and encoder.avg_batch_size == 10 / encoder.batches
+    finally:
+        encoder.close()
+
+
+def test_threads_share_a_batch():
+    model = RecordingModel()
+    encoder = BatchingEncoder(model, max_batch=32, max_wait_ms=100)
+    results = {}
+    barrier = threading.Barrier(6)
+
+    def call(i):
+        barrier.wait()
+        results[i] = encoder.encode([f"text {i}"], timeout=5)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(6)]
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(5)
+        assert len(results) == 6 and encoder.batches < 6
+    finally:
+        encoder.close()
+
+
+def test_model_errors_reach_every_caller_and_close_rejects_new_texts():
+    encoder = BatchingEncoder(RecordingModel(), max_wait_ms=100)
+    futures = [encoder.submit('boom'), encoder.submit('fine')]
+    for f in futures:
+        with pytest.raises(RuntimeError):
+            f.result(timeout=5)
+    assert encoder.encode(['still works'], timeout=5).shape == (1, 8)
+    encoder.close()
+    with pytest.raises(RuntimeError):
+        encoder.submit('late')
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="needs fork()")
+def test_forked_child_gets_its_own_batching_thread():
+    encoder = BatchingEncoder(RecordingModel(), max_wait_ms=1)
+    try:
+        encoder.encode(['warm'], timeout=5)
+        pid = os.fork()
+        if pid == 0:  # like a serve.py worker: the parent's thread did not survive the fork
+            try:
+                ok = encoder._thread.is_alive() and encoder.encode(['in child'], timeout=5).shape == (1, 8)
+            except BaseException:
+                ok = False
+            os._exit(0 if ok else 1)
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+        assert encoder.encode(['parent'], timeout=5).shape == (1, 8)
+    finally:
+        encoder.close()
@@ -0,0 +1,31 @@
+import json
+import pandas as pd
+from artifacts import ColumnTable
+from job_feed import JobFeed
+
+
+def _feed(company):
+    df = pd.DataFrame({
+        'unified_id': ['J1', 'J2', 'J3'],
+        'unified_title': ['Data Analyst', 'Backend Developer', 'Designer'],
+        'unified_company': [company, 'Acme', None],
+        'unified_skills': ['sql', 'python', 'figma'],
+        'source_type': ['Premium', 'Raw', 'Premium'],
+    })
+    return JobFeed(ColumnTable.from_frame(df))
+
+
+def test_etag_follows_the_served_rows():
+    feed = _feed('Globex')
+    assert feed.etag(None, 0, 20) == _feed('Globex').etag(None, 0, 20)
+    assert feed.etag(None, 0, 20) != _feed('Initech').etag(None, 0, 20)  # metadata-only change
+    assert feed.etag(None, 0, 20) != feed.etag('premium', 0, 20)
+
+
+def test_pages_are_stable_and_filtered():
+    feed = _feed('Globex')
+    body, next_cursor = feed.page('premium', 0, 1)
+    assert [row['job_id'] for row in json.loads(body)] == ['J1'] and next_cursor == 2
+    body, next_cursor = feed.page('premium', next_cursor, 1)
+    assert [row['job_id'] for row in json.loads(body)] == ['J3'] and next_cursor is None
+    assert feed.page(None, 0, 20)[0] == _feed('Globex').page(None, 0, 20)[0]
@@ -0,0 +1,69 @@
+import os
+import json
+from metrics import Registry
+
+
+def _registry(hits, ready):
+    registry = Registry()
+    registry.histogram('t_seconds', 'Latency.', ('stage',))
+    registry.callback('t_hits_total', 'Hits.', lambda: {'results': hits}, 'counter', 'cache')
+    registry.callback('t_ready', 'Ready.', lambda: ready)
+    return registry
+
+
+def test_workers_are_summed_on_scrape(tmp_path):
+    # Another serve.py worker, as it left its file
+    other = _registry(hits=5, ready=0)
+    other.histogram('t_seconds', '').observe(0.2, 'encode')
+    (tmp_path / '999999.json').write_text(json.dumps(other.snapshot()))
+
+    this = _registry(hits=2, ready=1)
+    this.histogram('t_seconds', '').observe(0.003, 'encode')  # recorded before the fork: the parent's
+    this.share(str(tmp_path), interval=3600)
+    this.histogram('t_seconds', '').observe(0.003, 'encode')
+    text = this.render()
+
+    assert 't_seconds_count{stage="encode"} 2' in text
+    assert 't_seconds_bucket{stage="encode",le="0.005"} 1' in text
+    assert 't_hits_total{cache="results"} 7.0' in text
+    assert 't_ready 1.0' in text  # gauges come from the worker answering
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(['999999.json', f"{os.getpid()}.json"])
+
+
+def test_histogram_text_format():
+    registry = Registry()
+    hist = registry.histogram('t_request_seconds', 'Latency.', ('endpoint',))
+    for value in (0.0004, 0.003, 0.003, 400.0):
+        hist.observe(value, '/api/recommend')
+    lines = registry.render().splitlines()
+    assert lines[:2] == ['# HELP t_request_seconds Latency.', '# TYPE t_request_seconds histogram']
+    assert 't_request_seconds_bucket{endpoint="/api/recommend",le="0.0005"} 1' in lines
+    assert 't_request_seconds_bucket{endpoint="/api/recommend",le="0.005"} 3' in lines  # cumulative
+    assert 't_request_seconds_bucket{endpoint="/api/recommend",le="300.0"} 3' in lines
+    assert 't_request_seconds_bucket{endpoint="/api/recommend",le="+Inf"} 4' in lines
+    assert 't_request_seconds_sum{endpoint="/api/recommend"} 400.006400' in lines
+    assert 't_request_seconds_count{endpoint="/api/recommend"} 4' in lines
+
+
+def test_label_values_are_escaped():
+    registry = Registry()
+    registry.callback('t_value', 'Values.', lambda: {'say "hi"\nC:\\path': 1}, 'gauge', 'name')
+    assert 't_value{name="say \\"hi\\"\\nC:\\\\path"} 1.0' in registry.render()
+
+
+def test_server_timing_header(client):
+    resp = client.post('/api/recommend', json={'query': 'python developer'}, headers={'X-SkillBridge-Profile': '1'})
+    assert resp.status_code == 200
+    stages = [part.split(';dur=') for part in resp.headers['Server-Timing'].split(', ')]
+    names = [name for name, _ in stages]
+    assert 'encode' in names and names[-1] == 'total'
+    assert all(float(ms) >= 0 for _, ms in stages)
+    assert 'Server-Timing' not in client.post('/api/recommend', json={'query': 'python developer'}).headers
+
+
+def test_metrics_endpoint(client):
+    client.get('/api/jobs?limit=1')
+    text = client.get('/metrics').get_data(as_text=True)
+    assert '# TYPE skillbridge_request_seconds histogram' in text
+    assert 'skillbridge_request_seconds_count{method="GET",endpoint="/api/jobs",status="200"}' in text
+    assert 'skillbridge_ready 1.0' in text
@@ -0,0 +1,47 @@
+import os
+import numpy as np
+from parallel_encode import ParallelEncoder, shard_key
+from encoding import StubEncoder
+
+MODEL = 'test-model'
+TEXTS = ['python developer', 'data analyst', 'java backend', 'ux designer', 'sql admin']
+
+
+def test_resumes_from_shard_checkpoints(tmp_path):
+    first = ParallelEncoder(MODEL, workers=1, shard_size=2, models_dir=str(tmp_path))
+    vecs = first(TEXTS)
+    assert np.allclose(vecs, StubEncoder().encode(TEXTS))
+    assert first.encoded == 5 and len(os.listdir(first.checkpoint_dir)) == 3
+
+    # A run that died after encoding: the next one finds every shard on disk
+    second = ParallelEncoder(MODEL, workers=1, shard_size=2, models_dir=str(tmp_path))
+    assert np.array_equal(second(TEXTS), vecs)
+    assert (second.encoded, second.resumed) == (0, 5)
+
+
+def test_changed_shard_is_re_encoded(tmp_path):
+    ParallelEncoder(MODEL, workers=1, shard_size=2, models_dir=str(tmp_path))(TEXTS)
+    changed = TEXTS[:2] + ['kotlin mobile'] + TEXTS[3:]
+    encoder = ParallelEncoder(MODEL, workers=1, shard_size=2, models_dir=str(tmp_path))
+    vecs = encoder(changed)
+    assert (encoder.encoded, encoder.resumed) == (2, 3)  # only the shard holding the edit
+    assert np.allclose(vecs, StubEncoder().encode(changed))
+    assert shard_key(MODEL, TEXTS[2:4]) != shard_key(MODEL, changed[2:4])
+    assert shard_key('other-model', TEXTS[:2]) != shard_key(MODEL, TEXTS[:2])
+
+
+def test_clear_checkpoints(tmp_path):
+    encoder = ParallelEncoder(MODEL, workers=1, shard_size=5, models_dir=str(tmp_path))
+    encoder(TEXTS)
+    encoder.clear_checkpoints()
+    assert not os.path.exists(encoder.checkpoint_dir)
+
+
+def test_worker_pool_matches_local_encoding(tmp_path):
+    encoder = ParallelEncoder(MODEL, workers=2, shard_size=2, models_dir=str(tmp_path), threads_per_worker=1)
+    try:
+        assert np.allclose(encoder(TEXTS), StubEncoder().encode(TEXTS), atol=1e-6)
+        assert encoder.encoded == 5
+    finally:
+        encoder.close()
+    assert ParallelEncoder(MODEL, workers=1, models_dir=str(tmp_path))([]).shape == (0, 0)
@@ -0,0 +1,55 @@
+import pytest
+from posts_store import PostStore, SEED_POSTS, time_ago
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PostStore(str(tmp_path / 'posts.db'))
+
+
+def _post(i):
+    return {'id': f"p{i}", 'author': 'Tester', 'content': f"post {i}"}
+
+
+def test_seeded_once(tmp_path):
+    path = str(tmp_path / 'posts.db')
+    first = PostStore(path)
+    assert first.count() == len(SEED_POSTS)
+    first.delete(SEED_POSTS[0]['id'])
+    assert PostStore(path).count() == len(SEED_POSTS) - 1  # a deleted seed post stays deleted
+
+
+def test_cursor_walk_returns_every_post_once(store):
+    for i in range(25):
+        store.create(_post(i))
+    seen, cursor = [], None
+    while True:
+        page, cursor = store.page(cursor, limit=7)
+        seen += [p['id'] for p in page]
+        if cursor is None:
+            break
+    assert len(seen) == len(set(seen)) == store.count()
+    assert seen[0] == 'p24'  # newest first
+
+
+def test_create_defaults_counters_and_delete(store):
+    created = store.create({'id': 'x', 'content': 'hello', 'likes': None})
+    assert created['time'] == 'Just now'
+    page, _ = store.page(limit=1)
+    assert page[0]['id'] == 'x' and page[0]['likes'] == 0
+    assert store.delete('x') is True
+    assert store.delete('x') is False
+
+
+def test_bad_cursor_raises_value_error(store):
+    for cursor in ('abc', '123', '1-x'):
+        with pytest.raises(ValueError):
+            store.page(cursor)
+
+
+def test_time_ago():
+    now = 1_000_000.0
+    assert time_ago(now * 1e6, now) == 'Just now'
+    assert time_ago((now - 300) * 1e6, now) == '5m ago'
+    assert time_ago((now - 2 * 3600) * 1e6, now) == '2h ago'
+    assert time_ago((now - 3 * 86400) * 1e6, now) == '3d ago'
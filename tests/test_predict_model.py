@@ -0,0 +1,20 @@
+import io
+from predict_model import read_queries
+
+
+def test_read_queries_plain_and_jsonl():
+    stream = io.StringIO(
+        "python developer\n"
+        "\n"
+        '{"id": "q7", "query": "data analyst"}\n'
+        '{"text": "java spring"}\n'
+        '{"id": 3}\n'
+        "{not json\n"
+    )
+    assert list(read_queries(stream)) == [
+        (1, 'python developer'),
+        ('q7', 'data analyst'),
+        (4, 'java spring'),
+        (3, None),
+        (6, None),
+    ]
@@ -0,0 +1,87 @@
+import os
+import time
+import pytest
+import resume_processing
+from resume_processing import ResumeProcessor, ResumeJobStore, ResumeError, extract_text
+
+
+def _crash_on_poison(data, filename, **kwargs):
+    # Stands in for a parser segfault / OOM kill on one malformed file
+    if b'poison' in data:
+        os._exit(1)
+    return extract_text(data, filename, **kwargs)
+
+
+def test_extracts_txt():
+    processor = ResumeProcessor(workers=1)
+    try:
+        key, text = processor.extract(b'Python  developer\n with SQL', 'cv.txt')
+        assert text == 'Python developer with SQL'
+        assert processor.extract(b'Python  developer\n with SQL', 'cv.txt') == (key, text)
+    finally:
+        processor.close()
+
+
+def test_rejects_bad_uploads():
+    processor = ResumeProcessor(workers=1, max_bytes=10)
+    for data, name, status in ((b'x', 'cv.exe', 415), (b'x' * 11, 'cv.txt', 413), (b'', 'cv.txt', 400)):
+        with pytest.raises(ResumeError) as e:
+            processor.check(data, name)
+        assert e.value.status == status
+
+
+def test_pool_recovers_after_a_worker_dies(monkeypatch):
+    monkeypatch.setattr(resume_processing, 'extract_text', _crash_on_poison)
+    processor = ResumeProcessor(workers=1)
+    try:
+        with pytest.raises(ResumeError) as e:
+            processor.extract(b'poison resume', 'bad.txt')
+        assert e.value.status == 422
+        # The next upload gets a fresh pool instead of BrokenProcessPool
+        assert processor.extract(b'java developer', 'good.txt')[1] == 'java developer'
+    finally:
+        processor.close()
+
+
+def test_job_store_is_shared_between_connections(tmp_path):
+    path = str(tmp_path / 'jobs.db')
+    accepting, polling = ResumeJobStore(path), ResumeJobStore(path)  # e.g. two serve.py workers
+    accepting.create('a')
+    assert polling.get('a')['status'] == 'pending'
+    accepting.finish('a', {'results': [{'job_id': 'J1'}]})
+    assert polling.get('a') == {'status': 'done', 'payload': {'results': [{'job_id': 'J1'}]},
+                                'error': None, 'http_status': None}
+    accepting.create('b')
+    accepting.fail('b', 'Could not process this file', 422)
+    assert polling.get('b')['http_status'] == 422
+    assert polling.get('missing') is None
+
+
+def test_job_store_expires_old_jobs(tmp_path):
+    store = ResumeJobStore(str(tmp_path / 'jobs.db'), ttl=0)
+    store.create('old')
+    assert store.get('old') is None
+
+
+def _hang(data, filename, **kwargs):
+    # Stuck somewhere SIGALRM never interrupts (the worker's own timeout is not armed)
+    time.sleep(60)
+
+
+def test_stuck_worker_is_terminated(monkeypatch):
+    processor = ResumeProcessor(workers=1, timeout=0.2, grace=0.5)
+    try:
+        processor.extract(b'python developer', 'warm.txt')
+        workers = list(processor._pool._processes.values())
+        monkeypatch.setattr(resume_processing, 'extract_text', _hang)
+        with pytest.raises(ResumeError) as e:
+            processor.extract(b'slow resume', 'slow.txt')
+        assert e.value.status == 422
+        for worker in workers:
+            worker.join(5)
+            assert not worker.is_alive()
+        # A fresh pool serves the next upload
+        monkeypatch.undo()
+        assert processor.extract(b'java developer', 'good.txt')[1] == 'java developer'
+    finally:
+        processor.close()
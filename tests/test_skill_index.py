@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+from artifacts import save_artifact, load_artifact
+from skill_index import SkillMatcher, SkillIndex, build_skill_index, load_skill_index
+
+VOCAB = ['machine learning', 'learning', 'deep learning', 'sql server', 'sql', 'git', 'go', 'golang', 'c', 'c++', 'node.js']
+
+
+def test_overlapping_multi_token_skills():
+    matcher = SkillMatcher(VOCAB)
+    assert matcher.find('Deep learning and machine learning on SQL Server') == \
+        ['deep learning', 'learning', 'machine learning', 'sql', 'sql server']
+    assert matcher.find('machine machine learning') == ['machine learning', 'learning']  # restart via failure link
+
+
+def test_word_boundaries():
+    matcher = SkillMatcher(VOCAB)
+    assert matcher.find('digital marketing, GitHub pages') == []
+    assert matcher.find('Git, node.js, C++.') == ['git', 'node.js', 'c++']
+
+
+def test_ambiguous_and_short_skills_need_a_list():
+    matcher = SkillMatcher(VOCAB)
+    assert matcher.find('ready to go with Golang in C') == ['golang']
+    index = SkillIndex.build(pd.DataFrame({'unified_skills': ['go; c', ''], 'text_for_emb': ['', 'go to the core']}))
+    assert index.skill_ids('Go; C; cobol') == [index.skill_id['go'], index.skill_id['c']]
+    assert list(index.job_skill_ids(1)) == []  # free text never tags 'go'
+
+
+@pytest.fixture
+def jobs(tmp_path):
+    df = pd.DataFrame({
+        'unified_id': ['A', 'B', 'C', 'D'],
+        'unified_skills': ['java', 'python; sql', 'python', ''],
+        'text_for_emb': ['', '', '', 'we use python and docker daily'],
+    })
+    emb = np.array([[1.0, 0.0], [0.8, 0.6], [0.6, 0.8], [0.0, 1.0]], dtype=np.float32)
+    save_artifact('jobs', df, emb, 'test-model', models_dir=str(tmp_path))
+    art = load_artifact('jobs', models_dir=str(tmp_path))
+    build_skill_index(art)
+    return art, load_skill_index(art)
+
+
+def test_untagged_jobs_get_skills_from_their_text(jobs):
+    art, index = jobs
+    assert index.matched_skills(3, index.skill_ids('python; docker')) == ['python']
+    assert list(index.jobs_with(index.skill_ids('python'))) == [1, 2, 3]
+    assert list(index.jobs_with(index.skill_ids('python; sql'), mode='all')) == [1]
+
+
+def test_hybrid_fuses_semantic_and_skill_scores(jobs):
+    art, index = jobs
+    python = index.skill_ids('python')
+    rows, scores, matched = index.hybrid_top_k(art, None, np.array([1.0, 0.0]), python, k=3, alpha=0.8)
+    # A: .8 * 1.0 + .2 * 0 = .80   B: .8 * .8 + .2 * 1 = .84   C: .8 * .6 + .2 * 1 = .68
+    assert list(rows) == [1, 0, 2]
+    assert np.allclose(scores, [0.84, 0.80, 0.68], atol=1e-5)
+    assert matched == [['python'], [], ['python']]
+    # No query skills: purely semantic
+    rows, scores, _ = index.hybrid_top_k(art, None, np.array([1.0, 0.0]), [], k=2)
+    assert list(rows) == [0, 1] and np.allclose(scores, [1.0, 0.8], atol=1e-5)
+
+
+def test_hybrid_filter_only_scores_matching_jobs(jobs):
+    art, index = jobs
+    query = np.array([2.0, 0.0])  # not normalised on purpose
+    rows, _, matched = index.hybrid_top_k(art, None, query, [], k=10, filter_sids=index.skill_ids('sql'))
+    assert list(rows) == [1] and matched == [['sql']]
+    rows, _, _ = index.hybrid_top_k(art, None, query, [], k=10, filter_sids=index.skill_ids('java; sql'))
+    assert sorted(rows) == [0, 1]
+    rows, _, _ = index.hybrid_top_k(art, None, query, [], k=10, filter_sids=index.skill_ids('java; sql'),
+                                    filter_mode='all')
+    assert len(rows) == 0
@@ -0,0 +1,38 @@
+import json
+import pytest
+from utils import iter_json_records
+
+RECORDS = [1, 23, 456, -7.5e3, "a string, with [brackets]", True, None, {"JobID": "J1", "Skills": ["SQL", "Go"]}, [1, [2]]]
+
+
+@pytest.mark.parametrize('read_size', list(range(1, 12)) + [64])
+def test_every_boundary_split_parses_the_same(tmp_path, monkeypatch, read_size):
+    monkeypatch.chdir(tmp_path)
+    with open('jobs.json', 'w', encoding='utf-8') as f:
+        f.write(" \n[ " + ",\n  ".join(json.dumps(r) for r in RECORDS) + " ]\n")
+    assert list(iter_json_records('jobs.json', read_size=read_size)) == RECORDS
+
+
+def test_compact_and_empty_arrays(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'data').mkdir()
+    (tmp_path / 'data' / 'compact.json').write_text(json.dumps(RECORDS, separators=(',', ':')))
+    (tmp_path / 'data' / 'empty.json').write_text('[]')
+    for read_size in (1, 3, 1 << 20):
+        assert list(iter_json_records('compact.json', read_size=read_size)) == RECORDS
+        assert list(iter_json_records('empty.json', read_size=read_size)) == []
+
+
+def test_rejects_bad_input(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'object.json').write_text('{"a": 1}')
+    (tmp_path / 'broken.json').write_text('[{"a": 1}, {"b": ')
+    with pytest.raises(ValueError):
+        list(iter_json_records('object.json'))
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_records('broken.json', read_size=4))
+    with pytest.raises(FileNotFoundError):
+        list(iter_json_records('missing.json'))
+    (tmp_path / 'missing_comma.json').write_text('[1 2]')
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_records('missing_comma.json'))
@@ -1,114 +1,273 @@
 import os
-import pickle
+import time
+import argparse
 import pandas as pd
-import json
-from sentence_transformers import SentenceTransformer
-from utils import load_csv, parse_skills  # Assumes you have utils.py from previous step
+from utils import load_csv, iter_csv_chunks, iter_json_chunks, parse_skills  # Assumes you have utils.py from previous step
+from artifacts import ArtifactWriter, save_artifact, load_artifact, artifact_path, EMB_DTYPES, MODELS_DIR
+from ann_index import (build_index, print_report, load_centroids, can_reuse_centroids, sample_queries,
+                       evaluate_quantization, print_quantization_report)
+from embedding_store import EmbeddingStore
+from skill_index import build_skill_index
+from matching import build_match_table, DEFAULT_K as MATCH_K
+from skill_gap import build_skill_gap
+from dedup import NearDuplicateFilter, DEFAULT_THRESHOLD as DEDUP_THRESHOLD
+from parallel_encode import ParallelEncoder, DEFAULT_WORKERS, DEFAULT_SHARD_SIZE
+from metrics import REGISTRY, observe_stage, span
 
-def prepare_unified_model():
-    print("--- 1. Loading Data Sources ---")
-    
-    # A. Load Standard Data (Candidates & Trainings)
-    try:
-        cand = load_csv('data/candidates.csv')
-        trainings = load_csv('data/trainings.csv')
-    except FileNotFoundError:
-        print("⚠️ Warning: candidates.csv or trainings.csv not found. Skill Gap features may be limited.")
-        cand = pd.DataFrame(columns=['candidate_id', 'first_name', 'skills', 'summary'])
-        trainings = pd.DataFrame(columns=['module_id', 'title', 'description', 'skills_covered'])
+MODEL_NAME = "all-MiniLM-L6-v2"
+JOB_COLUMNS = ['unified_id', 'unified_title', 'unified_company', 'unified_skills', 'text_for_emb', 'source_type']
+CHUNK_SIZE = 2000
 
-    # B. Load NEW Job Data Sources
-    print("   - Loading 'job_dataset.csv'...")
-    job_csv = pd.read_csv('data/job_dataset.csv')
-    
-    print("   - Loading 'job_dataset.json'...")
-    with open('data/job_dataset.json', 'r') as f:
-        job_json_data = json.load(f)
-    job_json = pd.DataFrame(job_json_data)
-    
-    print("   - Loading 'all.csv' (The big one)...")
-    # Using '|' separator and skipping bad lines for safety
-    all_csv = pd.read_csv('data/all.csv', sep='|', on_bad_lines='skip')
-    
-    print("--- 2. Unifying Job Data ---")
-    
-    # --- Process Source 1: The Clean Dataset (CSV + JSON) ---
-    # We merge CSV and JSON (dropping duplicates)
-    premium_jobs = pd.concat([job_csv, job_json]).drop_duplicates(subset='JobID')
-    
-    # Standardize columns
-    premium_jobs['unified_id'] = premium_jobs['JobID']
-    premium_jobs['unified_title'] = premium_jobs['Title']
-    premium_jobs['unified_company'] = "Tech/IT Sector" # Placeholder
-    premium_jobs['unified_skills'] = premium_jobs['Skills'] # Explicit skills
+def _text(series):
+    # Per-chunk dtype inference can hand us floats (all-NaN chunk) or JSON lists
+    return series.map(lambda v: "; ".join(map(str, v)) if isinstance(v, list) else v).fillna('').astype(str)
+
+# --- Process Source 1: The Clean Dataset (CSV + JSON) ---
+def unify_premium(chunk):
+    """Maps a job_dataset.csv/.json chunk onto the unified job schema."""
+    out = pd.DataFrame(index=chunk.index)
+    out['unified_id'] = chunk['JobID']
+    out['unified_title'] = chunk['Title']
+    out['unified_company'] = "Tech/IT Sector" # Placeholder
+    out['unified_skills'] = _text(chunk['Skills']) # Explicit skills
     # Create rich text for embedding
-    premium_jobs['text_for_emb'] = (
-        premium_jobs['Title'].fillna('') + " " + 
-        premium_jobs['ExperienceLevel'].fillna('') + " " + 
-        premium_jobs['Responsibilities'].fillna('') + " " + 
-        premium_jobs['Skills'].fillna('')
+    out['text_for_emb'] = (
+        _text(chunk['Title']) + " " + 
+        _text(chunk['ExperienceLevel']) + " " + 
+        _text(chunk['Responsibilities']) + " " + 
+        _text(chunk['Skills'])
     )
-    premium_jobs['source_type'] = 'Premium'
-
-    # --- Process Source 2: The Raw Dataset (all.csv) ---
-    # Standardize columns
-    all_csv['unified_id'] = "RAW-" + all_csv['id'].astype(str)
-    all_csv['unified_title'] = all_csv['job_title']
-    all_csv['unified_company'] = all_csv['company_industry'].fillna("Unknown")
-    all_csv['unified_skills'] = "" # No explicit skills column in all.csv
+    out['source_type'] = 'Premium'
+    return out[JOB_COLUMNS]
+
+# --- Process Source 2: The Raw Dataset (all.csv) ---
+def unify_raw(chunk):
+    """Maps an all.csv chunk onto the unified job schema."""
+    out = pd.DataFrame(index=chunk.index)
+    out['unified_id'] = "RAW-" + chunk['id'].astype(str)
+    out['unified_title'] = _text(chunk['job_title'])
+    out['unified_company'] = chunk['company_industry'].fillna("Unknown")
+    out['unified_skills'] = "" # No explicit skills column in all.csv
     # Create rich text for embedding
-    all_csv['text_for_emb'] = (
-        all_csv['job_title'].fillna('') + " " + 
-        all_csv['job_description'].fillna('') + " " + 
-        all_csv['job_function'].fillna('')
+    out['text_for_emb'] = (
+        _text(chunk['job_title']) + " " + 
+        _text(chunk['job_description']) + " " + 
+        _text(chunk['job_function'])
     )
-    all_csv['source_type'] = 'General'
-    
-    # OPTIONAL: Limit all.csv to first 5000 rows to save training time
-    # Remove .head(5000) if you want to process the full 34k rows (might take ~10 mins)
-    all_csv = all_csv.head(5000)
-
-    # --- Combine Everything ---
-    # Select only necessary columns for the final dataframe
-    cols = ['unified_id', 'unified_title', 'unified_company', 'unified_skills', 'text_for_emb', 'source_type']
-    unified_jobs = pd.concat([premium_jobs[cols], all_csv[cols]], ignore_index=True)
+    out['source_type'] = 'General'
+    return out[JOB_COLUMNS]
+
+def iter_unified_jobs(chunksize=CHUNK_SIZE, raw_limit=None):
+    """
+    Streams every job source as unified chunks. Nothing is read whole:
+    peak memory is one chunk, however big all.csv is.
+    """
+    # CSV first, then JSON, dropping JobIDs we have already seen (CSV wins)
+    seen_ids = set()
+    premium_sources = [
+        ("job_dataset.csv", lambda: iter_csv_chunks('data/job_dataset.csv', chunksize)),
+        ("job_dataset.json", lambda: iter_json_chunks('data/job_dataset.json', chunksize)),
+    ]
+    for label, chunks in premium_sources:
+        print(f"   - Streaming '{label}'...")
+        for chunk in chunks():
+            chunk = chunk.drop_duplicates(subset='JobID')
+            chunk = chunk[~chunk['JobID'].isin(seen_ids)]
+            seen_ids.update(chunk['JobID'])
+            if len(chunk):
+                yield unify_premium(chunk)
+
+    print("   - Streaming 'all.csv' (The big one)...")
+    try:
+        taken = 0
+        for chunk in iter_csv_chunks('data/all.csv', chunksize, sep='|'):
+            if raw_limit is not None:
+                chunk = chunk.head(raw_limit - taken)
+            if len(chunk):
+                taken += len(chunk)
+                yield unify_raw(chunk)
+            if raw_limit is not None and taken >= raw_limit:
+                break
+    except FileNotFoundError:
+        print("⚠️ Warning: all.csv not found. Only the premium job datasets will be indexed.")
+
+class StageTimer:
+    """Prints each stage header and records its wall time (also as a train_<stage> metric)."""
+
+    def __init__(self):
+        self.times = {}
+        self._current = None
+
+    def start(self, key, title):
+        self.stop()
+        print(title)
+        self._current = (key, time.perf_counter())
+
+    def stop(self):
+        if self._current is not None:
+            key, started = self._current
+            elapsed = time.perf_counter() - started
+            self.times[key] = round(elapsed, 3)
+            observe_stage(f"train_{key}", elapsed)
+            self._current = None
+        return self.times
+
+def prepare_unified_model(emb_dtype='float32', rebuild_index=False, chunksize=CHUNK_SIZE, raw_limit=None,
+                          workers=DEFAULT_WORKERS, shard_size=DEFAULT_SHARD_SIZE, match_k=MATCH_K,
+                          dedup_threshold=DEDUP_THRESHOLD):
+    stages = StageTimer()
+    stages.start('load', "--- 1. Loading Candidates & Trainings ---")
     
-    print(f"   -> Total Unique Jobs: {len(unified_jobs)}")
+    # A. Load Standard Data (Candidates & Trainings) - small, read whole
+    cand = load_csv('data/candidates.csv')
+    trainings = load_csv('data/trainings.csv')
+    if cand is None or trainings is None:
+        print("⚠️ Warning: candidates.csv or trainings.csv not found. Skill Gap features may be limited.")
+    if cand is None:
+        cand = pd.DataFrame(columns=['candidate_id', 'first_name', 'skills', 'summary'])
+    if trainings is None:
+        trainings = pd.DataFrame(columns=['module_id', 'title', 'description', 'skills_covered', 'duration_days'])
 
-    print("--- 3. generating Embeddings (AI Brain) ---")
-    model = SentenceTransformer("all-MiniLM-L6-v2")
+    stages.start('embed', "--- 2. Generating Embeddings (AI Brain) ---")
+    # Vectors are looked up by hash(model name + text); only new/changed rows get encoded,
+    # and the transformer is not even loaded when nothing changed.
+    store = EmbeddingStore(MODEL_NAME)
+    # Misses are sharded across worker processes; finished shards are checkpointed,
+    # so an interrupted run picks up where it stopped.
+    encode = ParallelEncoder(MODEL_NAME, workers=workers, shard_size=shard_size)
     
-    # Encode Candidates
-    cand['text_for_emb'] = cand['summary'].fillna('') + ' ' + cand['skills'].fillna('')
-    if not cand.empty:
-        cand_emb = model.encode(cand['text_for_emb'].tolist(), show_progress_bar=True)
-    else:
-        cand_emb = []
+    # A failed run removes its tmp folders; the previous models/ and emb_store stay as they were
+    job_writer = None
+    try:
+        # Encode Candidates
+        cand['text_for_emb'] = cand['summary'].fillna('') + ' ' + cand['skills'].fillna('')
+        cand_emb = store.embed(cand['text_for_emb'].tolist(), encode)
+
+        # Encode Trainings
+        trainings['text_for_emb'] = trainings['title'].fillna('') + ' ' + trainings['description'].fillna('')
+        train_emb = store.embed(trainings['text_for_emb'].tolist(), encode)
+
+        stages.start('jobs', "--- 3. Streaming & Unifying Job Data ---")
+        # Keep the old index centroids so step 5 can reuse them
+        old_centroids = None if rebuild_index else load_centroids(artifact_path('jobs'))
+        # Each chunk is unified, embedded and appended straight to models/jobs/ on disk
+        job_writer = ArtifactWriter('jobs', MODEL_NAME, emb_dtype=emb_dtype, dim=store.dim)
+        # Reposts are folded into the first job of their cluster before they cost an embedding
+        dedup = NearDuplicateFilter(dedup_threshold) if dedup_threshold else None
+        try:
+            for chunk in iter_unified_jobs(chunksize, raw_limit):
+                if dedup is not None:
+                    with span('train_dedup_chunk'):
+                        chunk = dedup.filter(chunk)
+                    if not len(chunk):
+                        continue
+                with span('train_embed_chunk'):
+                    chunk_emb = store.embed(chunk['text_for_emb'].tolist(), encode)
+                with span('train_write_chunk'):
+                    job_writer.append(chunk, chunk_emb)
+                print(f"     {job_writer.rows} jobs processed ({store.report()})")
+        finally:
+            encode.close()
+
+        print(f"   -> Total Unique Jobs: {job_writer.rows}")
+        if dedup is not None:
+            print(f"   -> Near-duplicates folded into their cluster: {dedup.dropped} (threshold {dedup_threshold})")
+
+        dropped = store.commit()
+        encode.clear_checkpoints()
+        print(f"   -> Embedding store: {store.report()}, {dropped} stale rows dropped")
+        print(f"   -> Encoder: {encode.summary()}")
+        dim = store.dim or 0
+
+        stages.start('save', "--- 4. Saving Models ---")
+        os.makedirs(MODELS_DIR, exist_ok=True)
 
-    # Encode Trainings
-    trainings['text_for_emb'] = trainings['title'].fillna('') + ' ' + trainings['description'].fillna('')
-    if not trainings.empty:
-        train_emb = model.encode(trainings['text_for_emb'].tolist(), show_progress_bar=True)
+        # Each artifact is a folder: mmap-able emb.npy + columnar metadata + manifest
+        save_artifact('candidates', cand, cand_emb, MODEL_NAME, emb_dtype=emb_dtype, dim=dim)
+
+        # Save the Unified Job Model (swaps the streamed folder in)
+        if dedup is not None:
+            dedup.save(job_writer.tmp_dir)
+        manifest = job_writer.close({'dedup': {'threshold': dedup_threshold, 'dropped': dedup.dropped} if dedup is not None else None})
+        print(f"   -> models/jobs/: {manifest['rows']} x {manifest['dim']} ({manifest['dtype']}), sha256 {manifest['checksum'][:12]}")
+
+        save_artifact('trainings', trainings, train_emb, MODEL_NAME, emb_dtype=emb_dtype, dim=dim)
+    except BaseException:
+        if job_writer is not None:
+            job_writer.abort()
+        store.abort()
+        encode.close()
+        raise
+
+    stages.start('ivf_index', "--- 5. Building Job Search Index (IVF) ---")
+    if can_reuse_centroids(old_centroids, manifest['rows']):
+        print("   - Reusing previous centroids (only re-filing rows)")
     else:
-        train_emb = []
+        old_centroids = None
+    job_index, report = build_index(load_artifact('jobs'), centroids=old_centroids)
+    if job_index is None:
+        print("   - No jobs, skipping (searches stay exact)")
+    else:
+        print(f"   -> {job_index.nlist} lists, default nprobe={job_index.info['nprobe']} (recall@10 vs exact search below)")
+        print_report(report)
+    if emb_dtype != 'float32':
+        print(f"   - {emb_dtype} embeddings: coarse scan + float32 re-scoring (agreement with float32 exact search)")
+        for name in ('jobs', 'candidates', 'trainings'):
+            art = load_artifact(name)
+            if len(art):
+                print_quantization_report(name, evaluate_quantization(art, sample_queries(art.emb, n=100)))
 
-    # Encode Unified Jobs
-    job_emb = model.encode(unified_jobs['text_for_emb'].tolist(), show_progress_bar=True)
+    stages.start('skill_index', "--- 6. Building Skill Index (vocabulary, job x skill matrix, inverted index) ---")
+    skill_idx = build_skill_index(load_artifact('jobs'), load_artifact('trainings'))
+    tagged = int((skill_idx.job_skill_counts > 0).sum())
+    print(f"   -> {len(skill_idx.vocab)} skills, {len(skill_idx.job_indices)} job-skill links, {tagged}/{len(skill_idx.job_skill_counts)} jobs tagged")
 
-    print("--- 4. Saving Models ---")
-    os.makedirs('models', exist_ok=True)
-    
-    with open('models/candidates.pkl', 'wb') as f:
-        pickle.dump({'df': cand, 'emb': cand_emb}, f)
-    
-    # Save the Unified Job Model
-    with open('models/jobs.pkl', 'wb') as f:
-        pickle.dump({'df': unified_jobs, 'emb': job_emb}, f)
-        
-    with open('models/trainings.pkl', 'wb') as f:
-        pickle.dump({'df': trainings, 'emb': train_emb}, f)
+    stages.start('matches', f"--- 7. Matching Candidates <-> Jobs (top {match_k} each way, blocked) ---")
+    cand_art, job_art = load_artifact('candidates'), load_artifact('jobs')
+    if len(cand_art) and len(job_art):
+        table = build_match_table(cand_art, job_art, k=match_k)
+        print(f"   -> {len(cand_art)} candidates x {len(job_art)} jobs, table k={table.k}")
+    else:
+        print("   - No candidates or jobs, skipping")
+
+    stages.start('skill_gap', "--- 8. Ranking Trainings per Job and per Skill (skill-gap lookups) ---")
+    train_art = load_artifact('trainings')
+    if len(train_art) and len(job_art):
+        gap = build_skill_gap(job_art, train_art, skill_idx)
+        covered = int((gap.skill_indptr[1:] > gap.skill_indptr[:-1]).sum())
+        print(f"   -> top {gap.job_trainings.shape[1]} trainings per job, {covered}/{len(skill_idx.vocab)} skills covered by a training")
+    else:
+        print("   - No trainings or jobs, skipping")
         
+    times = stages.stop()
+    print("⏱️ Stage times: " + ", ".join(f"{k} {v:.1f}s" for k, v in times.items()))
+    if os.environ.get('SKILLBRIDGE_METRICS_FILE'):
+        # Prometheus textfile-collector format, for scraping batch runs
+        REGISTRY.write(os.environ['SKILLBRIDGE_METRICS_FILE'])
     print("✅ Training Complete! Model is ready.")
+    return times
 
 if __name__ == "__main__":
-    prepare_unified_model()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Build the SkillBridge model artifacts.")
+    parser.add_argument('--emb-dtype', choices=EMB_DTYPES, default='float32',
+                        help="Storage type for the embedding matrices searches scan (float16 halves memory, int8 quarters it; "
+                             "a float32 copy is kept on disk for re-scoring the top candidates).")
+    parser.add_argument('--rebuild-index', action='store_true',
+                        help="Retrain the IVF centroids instead of reusing the previous ones.")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                        help="Rows read, unified and embedded at a time (bounds peak memory).")
+    parser.add_argument('--raw-limit', type=int, default=None,
+                        help="Only index the first N rows of all.csv (default: all of them).")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help="Encoder worker processes (1 = encode in this process).")
+    parser.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE,
+                        help="Texts per worker task; each finished shard is checkpointed.")
+    parser.add_argument('--dedup-threshold', type=float, default=DEDUP_THRESHOLD,
+                        help="Estimated Jaccard similarity above which a job is folded into an earlier one (0 = no dedup).")
+    parser.add_argument('--match-k', type=int, default=MATCH_K,
+                        help="Jobs kept per candidate (and candidates per job) in the precomputed match table.")
+    args = parser.parse_args()
+    prepare_unified_model(emb_dtype=args.emb_dtype, rebuild_index=args.rebuild_index,
+                          chunksize=args.chunk_size, raw_limit=args.raw_limit,
+                          workers=args.workers, shard_size=args.shard_size, match_k=args.match_k,
+                          dedup_threshold=args.dedup_threshold)
\ No newline at end of file
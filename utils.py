@@ -3,42 +3,129 @@ import re
 import os
 import json
 
+def find_data_file(filename):
+    """Returns the first existing path among filename and data/filename, or None."""
+    for path in [filename, os.path.join('data', filename)]:
+        if os.path.exists(path):
+            return path
+    return None
+
+def detect_separator(path):
+    """
+    Picks ',' or '|' (used by all.csv) from the header line alone,
+    so the file is parsed once instead of trying one and falling back.
+    """
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        header = f.readline()
+    return '|' if header.count('|') > header.count(',') else ','
+
 def load_csv(filename):
     """
     Tries to load a CSV file from the current directory or 'data/' folder.
     Handles different delimiters (like '|' for all.csv) automatically.
     """
-    # Define potential paths
-    paths = [filename, os.path.join('data', filename)]
-    
-    for path in paths:
-        if os.path.exists(path):
+    path = find_data_file(filename)
+    if path is None:
+        print(f"❌ Warning: Could not find {filename}")
+        return None
+
+    try:
+        return pd.read_csv(path, sep=detect_separator(path), on_bad_lines='skip')
+    except Exception as e:
+        print(f"Error reading {filename}: {e}")
+        return None
+
+def iter_csv_chunks(filename, chunksize=2000, sep=None):
+    """
+    Streams a CSV file as DataFrames of at most `chunksize` rows, so even
+    a huge dump (all.csv) never has to fit in memory.
+    Raises FileNotFoundError if the file does not exist.
+    """
+    path = find_data_file(filename)
+    if path is None:
+        raise FileNotFoundError(filename)
+    with pd.read_csv(path, sep=sep or detect_separator(path), on_bad_lines='skip', chunksize=chunksize) as reader:
+        for chunk in reader:
+            yield chunk
+
+def iter_json_records(filename, read_size=1 << 20):
+    """
+    Streams the objects of a top-level JSON array one at a time,
+    reading the file in `read_size` blocks instead of json.load()-ing it whole.
+    Raises FileNotFoundError if the file does not exist.
+    """
+    path = find_data_file(filename)
+    if path is None:
+        raise FileNotFoundError(filename)
+
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buf, pos, eof = '', 0, False
+
+        def fill():
+            nonlocal buf, pos, eof
+            more = f.read(read_size)
+            eof = not more
+            buf, pos = buf[pos:] + more, 0
+            return more
+
+        def skip(chars):
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in chars:
+                    pos += 1
+                if pos < len(buf) or not fill():
+                    return
+
+        skip(' \t\r\n')
+        if buf[pos:pos + 1] != '[':
+            raise ValueError(f"{filename}: expected a JSON array")
+        pos += 1
+        while True:
+            skip(' \t\r\n,')
+            if pos >= len(buf) or buf[pos] == ']':
+                return
             try:
-                # First try standard comma
-                return pd.read_csv(path)
-            except:
-                try:
-                    # Fallback for pipe-separated files (like all.csv)
-                    return pd.read_csv(path, sep='|', on_bad_lines='skip')
-                except Exception as e:
-                    print(f"Error reading {filename}: {e}")
-                    return None
-    
-    print(f"❌ Warning: Could not find {filename}")
-    return None
+                obj, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if not fill():
+                    raise
+                continue
+            after = end
+            while after < len(buf) and buf[after] in ' \t\r\n':
+                after += 1
+            if after == len(buf) or buf[after] not in ',]':
+                # A number cut by the buffer still decodes (456 as 4, -7.5e3 as -7.): read on and retry
+                if not eof:
+                    fill()
+                    continue
+                if after < len(buf):
+                    raise json.JSONDecodeError("Expecting ',' delimiter", buf, after)
+            yield obj
+            pos = end
+
+def iter_json_chunks(filename, chunksize=2000):
+    """Streams a JSON array of records as DataFrames of at most `chunksize` rows."""
+    batch = []
+    for record in iter_json_records(filename):
+        batch.append(record)
+        if len(batch) >= chunksize:
+            yield pd.DataFrame(batch)
+            batch = []
+    if batch:
+        yield pd.DataFrame(batch)
 
 def load_json(filename):
     """Loads a JSON file from the current directory or 'data/' folder."""
-    paths = [filename, os.path.join('data', filename)]
-    for path in paths:
-        if os.path.exists(path):
-            try:
-                with open(path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Error reading JSON {filename}: {e}")
-                return []
-    return []
+    path = find_data_file(filename)
+    if path is None:
+        return []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Error reading JSON {filename}: {e}")
+        return []
 
 def normalize_skill_text(s):
     """